@@ -1,8 +1,7 @@
 import os
 import sys
 from os.path import abspath, dirname
-from app.core.config import settings
-from app.db.database import Base
+from app.db.database import Base, get_migration_database_url
 from logging.config import fileConfig
 from sqlalchemy import engine_from_config, create_engine
 from sqlalchemy import pool
@@ -16,15 +15,16 @@ config = context.config
 
 
 def get_url():
-    # Use the logic from our previous successful checks
-    DB_URL = settings.DATABASE_URL
+    # Direct connection even when the app goes through PgBouncer
+    DB_URL = get_migration_database_url()
     
     # Render DBs are external, so we just use the URL as provided
     # The application logic (FastAPI runtime) handles the search_path fix later.
     return DB_URL 
 
 
-if config.config_file_name is not None:
+# app/init_db.py runs migrations inside the app process and keeps its own logging
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 
@@ -60,6 +60,17 @@ def run_migrations_online() -> None:
 
     """
 
+    # Connection handed over by app/init_db.py, which already holds the migration lock on it
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(
+            connection=connection, target_metadata=target_metadata
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     connectable = create_engine(
         get_url(), 
         pool_pre_ping=True
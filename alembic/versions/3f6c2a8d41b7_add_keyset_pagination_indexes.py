@@ -0,0 +1,34 @@
+"""Add keyset pagination indexes
+
+Revision ID: 3f6c2a8d41b7
+Revises: 0e9059a92577
+Create Date: 2026-10-18 09:12:40.511382
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6c2a8d41b7'
+down_revision: Union[str, Sequence[str], None] = '0e9059a92577'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: Composite indexes matching the list endpoints' sort keys."""
+    op.create_index('ix_tickets_created_at_id', 'tickets', ['created_at', 'id'], unique=False)
+    op.create_index('ix_applications_created_at_id', 'applications', ['created_at', 'id'], unique=False)
+    op.create_index('ix_users_full_name_id', 'users', ['full_name', 'id'], unique=False)
+    op.create_index('ix_user_application_access_created_at_id', 'user_application_access', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema: Drop the keyset pagination indexes."""
+    op.drop_index('ix_user_application_access_created_at_id', table_name='user_application_access')
+    op.drop_index('ix_users_full_name_id', table_name='users')
+    op.drop_index('ix_applications_created_at_id', table_name='applications')
+    op.drop_index('ix_tickets_created_at_id', table_name='tickets')
@@ -0,0 +1,47 @@
+"""Add ticket full-text and trigram search indexes
+
+Revision ID: 7b1e4d9c2a63
+Revises: 3f6c2a8d41b7
+Create Date: 2026-10-18 11:40:02.118904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b1e4d9c2a63'
+down_revision: Union[str, Sequence[str], None] = '3f6c2a8d41b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: Generated tsvector column with GIN index, plus a trigram index for substring search."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Maintained by Postgres on every insert/update; the config must match app.services.ticket_search.TS_CONFIG
+    op.execute(
+        """
+        ALTER TABLE tickets ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ) STORED
+        """
+    )
+    op.create_index('ix_tickets_search_vector', 'tickets', ['search_vector'], unique=False, postgresql_using='gin')
+
+    # Expression must match the ILIKE in app.services.ticket_search._search_postgres
+    op.execute(
+        "CREATE INDEX ix_tickets_title_description_trgm ON tickets "
+        "USING gin ((title || ' ' || description) gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema: Drop the search indexes and column."""
+    op.drop_index('ix_tickets_title_description_trgm', table_name='tickets')
+    op.drop_index('ix_tickets_search_vector', table_name='tickets')
+    op.drop_column('tickets', 'search_vector')
@@ -0,0 +1,80 @@
+"""Replace the applications' owner email with an owner_id foreign key
+
+Revision ID: b5c8e2f17a94
+Revises: e2b7c9f40a15
+Create Date: 2026-10-18 17:22:48.350176
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5c8e2f17a94'
+down_revision: Union[str, Sequence[str], None] = 'e2b7c9f40a15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Applications per backfill UPDATE; each one commits on its own, so the row locks are short
+BATCH_SIZE = 5000
+
+# Owners whose email matches no user are left without one, as they owned nothing before
+SET_OWNER_ID = (
+    "UPDATE applications AS a SET owner_id = u.id FROM users AS u "
+    "WHERE u.email = a.owner AND a.id > :first_id AND a.id <= :last_id"
+)
+SET_OWNER = (
+    "UPDATE applications AS a SET owner = u.email FROM users AS u "
+    "WHERE u.id = a.owner_id AND a.id > :first_id AND a.id <= :last_id"
+)
+
+
+def _backfill(statement: str) -> None:
+    """Runs `statement` over the applications in id ranges of BATCH_SIZE."""
+    if op.get_context().as_sql:
+        # Offline (--sql): one statement over every row
+        op.execute(sa.text(statement).bindparams(first_id=0, last_id=2**31 - 1))
+        return
+    bind = op.get_bind()
+    max_id = bind.execute(sa.text("SELECT coalesce(max(id), 0) FROM applications")).scalar()
+    for first_id in range(0, max_id, BATCH_SIZE):
+        bind.execute(sa.text(statement), {"first_id": first_id, "last_id": first_id + BATCH_SIZE})
+
+
+def upgrade() -> None:
+    """Upgrade schema: Add applications.owner_id, fill it from the owner emails, then drop applications.owner."""
+    op.add_column('applications', sa.Column('owner_id', sa.Integer(), nullable=True))
+    # NOT VALID: existing rows are checked by VALIDATE below, which does not block writes
+    op.create_foreign_key(
+        op.f('applications_owner_id_fkey'), 'applications', 'users', ['owner_id'], ['id'],
+        ondelete='SET NULL', postgresql_not_valid=True,
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_applications_owner_id', 'applications', ['owner_id'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        _backfill(SET_OWNER_ID)
+        op.execute("ALTER TABLE applications VALIDATE CONSTRAINT applications_owner_id_fkey")
+
+    op.drop_index('ix_applications_owner', table_name='applications', if_exists=True)
+    op.drop_column('applications', 'owner')
+
+
+def downgrade() -> None:
+    """Downgrade schema: Restore applications.owner from the owners' emails and drop owner_id."""
+    op.add_column('applications', sa.Column('owner', sa.String(), nullable=True))
+
+    with op.get_context().autocommit_block():
+        _backfill(SET_OWNER)
+        op.create_index(
+            'ix_applications_owner', 'applications', ['owner'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index('ix_applications_owner_id', table_name='applications', postgresql_concurrently=True, if_exists=True)
+
+    op.drop_constraint(op.f('applications_owner_id_fkey'), 'applications', type_='foreignkey')
+    op.drop_column('applications', 'owner_id')
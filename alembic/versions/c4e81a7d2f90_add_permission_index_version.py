@@ -0,0 +1,33 @@
+"""Add the permission index version counter
+
+Revision ID: c4e81a7d2f90
+Revises: 7b1e4d9c2a63
+Create Date: 2026-10-18 15:06:27.390417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e81a7d2f90'
+down_revision: Union[str, Sequence[str], None] = '7b1e4d9c2a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: Single-row version counter of the in-memory permission index."""
+    version_table = op.create_table('permission_index_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(version_table, [{'id': 1, 'version': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema: Drop the permission index version counter."""
+    op.drop_table('permission_index_version')
@@ -0,0 +1,43 @@
+"""Add per-application ticket counters
+
+Revision ID: d8a3f5e61b24
+Revises: c4e81a7d2f90
+Create Date: 2026-10-18 18:21:45.603118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a3f5e61b24'
+down_revision: Union[str, Sequence[str], None] = 'c4e81a7d2f90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: Ticket counts per (application, status), filled from the existing tickets."""
+    op.create_table('ticket_stats',
+    sa.Column('application_id', sa.Integer(), nullable=False),
+    # The ticketstatus type already exists (tickets.status)
+    sa.Column('status', postgresql.ENUM('open', 'in_progress', 'resolved', name='ticketstatus', create_type=False), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['application_id'], ['applications.id'], name=op.f('ticket_stats_application_id_fkey'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('application_id', 'status', name=op.f('ticket_stats_pkey'))
+    )
+    # Same grouping as app.services.ticket_stats.rebuild_ticket_stats
+    op.execute(
+        "INSERT INTO ticket_stats (application_id, status, count) "
+        "SELECT application_id, status, count(*) FROM tickets "
+        "WHERE application_id IS NOT NULL AND status IS NOT NULL "
+        "GROUP BY application_id, status"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema: Drop the ticket counters."""
+    op.drop_table('ticket_stats')
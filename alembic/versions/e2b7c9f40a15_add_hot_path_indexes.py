@@ -0,0 +1,71 @@
+"""Add indexes for the router filters and foreign keys
+
+Revision ID: e2b7c9f40a15
+Revises: d8a3f5e61b24
+Create Date: 2026-10-18 16:05:27.904213
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7c9f40a15'
+down_revision: Union[str, Sequence[str], None] = 'd8a3f5e61b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# name, table, columns, partial index predicate. Must match the models' __table_args__.
+INDEXES = [
+    # Regular users' ticket list, the dashboard, and deleting a user
+    ('ix_tickets_created_by_created_at_id', 'tickets', ['created_by', 'created_at', 'id'], None),
+    # An application's ticket list, and deleting an application
+    ('ix_tickets_application_id_created_at_id', 'tickets', ['application_id', 'created_at', 'id'], None),
+    # The open/in-progress status filters; resolved tickets, the bulk of the table, are left out.
+    # Enums are stored by name.
+    ('ix_tickets_unresolved_status_created_at_id', 'tickets', ['status', 'created_at', 'id'], "status <> 'resolved'"),
+    # Deleting an application (uix_user_app already leads with user_id)
+    ('ix_user_application_access_application_id', 'user_application_access', ['application_id'], None),
+    # Joining users to the applications they own, by email (app/services/permissions.py)
+    ('ix_applications_owner', 'applications', ['owner'], None),
+]
+
+
+def _drop_if_invalid(name: str, table: str) -> None:
+    # A failed or interrupted CREATE INDEX CONCURRENTLY leaves an invalid index behind,
+    # which IF NOT EXISTS would then keep: drop it so the rerun builds it again
+    if op.get_context().as_sql:
+        return
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE n.nspname = 'public' AND c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    ).scalar()
+    if invalid:
+        op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def upgrade() -> None:
+    """Upgrade schema: Composite and partial indexes, built without blocking writes to the tables."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction; this commits the ones before
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            _drop_if_invalid(name, table)
+            op.create_index(
+                name, table, columns, unique=False,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema: Drop the indexes, again without blocking writes."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -1,16 +1,26 @@
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError, ExpiredSignatureError
-from sqlalchemy.orm import Session
-from app.db.database import SessionLocal
+from app.db.database import SessionLocal, get_async_db, async_session_scope
 from app.db.models.user import User
+from app.schemas.user import CurrentUser
 from app.core.config import settings
+from app.core.cache import SingleFlightCache, TTLCache
+from app.core.metrics import register_cache
+from app.services.permissions import PermissionIndex, permission_index
 
 SECRET_KEY = settings.JWT_SECRET_KEY
 ALGORITHM = settings.ALGORITHM
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# user_id -> CurrentUser. In-process, so other workers only see changes after the TTL.
+# Single-flight: a lookup in flight when its user is invalidated is not cached.
+user_cache = SingleFlightCache(
+    TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+)
+register_cache("user", user_cache)
+
 
 def get_db():
     db = SessionLocal()
@@ -19,7 +29,23 @@ def get_db():
     finally:
         db.close()
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def invalidate_cached_user(user_id: int):
+    """Drops a user from the identity cache; call after changing or deleting the user."""
+    user_cache.invalidate(user_id)
+
+
+async def load_current_user(user_id: int) -> CurrentUser:
+    # A short-lived session of our own, so a request that only needs the caller's
+    # identity never checks out a connection on a cache hit.
+    async with async_session_scope() as db:
+        user = await db.get(User, user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        return CurrentUser(id=user.id, full_name=user.full_name, email=user.email, role=user.role)
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> CurrentUser:
     if not token:
         raise HTTPException(status_code=401, detail="Missing session, login again")
 
@@ -29,6 +55,8 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid token payload")
+
+        user_id = int(user_id)
     
     except ExpiredSignatureError as e:
         raise HTTPException(status_code=401, detail=f"Token expired:  {e}")
@@ -36,14 +64,25 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except JWTError as e: 
         raise HTTPException(status_code=401, detail=f"Invalid token: {e}")
 
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    return user
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Invalid token payload")
+
+    return await user_cache.get_or_load(user_id, lambda: load_current_user(user_id))
 
 
-def require_admin(current_user: User = Depends(get_current_user)):
+def require_admin(current_user: CurrentUser = Depends(get_current_user)):
     if current_user.role.value != "Admin":
         raise HTTPException(status_code=403, detail="Admin privileges required")
     return current_user
+
+
+async def get_permissions(db=Depends(get_async_db)) -> PermissionIndex:
+    """The permission index, reloaded first if it may be stale. Shares the route's session."""
+    await permission_index.refresh(db)
+    return permission_index
+
+
+def get_permissions_sync(db=Depends(get_db)) -> PermissionIndex:
+    """get_permissions for sync routes."""
+    permission_index.refresh_sync(db)
+    return permission_index
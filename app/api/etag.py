@@ -0,0 +1,53 @@
+import hashlib
+from typing import Optional, Sequence
+
+from fastapi import Request, Response
+from sqlalchemy import inspect
+
+# Browsers may keep the response but must revalidate it (If-None-Match) before reuse
+CACHE_CONTROL = "private, no-cache"
+
+
+def weak_etag(*parts) -> str:
+    """A weak ETag from values that change whenever the response body would."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def row_fingerprint(item) -> tuple:
+    """
+    The values of a row's mapped columns, id and updated_at included. updated_at
+    alone is not enough: on Postgres now() is the transaction's start, so a write
+    that commits later may still get an older time, and SQLite's CURRENT_TIMESTAMP
+    has one-second resolution, so an update may keep the time of the insert.
+    """
+    return tuple(getattr(item, attr.key) for attr in inspect(item).mapper.column_attrs)
+
+
+def page_fingerprint(items: Sequence) -> tuple:
+    """
+    row_fingerprint of each row of a page, in order: an insert, delete, reorder or
+    change of any row gives another fingerprint.
+    """
+    return tuple(row_fingerprint(item) for item in items)
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/"x" matches "x"
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Sets the ETag on `response`. Returns the 304 to send instead when the request's
+    If-None-Match already names this version, None otherwise.
+    """
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
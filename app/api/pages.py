@@ -0,0 +1,61 @@
+from dataclasses import dataclass
+from typing import Dict
+
+from fastapi import Request, Response
+from fastapi.templating import Jinja2Templates
+
+from app.api.etag import not_modified, weak_etag
+from app.core.assets import compress, negotiate_encoding
+
+
+@dataclass(frozen=True)
+class PageShell:
+    html: bytes
+    variants: Dict[str, bytes]  # content-coding -> precompressed html
+    etag: str
+
+
+class PageShells:
+    """
+    The HTML pages, rendered once per worker and served as prebuilt bytes. The pages
+    are shells: their scripts read ids from the query string and load everything else
+    from the API, so one rendering of a template serves every request for it. The
+    templates are rendered without a request and must not depend on one.
+    """
+
+    def __init__(self, templates: Jinja2Templates):
+        self.templates = templates
+        self._shells: Dict[str, PageShell] = {}
+
+    def render(self, name: str) -> PageShell:
+        html = self.templates.get_template(name).render().encode("utf-8")
+        return PageShell(html=html, variants=compress(html), etag=weak_etag(html))
+
+    def get(self, name: str) -> PageShell:
+        shell = self._shells.get(name)
+        if shell is None:
+            # Renders concurrently on a cold cache at worst, with the same result
+            shell = self._shells[name] = self.render(name)
+        return shell
+
+    def render_all(self) -> None:
+        """Renders every template ahead of the first request, e.g. at startup."""
+        for name in self.templates.env.list_templates(extensions=["html"]):
+            self.get(name)
+
+    def response(self, request: Request, name: str) -> Response:
+        shell = self.get(name)
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""), shell.variants)
+        headers = {"Vary": "Accept-Encoding"}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        response = Response(
+            content=shell.variants[encoding] if encoding else shell.html,
+            media_type="text/html",
+            headers=headers,
+        )
+        cached = not_modified(request, response, shell.etag)
+        if cached is not None:
+            cached.headers["Vary"] = "Accept-Encoding"
+            return cached
+        return response
@@ -0,0 +1,104 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query
+from sqlalchemy import tuple_
+from sqlalchemy.engine import Row
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def page_limit(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of items per page")
+) -> int:
+    return limit
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Packs the sort-key values of the last returned row into an opaque, URL-safe token."""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, columns: Sequence[Any]) -> List[Any]:
+    """Reverses encode_cursor, restoring datetimes from the column types."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor shape mismatch")
+
+        decoded = []
+        for column, value in zip(columns, values):
+            if value is not None and column.type.python_type is datetime:
+                value = datetime.fromisoformat(value)
+            decoded.append(value)
+        return decoded
+    except (ValueError, TypeError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(
+    query,
+    columns: Sequence[Any],
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True,
+) -> Tuple[list, Optional[str]]:
+    """
+    Applies keyset pagination to `query`.
+
+    `columns` is the sort key (its last column must be unique, e.g. the primary key),
+    so the (created_at, id) style ordering is stable even when timestamps collide.
+    A column may also be a labeled expression added to the query, such as a search rank.
+    Returns the rows of this page and the cursor for the next one (None on the last page).
+    """
+    rows = _keyset(query, columns, cursor, limit, descending).all()
+    return _page(rows, columns, limit)
+
+
+async def paginate_async(
+    db,
+    statement,
+    columns: Sequence[Any],
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True,
+) -> Tuple[list, Optional[str]]:
+    """
+    paginate() for 2.0-style select() statements executed on an AsyncSession.
+    Always returns Rows, so single-entity callers unpack them with `for (obj,) in rows`.
+    """
+    result = await db.execute(_keyset(statement, columns, cursor, limit, descending))
+    return _page(result.all(), columns, limit)
+
+
+def _keyset(query, columns: Sequence[Any], cursor: Optional[str], limit: int, descending: bool):
+    # Works for both legacy Query objects and select() statements
+    if cursor:
+        after = decode_cursor(cursor, columns)
+        key = tuple_(*columns)
+        query = query.filter(key < tuple_(*after) if descending else key > tuple_(*after))
+
+    order = [c.desc() if descending else c.asc() for c in columns]
+    return query.order_by(*order).limit(limit + 1)
+
+
+def _page(rows: list, columns: Sequence[Any], limit: int) -> Tuple[list, Optional[str]]:
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor(_key_values(rows[-1], columns))
+
+
+def _key_values(row, columns: Sequence[Any]) -> List[Any]:
+    # Multi-entity queries return Rows whose first element is the ORM object
+    if not isinstance(row, Row):
+        return [getattr(row, c.key) for c in columns]
+
+    mapping = row._mapping
+    return [mapping[c.key] if c.key in mapping else getattr(row[0], c.key) for c in columns]
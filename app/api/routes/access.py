@@ -1,22 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.db.models.user_application_access import UserApplicationAccess, UserAppAccessUpdate
 from app.db.models.user import User 
 from app.db.models.application import Application
-from app.schemas.application import UserAppAccessCreate, UserAppAccessOut, PermissionLevel 
+from app.schemas.application import (
+    UserAppAccessCreate, UserAppAccessOut, UserAppAccessPage, PermissionLevel,
+    UserAppAccessBatch, UserAppAccessBatchResult,
+)
 from app.api.deps import get_db, get_current_user, require_admin
+from app.api.pagination import page_limit, paginate
+from app.core.config import settings
+from app.services.access_batch import apply_access_batch
+from app.services.permissions import bump_permission_version, permission_index
 
 
 router = APIRouter(prefix="/api/access", tags=["Access"])
 
-@router.get("/", response_model=List[UserAppAccessOut], dependencies=[Depends(require_admin)])
-def list_accesses(db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+@router.get("/", response_model=UserAppAccessPage, dependencies=[Depends(require_admin)])
+def list_accesses(
+    cursor: Optional[str] = Query(None, description="Opaque cursor returned as next_cursor by the previous page"),
+    limit: int = Depends(page_limit),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
     # Admins see all, normal users see only their accesses
-    if current_user.role == "Admin":
-        return db.query(UserApplicationAccess).all()
-    
-    return db.query(UserApplicationAccess).filter(UserApplicationAccess.user_id == current_user.id).all()
+    query = db.query(UserApplicationAccess)
+    if current_user.role != "Admin":
+        query = query.filter(UserApplicationAccess.user_id == current_user.id)
+
+    accesses, next_cursor = paginate(
+        query, [UserApplicationAccess.created_at, UserApplicationAccess.id], cursor, limit
+    )
+    return {"items": accesses, "next_cursor": next_cursor}
 
 
 @router.post("/", response_model=UserAppAccessOut, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_admin)])
@@ -36,12 +52,50 @@ def grant_access(payload: UserAppAccessCreate, db: Session = Depends(get_db)):
     
     obj = UserApplicationAccess(**payload.dict())
     db.add(obj)
+    version = bump_permission_version(db)
     db.commit()
     db.refresh(obj)
+    permission_index.update(version, set_access=[(obj.user_id, obj.application_id, obj.permission_level.value)])
     
     return obj
 
 
+def _succeeded(section_results: List[dict]) -> List[dict]:
+    """The accesses of the changes in one section of a batch result that went through."""
+    return [item["access"] for item in section_results if item["status"] < 300]
+
+
+@router.post("/batch", response_model=UserAppAccessBatchResult, dependencies=[Depends(require_admin)])
+def apply_access_changes(payload: UserAppAccessBatch, db: Session = Depends(get_db)):
+    """
+    Grants, updates and revokes many accesses in one request and one transaction.
+    Returns one result per change, in the order sent, with the status code the
+    single-item endpoint would have returned; invalid changes do not block the rest.
+    """
+    count = len(payload.grants) + len(payload.updates) + len(payload.revokes)
+    if count > settings.ACCESS_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many changes: {count}, at most {settings.ACCESS_BATCH_MAX_ITEMS} per request"
+        )
+
+    results = apply_access_batch(db, payload)
+    remove_access = [(access["user_id"], access["application_id"]) for access in _succeeded(results["revokes"])]
+    set_access = [
+        (access["user_id"], access["application_id"], access["permission_level"])
+        for access in _succeeded(results["updates"]) + _succeeded(results["grants"])
+    ]
+    # A batch that changed no row leaves every worker's permission index valid
+    if not (remove_access or set_access):
+        db.commit()
+        return results
+
+    version = bump_permission_version(db)
+    db.commit()
+    permission_index.update(version, remove_access=remove_access, set_access=set_access)
+    return results
+
+
 @router.put("/{access_id}", response_model=UserAppAccessOut, dependencies=[Depends(require_admin)])
 def update_access(access_id: int, payload: UserAppAccessUpdate, db: Session = Depends(get_db)):
     obj = db.query(UserApplicationAccess).get(access_id)
@@ -51,8 +105,10 @@ def update_access(access_id: int, payload: UserAppAccessUpdate, db: Session = De
     obj.permission_level = payload.permission_level
     
     db.add(obj) 
+    version = bump_permission_version(db)
     db.commit()
     db.refresh(obj)
+    permission_index.update(version, set_access=[(obj.user_id, obj.application_id, obj.permission_level.value)])
     return obj
 
 
@@ -62,5 +118,7 @@ def delete_access(access_id: int, db: Session = Depends(get_db)):
     if not obj:
         raise HTTPException(status_code=404, detail="Access not found")
     db.delete(obj)
+    version = bump_permission_version(db)
     db.commit()
+    permission_index.update(version, remove_access=[(obj.user_id, obj.application_id)])
     return None
@@ -1,64 +1,66 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, aliased
-from sqlalchemy import or_
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from typing import List, Optional
 from app.db.models.application import Application
 from app.db.models.user import User
 from app.db.models.user_application_access import UserApplicationAccess, PermissionLevel
-from app.schemas.application import ApplicationCreate, ApplicationOut, ApplicationUpdate
-from app.api.deps import get_db, get_current_user, require_admin
+from app.schemas.application import ApplicationCreate, ApplicationOut, ApplicationUpdate, ApplicationPage
+from app.api.deps import get_db, get_async_db, get_current_user, require_admin, get_permissions, get_permissions_sync
+from app.api.pagination import page_limit, paginate_async
+from app.api.etag import not_modified, page_fingerprint, row_fingerprint, weak_etag
+from app.services.dashboard import invalidate_dashboards
+from app.services.permissions import PermissionIndex, bump_permission_version, permission_index
+from app.services.ticket_stats import load_ticket_counts
 
 router = APIRouter(prefix="/api/applications", tags=["Applications"])
 
-@router.get("/", response_model=List[ApplicationOut])
-def list_applications(
+@router.get("/", response_model=ApplicationPage)
+async def list_applications(
+    request: Request,
+    response: Response,
     dashboard: bool = Query(False),
     search: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    ticket_counts: bool = Query(False, description="Include each application's ticket counts by status"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor returned as next_cursor by the previous page"),
+    limit: int = Depends(page_limit),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+    permissions: PermissionIndex = Depends(get_permissions)
 ):
-    # Alias the access table to look for the current user's entry
-    Access = aliased(UserApplicationAccess)
-
-    # We specifically select the Application model AND the permission_level column
-    query = db.query(
-        Application,
-        Access.permission_level.label("permission_level")
-    ).outerjoin(
-        Access, 
-        (Application.id == Access.application_id) & (Access.user_id == current_user.id)
-    )
+    query = select(Application)
 
     # --- FILTERS ---
-    if current_user.role != "Admin":
-        query = query.filter(
-            or_(
-                Application.owner == current_user.email,
-                Access.user_id == current_user.id
-            )
-        )
+    # Admins see every application, others the ones they own or have access to
+    visible_ids = permissions.visible_ids(current_user)
+    if visible_ids is not None:
+        query = query.filter(Application.id.in_(visible_ids))
 
     if dashboard:
-        query = query.filter(Application.owner == current_user.email)
+        query = query.filter(Application.id.in_(permissions.owned_ids(current_user.id)))
 
     if search:
         query = query.filter(Application.name.ilike(f"%{search}%"))
 
-    results = query.all()
+    results, next_cursor = await paginate_async(db, query, [Application.created_at, Application.id], cursor, limit)
+
+    # Counters kept by the ticket routes: one primary key read, not a scan of tickets
+    counts = await load_ticket_counts(db, [app_obj.id for (app_obj,) in results]) if ticket_counts else {}
 
     final_list = []
-    for app_obj, perm_level in results:
-        # Manually attach the permission level to the object before returning
-        # If perm_level is None (outer join found nothing), but they are the owner,
-        # you might want to default it to 'Owner' or 'Admin'
-        if perm_level is None:
-            if app_obj.owner == current_user.email or current_user.role == "Admin":
-                perm_level = "admin"
-        
-        app_obj.permission_level = perm_level
+    for (app_obj,) in results:
+        # Attach the caller's effective level for ApplicationOut
+        app_obj.permission_level = permissions.level(current_user, app_obj.id)
+        app_obj.ticket_counts = counts.get(app_obj.id)
         final_list.append(app_obj)
 
-    return final_list
+    # The caller's levels, the owners' emails and the counts are part of the body, so they are part of the tag
+    etag = weak_etag(
+        request.url.query, next_cursor, page_fingerprint(final_list),
+        tuple((app_obj.permission_level, app_obj.owner) for app_obj in final_list), counts,
+    )
+    return not_modified(request, response, etag) or {"items": final_list, "next_cursor": next_cursor}
 
 
 @router.post("/create", response_model=ApplicationOut, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_admin)])
@@ -68,11 +70,10 @@ def create_application(payload: ApplicationCreate, db: Session = Depends(get_db)
         raise HTTPException(status_code=400, detail="Application with same name exists")
     
     app_data = payload.dict()
-    app_data["owner"] = current_user.email 
+    app_data["owner_id"] = current_user.id
     app_obj = Application(**app_data)
     db.add(app_obj)
-    db.commit()
-    db.refresh(app_obj)
+    db.flush()
 
     owner_access = UserApplicationAccess(
         user_id=current_user.id,
@@ -80,54 +81,45 @@ def create_application(payload: ApplicationCreate, db: Session = Depends(get_db)
         permission_level=PermissionLevel.admin 
     )
     db.add(owner_access)
+    version = bump_permission_version(db)
     db.commit()
-    
+    invalidate_dashboards()
+    permission_index.update(
+        version,
+        add_applications=[(app_obj.id, current_user.id)],
+        set_access=[(current_user.id, app_obj.id, PermissionLevel.admin.value)],
+    )
+
     db.refresh(app_obj)
     return app_obj
 
 
 @router.get("/{app_id}", response_model=ApplicationOut)
-def get_application(
+async def get_application(
     app_id: int, 
-    db: Session = Depends(get_db), 
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    ticket_counts: bool = Query(False, description="Include the application's ticket counts by status"),
+    db: AsyncSession = Depends(get_async_db), 
+    current_user: User = Depends(get_current_user),
+    permissions: PermissionIndex = Depends(get_permissions)
 ):
-    # 1. Alias the access table to look for the current user's entry
-    Access = aliased(UserApplicationAccess)
-
-    # 2. Query for both the Application and the permission level from the access table
-    result = db.query(
-        Application,
-        Access.permission_level.label("permission_level")
-    ).outerjoin(
-        Access, 
-        (Application.id == Access.application_id) & (Access.user_id == current_user.id)
-    ).filter(
-        Application.id == app_id
-    ).first()
-
-    # 3. Check if application exists
-    if not result:
+    app_obj = await db.get(Application, app_id)
+    if not app_obj:
         raise HTTPException(status_code=404, detail="Application not found")
 
-    app_obj, perm_level = result
-
-    # 4. Security Check: Only Admin, Owner, or someone with explicit access can see it
-    is_owner = app_obj.owner == current_user.email
-    is_admin = current_user.role == "Admin"
-    
-    if not (is_admin or is_owner or perm_level is not None):
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-
-    # 5. Logic to determine permission level if the join returned None
+    # Only Admin, Owner, or someone with explicit access can see it
+    perm_level = permissions.level(current_user, app_id)
     if perm_level is None:
-        if is_owner or is_admin:
-            perm_level = "admin"
+        raise HTTPException(status_code=403, detail="Not enough permissions")
 
-    # 6. Attach it to the object so Pydantic can pick it up
+    # Attach it to the object so Pydantic can pick it up
     app_obj.permission_level = perm_level
+    app_obj.ticket_counts = (await load_ticket_counts(db, [app_id]))[app_id] if ticket_counts else None
     
-    return app_obj
+    # The owner's email comes from users: a change to it does not touch updated_at
+    etag = weak_etag(row_fingerprint(app_obj), perm_level, app_obj.owner, app_obj.ticket_counts)
+    return not_modified(request, response, etag) or app_obj
 
 
 @router.put("/{app_id}", response_model=ApplicationOut)
@@ -135,65 +127,32 @@ def update_application(
     app_id: int, 
     payload: ApplicationUpdate, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    permissions: PermissionIndex = Depends(get_permissions_sync)
 ):
-    # 1. Alias the access table to check permissions for this specific user
-    Access = aliased(UserApplicationAccess)
-
-    # 2. Query for the app and the user's specific permission level
-    result = db.query(
-        Application,
-        Access.permission_level.label("permission_level")
-    ).outerjoin(
-        Access, 
-        (Application.id == Access.application_id) & (Access.user_id == current_user.id)
-    ).filter(
-        Application.id == app_id
-    ).first()
-
-    if not result:
+    app_obj = db.query(Application).get(app_id)
+    if not app_obj:
         raise HTTPException(status_code=404, detail="Application not found")
 
-    app_obj, perm_level = result
-
-    # 3. Determine Ownership and Site Admin status
-    is_owner = app_obj.owner == current_user.email
-    is_site_admin = current_user.role == "Admin"
-    
-    # 4. Permission Validation Logic
-    # We allow update if:
-    # - User is Owner or Site Admin
-    # - User has 'admin' or 'write' permission level in the Access table
-    
-    # Normalize perm_level to string if it's an Enum (PermissionLevel.write -> "write")
-    perm_str = perm_level.value if hasattr(perm_level, 'value') else str(perm_level) if perm_level else None
-    
-    is_authorized = (
-        is_owner or 
-        is_site_admin or 
-        perm_str in ["admin", "write"]
-    )
-
-    if not is_authorized:
-        # Displaying the normalized string in the error for clarity
-        current_level_display = "Admin/Owner" if (is_owner or is_site_admin) else (perm_str or "None")
+    # Owners and site admins have "admin"; updating takes "admin" or "write"
+    perm_level = permissions.level(current_user, app_id)
+    if perm_level not in ("admin", "write"):
         raise HTTPException(
             status_code=403, 
-            detail=f"Insufficient permissions. Required: admin/write. Your level: {current_level_display}"
+            detail=f"Insufficient permissions. Required: admin/write. Your level: {perm_level or 'None'}"
         )
 
-    # 5. Perform the update
     update_data = payload.dict(exclude_unset=True)
     for k, v in update_data.items():
         setattr(app_obj, k, v)
     
     db.add(app_obj)
     db.commit()
+    invalidate_dashboards()
     db.refresh(app_obj)
 
-    # 6. Map the effective permission back for the response schema
-    effective_level = "admin" if (is_owner or is_site_admin or perm_str == "admin") else perm_str
-    app_obj.permission_level = effective_level
+    # Map the effective permission back for the response schema
+    app_obj.permission_level = perm_level
 
     return app_obj
 
@@ -204,5 +163,8 @@ def delete_application(app_id: int, db: Session = Depends(get_db)):
     if not app_obj:
         raise HTTPException(status_code=404, detail="Application not found")
     db.delete(app_obj)
+    version = bump_permission_version(db)
     db.commit()
+    invalidate_dashboards()
+    permission_index.update(version, remove_applications=[app_id])
     return None
@@ -61,7 +61,7 @@ def login(
     return {"access_token": token, "token_type": "bearer"}
 
 @router.get("/me")
-def get_user_info(current_user: User = Depends(get_current_user)):
+async def get_user_info(current_user: User = Depends(get_current_user)):
     return {
         "id": current_user.id,
         "full_name": current_user.full_name,
@@ -1,9 +1,17 @@
-import os
-import requests
-from fastapi import APIRouter, HTTPException, status
-from typing import Dict, Any, List
+import json
+import re
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from typing import Dict, Any, AsyncIterator, List, Union
+from jose import jwt, JWTError
 from app.db.models.chatbot import ChatQuery, ChatResponse, Source
 from app.core.config import settings
+from app.core.cache import TTLCache, SingleFlightCache
+from app.core.bulkhead import Bulkhead, BulkheadFullError
+from app.core.metrics import register_bulkhead, register_cache
+from app.services.gemini_client import GeminiClient, UpstreamError, CircuitOpenError
+from app.api.deps import require_admin
 
 # --- API Configuration ---
 
@@ -12,21 +20,72 @@ router = APIRouter(prefix="/api/chat", tags=["AI Assistant"])
 # 1. SECURITY CRITICAL: Load the API Key from the server's environment variables
 # This ensures the key is never exposed in client-side code.
 GEMINI_API_KEY = settings.GEMINI_API_KEY
-GEMINI_MODEL = "gemini-2.5-flash-preview-09-2025"
-GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/models"
 
+# Help-desk questions repeat a lot; identical (normalized) queries share one answer,
+# and concurrent identical queries share one upstream call.
+chat_cache = SingleFlightCache(
+    TTLCache(maxsize=settings.CHAT_CACHE_MAX_SIZE, ttl=settings.CHAT_CACHE_TTL_SECONDS)
+)
+register_cache("chat", chat_cache)
 
-def parse_gemini_response(result: Dict[str, Any]) -> ChatResponse:
-    """Parses the raw Gemini API response JSON into the structured ChatResponse schema."""
-    candidate = result.get('candidates', [{}])[0]
-    
-    # Extract generated text
-    text = candidate.get('content', {}).get('parts', [{}])[0].get('text', "Sorry, I couldn't process that query.")
+# Caps in-flight Gemini calls in this worker, so a burst of chatbot usage queues
+# (briefly, fairly per user) or is turned away instead of swamping the worker.
+gemini_bulkhead = Bulkhead(
+    max_concurrent=settings.CHAT_MAX_CONCURRENT_CALLS,
+    max_queue=settings.CHAT_MAX_QUEUED_CALLS,
+    queue_timeout=settings.CHAT_QUEUE_TIMEOUT_SECONDS,
+    per_key_limit=settings.CHAT_MAX_CALLS_PER_USER,
+)
+register_bulkhead("gemini", gemini_bulkhead)
+
+
+def normalize_query(query: str) -> str:
+    """Case, whitespace and trailing punctuation do not change the question."""
+    return re.sub(r"\s+", " ", query).strip().rstrip("?!.").strip().lower()
+
+
+def get_gemini_client(request: Request) -> GeminiClient:
+    """The process-wide client created in the app lifespan (see app/main.py)."""
+    return request.app.state.gemini_client
+
+
+def get_client_key(request: Request) -> str:
+    """
+    Who a chat call is counted against for fair sharing: the user of a valid bearer
+    token if one is sent, otherwise the client address. The chat routes themselves
+    do not require a login.
+    """
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            user_id = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.ALGORITHM]).get("sub")
+            if user_id is not None:
+                return f"user:{user_id}"
+        except JWTError:
+            pass
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def build_gemini_payload(query: str) -> Dict[str, Any]:
+    """Construct the payload for the external Gemini API."""
+    return {
+        "contents": [{"parts": [{"text": query}]}],
+        # Enable Google Search grounding tool
+        "tools": [{"google_search": {}}],
+    }
 
+
+def candidate_text(candidate: Dict[str, Any]) -> str:
+    """Concatenated text of a candidate's parts (empty if it has none)."""
+    parts = candidate.get('content', {}).get('parts', [])
+    return "".join(part.get('text', "") for part in parts)
+
+
+def candidate_sources(candidate: Dict[str, Any]) -> List[Source]:
+    """Extract grounding sources/citations (if Google Search was used)."""
     sources: List[Source] = []
     grounding_metadata = candidate.get('groundingMetadata')
-    
-    # Extract grounding sources/citations (if Google Search was used)
+
     if grounding_metadata and grounding_metadata.get('groundingAttributions'):
         for attribution in grounding_metadata['groundingAttributions']:
             web_info = attribution.get('web')
@@ -35,12 +94,64 @@ def parse_gemini_response(result: Dict[str, Any]) -> ChatResponse:
                     uri=web_info['uri'],
                     title=web_info['title']
                 ))
-    
-    return ChatResponse(text=text, sources=sources)
+    return sources
+
+
+def parse_gemini_response(result: Dict[str, Any]) -> ChatResponse:
+    """Parses the raw Gemini API response JSON into the structured ChatResponse schema."""
+    candidate = result.get('candidates', [{}])[0]
+
+    text = candidate_text(candidate) or "Sorry, I couldn't process that query."
+    return ChatResponse(text=text, sources=candidate_sources(candidate))
+
+
+def sse_event(event: str, data: Any) -> str:
+    """One server-sent event frame with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def upstream_http_error(e: Union[UpstreamError, BulkheadFullError]) -> HTTPException:
+    """Maps a Gemini client failure onto the status returned to our own client."""
+    if isinstance(e, BulkheadFullError):
+        # Too many chat calls in flight already: turn this one away right now
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The AI assistant is busy, please try again shortly.",
+            headers={"Retry-After": str(max(1, round(e.retry_after)))}
+        )
+    if isinstance(e, CircuitOpenError):
+        # Upstream kept failing recently: fail fast instead of queueing more calls
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="External AI service is temporarily unavailable.",
+            headers={"Retry-After": str(max(1, round(e.retry_after)))}
+        )
+    # Handle errors returned by the Gemini API (e.g., 400, 429) and timeouts
+    print(f"Gemini API Error: {e}")
+    return HTTPException(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT if e.timeout else status.HTTP_502_BAD_GATEWAY,
+        detail="External AI service failed to process request."
+    )
+
+
+@router.get("/cache/stats", dependencies=[Depends(require_admin)])
+async def chat_cache_stats():
+    """Hit ratio, coalesced calls and estimated upstream latency saved by this worker's chat cache."""
+    return chat_cache.stats()
+
+
+@router.get("/bulkhead/stats", dependencies=[Depends(require_admin)])
+async def chat_bulkhead_stats():
+    """In-flight calls, queue depth, queue wait times and rejections of this worker's Gemini bulkhead."""
+    return gemini_bulkhead.stats()
 
 
 @router.post("/", response_model=ChatResponse)
-async def chat_proxy(payload: ChatQuery):
+async def chat_proxy(
+    payload: ChatQuery,
+    gemini: GeminiClient = Depends(get_gemini_client),
+    client_key: str = Depends(get_client_key),
+):
     """
     Acts as a secure server-side proxy for the Gemini API.
     
@@ -54,50 +165,121 @@ async def chat_proxy(payload: ChatQuery):
             detail="Server configuration error: Gemini API Key is missing."
         )
 
-    # Full URL for the API call
-    gemini_url = f"{GEMINI_BASE_URL}/{GEMINI_MODEL}:generateContent?key={GEMINI_API_KEY}"
-
-    # Construct the payload for the external Gemini API
-    gemini_payload = {
-        "contents": [{"parts": [{"text": payload.query}]}],
-        # Enable Google Search grounding tool
-        "tools": [{"google_search": {}}], 
-    }
+    gemini_payload = build_gemini_payload(payload.query)
 
     try:
-        # Make the secure server-to-server request
-        # Note: In an async FastAPI app, using 'requests' (which is synchronous) 
-        # inside an async route is generally discouraged for performance 
-        # (it blocks the event loop). For small, quick proxies like this, 
-        # it's often acceptable, but for high-load apps, consider 'httpx'.
-        response = requests.post(
-            gemini_url, 
-            headers={"Content-Type": "application/json"},
-            json=gemini_payload
-        )
-        response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
+        async def ask_gemini() -> ChatResponse:
+            # Non-blocking call over the shared keep-alive pool, with timeouts,
+            # retries on 429/5xx and a circuit breaker (see app/services/gemini_client.py)
+            async with gemini_bulkhead.slot(client_key):
+                gemini_result = await gemini.generate_content(gemini_payload)
 
-        # Parse the JSON response from Gemini
-        gemini_result = response.json()
-        
-        # Parse and validate the result against the Pydantic schema
-        parsed_data = parse_gemini_response(gemini_result)
+            # Parse and validate the result against the Pydantic schema
+            return parse_gemini_response(gemini_result)
 
         # Return the structured data to the client
-        return parsed_data
+        return await chat_cache.get_or_load(normalize_query(payload.query), ask_gemini)
 
-    except requests.exceptions.HTTPError as e:
-        # Handle errors returned by the Gemini API (e.g., 400, 429)
-        error_detail = response.text
-        print(f"Gemini API Error: {e}, Detail: {error_detail}")
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY, # Indicate failure with external service
-            detail="External AI service failed to process request."
-        )
+    except (UpstreamError, BulkheadFullError) as e:
+        raise upstream_http_error(e)
     except Exception as e:
-        # Handle general errors (network, parsing, etc.)
+        # Handle general errors (parsing, etc.)
         print(f"Internal Server Error during chat proxy: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
             detail="An unexpected error occurred on the server."
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/stream")
+async def chat_stream(
+    payload: ChatQuery,
+    gemini: GeminiClient = Depends(get_gemini_client),
+    client_key: str = Depends(get_client_key),
+):
+    """
+    Streaming variant of the chat proxy, as server-sent events.
+
+    Proxies Gemini's streamGenerateContent: each `chunk` event carries the next piece
+    of answer text as soon as it arrives, a final `sources` event the grounding
+    citations, then `done`. A failure after the stream started is sent as an
+    `error` event, since the status line has already gone out by then.
+    """
+
+    if not GEMINI_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Server configuration error: Gemini API Key is missing."
+        )
+
+    cache_key = normalize_query(payload.query)
+    cached = chat_cache.cache.get(cache_key)
+    finish = None
+
+    if cached is not None:
+        async def events() -> AsyncIterator[str]:
+            # Answered before (by either endpoint): replay it as a single chunk
+            yield sse_event("chunk", {"text": cached.text})
+            yield sse_event("sources", [source.model_dump() for source in cached.sources])
+            yield sse_event("done", {})
+    else:
+        # The bulkhead slot is held until the stream has been fully relayed
+        try:
+            await gemini_bulkhead.acquire(client_key)
+        except BulkheadFullError as e:
+            raise upstream_http_error(e)
+
+        try:
+            # Opened before the response starts, so upstream failures to connect
+            # still get a proper status code (503/504/502) rather than an SSE error
+            upstream = await gemini.open_stream(build_gemini_payload(payload.query))
+        except BaseException as e:
+            gemini_bulkhead.release(client_key)
+            if isinstance(e, UpstreamError):
+                raise upstream_http_error(e)
+            raise
+
+        released = False
+
+        async def finish() -> None:
+            # Runs from the generator and again as the response's background task,
+            # which also covers a client that disconnects before the body starts
+            nonlocal released
+            if not released:
+                released = True
+                gemini_bulkhead.release(client_key)
+            await upstream.aclose()
+
+        async def events() -> AsyncIterator[str]:
+            text_parts: List[str] = []
+            sources: List[Source] = []
+            try:
+                async for result in gemini.iter_stream_chunks(upstream):
+                    candidate = result.get('candidates', [{}])[0]
+                    text = candidate_text(candidate)
+                    if text:
+                        text_parts.append(text)
+                        yield sse_event("chunk", {"text": text})
+                    # Grounding metadata arrives with the last chunks; keep the latest
+                    sources = candidate_sources(candidate) or sources
+            except UpstreamError as e:
+                print(f"Gemini API Error during stream: {e}")
+                yield sse_event("error", {"detail": "External AI service failed to process request."})
+                return
+            finally:
+                await finish()
+
+            yield sse_event("sources", [source.model_dump() for source in sources])
+            yield sse_event("done", {})
+
+            # Only complete answers are cached; the non-streaming endpoint shares them
+            if text_parts:
+                chat_cache.cache.set(cache_key, ChatResponse(text="".join(text_parts), sources=sources))
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies (nginx) from buffering the stream or caching it
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(finish) if finish else None,
+    )
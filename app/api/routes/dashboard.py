@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_current_user, require_admin
+from app.db.models.user import User
+from app.schemas.dashboard import DashboardSummary
+from app.services.dashboard import dashboard_cache, get_dashboard_summary
+
+router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
+
+
+@router.get("/summary", response_model=DashboardSummary)
+async def dashboard_summary(current_user: User = Depends(get_current_user)):
+    """
+    The current user's dashboard in one request: the applications they own counted
+    by status and category, the tickets they created counted by status, and their
+    most recent tickets. Cached per user for DASHBOARD_CACHE_TTL_SECONDS.
+    """
+    return await get_dashboard_summary(current_user.id)
+
+
+@router.get("/cache/stats", dependencies=[Depends(require_admin)])
+def dashboard_cache_stats():
+    """Hit/miss counters of this worker's dashboard summary cache."""
+    return dashboard_cache.stats()
@@ -1,62 +1,111 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, UploadFile, File
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, desc
-from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List, Literal, Optional
 from app.db.models.ticket import Ticket, TicketStatus
 from app.db.models.user import User 
-from app.schemas.ticket import TicketCreate, TicketOut, TicketUpdate
-from app.api.deps import get_db, get_current_user, require_admin
+from app.db.database import engine
+from app.schemas.ticket import TicketCreate, TicketOut, TicketUpdate, TicketPage, TicketImportResult
+from app.api.deps import get_db, get_async_db, get_current_user, require_admin
+from app.api.pagination import page_limit, paginate_async
+from app.api.etag import not_modified, page_fingerprint, row_fingerprint, weak_etag
+from app.core.config import settings
+from app.services.dashboard import invalidate_dashboard
+from app.services.ticket_export import EXPORT_COLUMNS, MEDIA_TYPES, iter_ticket_export
+from app.services.ticket_import import TicketImportFileError, import_tickets
+from app.services.ticket_search import search_tickets
+from app.services.ticket_stats import count_tickets, ticket_key
 
 router = APIRouter(prefix="/api/tickets", tags=["Tickets"])
 
+def filter_tickets(query, current_user, dashboard: bool, appId: Optional[int], status: Optional[TicketStatus]):
+    """The role and query-string filters shared by the list and export endpoints."""
+    if current_user.role != "Admin":
+        # Regular user filtering: only show tickets created by them
+        query = query.filter(Ticket.created_by == current_user.id)
+    
+    if dashboard is True:
+        query = query.filter(Ticket.created_by == current_user.id)
+
+    if appId:
+        query = query.filter(Ticket.application_id == appId)
+
+    if status:
+        query = query.filter(Ticket.status == status)
+
+    return query
+
 # ====================================================================
 # [GET] LIST: Retrieve a list of tickets (filtered by user role)
 # ====================================================================
-@router.get("/", response_model=List[TicketOut])
-def list_tickets(
+@router.get("/", response_model=TicketPage)
+async def list_tickets(
+    request: Request,
+    response: Response,
     dashboard: bool = Query(False, description="Set to true to filter only tickets owned by the current user"),
     appId: Optional[int] = Query(None, description="Get all tickets of app"),
-    search: Optional[str] = Query(None, description="Search by ticket title"),
+    search: Optional[str] = Query(None, description="Search by ticket title/description, or by ticket, application or creator id"),
     status: Optional[TicketStatus] = Query(None),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque cursor returned as next_cursor by the previous page"),
+    limit: int = Depends(page_limit),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Lists all tickets for Admins.
     Lists only tickets created by the current user for regular Users.
+    Results are paged newest first by (created_at, id).
+    Sends a weak ETag and answers 304 when If-None-Match already has this page.
     """
-    query = db.query(Ticket)
+    query = filter_tickets(select(Ticket), current_user, dashboard, appId, status)
 
-    if current_user.role != "Admin":
-        # Regular user filtering: only show tickets created by them
-        query = query.filter(Ticket.created_by == current_user.id)
-    
-    if dashboard is True:
-        query = query.filter(Ticket.created_by == current_user.id)
+    if search and search.strip():
+        # Ranked full-text/trigram search; best matches first, id breaks ties
+        query, rank = search_tickets(query, search, db.bind.dialect.name)
+        rows, next_cursor = await paginate_async(db, query, [rank, Ticket.id], cursor, limit)
+        items = [ticket for ticket, _ in rows]
+    else:
+        # Newest first; id breaks ties so the keyset order is stable
+        rows, next_cursor = await paginate_async(db, query, [Ticket.created_at, Ticket.id], cursor, limit)
+        items = [ticket for (ticket,) in rows]
 
-    if appId:
-        query = query.filter(Ticket.application_id == appId)
+    # Same query string and same rows: the same body, whoever asks
+    etag = weak_etag(request.url.query, next_cursor, page_fingerprint(items))
+    return not_modified(request, response, etag) or {"items": items, "next_cursor": next_cursor}
 
-    if status:
-        query = query.filter(Ticket.status == status)
+# ====================================================================
+# [GET] EXPORT: Stream every matching ticket as CSV or NDJSON
+# ====================================================================
+@router.get("/export")
+async def export_tickets(
+    format: Literal["csv", "ndjson"] = Query("csv"),
+    dashboard: bool = Query(False, description="Set to true to filter only tickets owned by the current user"),
+    appId: Optional[int] = Query(None, description="Get all tickets of app"),
+    search: Optional[str] = Query(None, description="Search by ticket title/description, or by ticket, application or creator id"),
+    status: Optional[TicketStatus] = Query(None),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Exports all tickets matching the same filters as the list endpoint, unpaged,
+    in the same order. Rows are read from a server-side cursor and streamed in
+    batches, so the first bytes go out right away and memory use does not grow
+    with the number of tickets.
+    """
+    query = filter_tickets(select(*EXPORT_COLUMNS), current_user, dashboard, appId, status)
 
-    if search:
-        search_pattern = f"%{search}%"
-        query = query.filter(
-            or_(
-                Ticket.id.ilike(search_pattern),
-                Ticket.title.ilike(search_pattern),
-                Ticket.description.ilike(search_pattern),
-                Ticket.application_id.ilike(search_pattern),
-                Ticket.created_by.ilike(search_pattern)
-            )
-        )
+    if search and search.strip():
+        query, rank = search_tickets(query, search, engine.dialect.name)
+        query = query.order_by(rank.desc(), Ticket.id.desc())
+    else:
+        query = query.order_by(Ticket.created_at.desc(), Ticket.id.desc())
 
-    tickets = query.order_by(
-        desc(Ticket.created_at),  # Order by created_at, newest first
-        desc(Ticket.updated_at)   # Then by updated_at, newest first
-    ).all()
-    return tickets
+    return StreamingResponse(
+        iter_ticket_export(query, format, settings.TICKET_EXPORT_BATCH_SIZE),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tickets.{format}"'},
+    )
 
 # ====================================================================
 # [POST] CREATE: Create a new ticket
@@ -74,27 +123,64 @@ def create_ticket(
     
     ticket_data = payload.dict()
     ticket_data["created_by"] = current_user.id
+    ticket_data["status"] = TicketStatus.open
     ticket_obj = Ticket(**ticket_data)
     
     db.add(ticket_obj)
+    count_tickets(db, {ticket_key(ticket_obj.application_id, ticket_obj.status): 1})
     db.commit()
+    invalidate_dashboard(current_user.id)
     db.refresh(ticket_obj)
 
     return ticket_obj
 
+# ====================================================================
+# [POST] IMPORT: Create many tickets from a CSV or NDJSON upload
+# ====================================================================
+@router.post("/import", response_model=TicketImportResult)
+def import_ticket_file(
+    file: UploadFile = File(..., description="CSV with a title,description,application_id header, or NDJSON"),
+    format: Optional[Literal["csv", "ndjson"]] = Query(None, description="Defaults to ndjson for .ndjson/.jsonl files, csv otherwise"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Bulk-creates tickets, e.g. when migrating from another system. Admin only.
+    Each row is validated like POST /create; valid rows are imported, invalid ones
+    are skipped and listed by row number. All imported rows commit together.
+    """
+    if format is None:
+        format = "ndjson" if (file.filename or "").lower().endswith((".ndjson", ".jsonl")) else "csv"
+
+    try:
+        result = import_tickets(
+            db, file.file, format, current_user.id,
+            batch_size=settings.TICKET_IMPORT_BATCH_SIZE,
+            max_errors=settings.TICKET_IMPORT_MAX_ERRORS,
+        )
+    except TicketImportFileError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    db.commit()
+    invalidate_dashboard(current_user.id)
+    return result
+
 # ====================================================================
 # [GET] RETRIEVE: Get a single ticket
 # ====================================================================
 @router.get("/{ticket_id}", response_model=TicketOut)
-def get_ticket(
+async def get_ticket(
     ticket_id: int, 
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Retrieves a ticket by its ID. Requires user to be the creator or an Admin.
     """
-    ticket_obj = db.query(Ticket).get(ticket_id)
+    ticket_obj = await db.get(Ticket, ticket_id)
     if not ticket_obj:
         raise HTTPException(status_code=404, detail="Ticket not found")
 
@@ -105,7 +191,8 @@ def get_ticket(
             detail="Not authorized to access this ticket"
         )
     
-    return ticket_obj
+    etag = weak_etag(row_fingerprint(ticket_obj))
+    return not_modified(request, response, etag) or ticket_obj
 
 # ====================================================================
 # [PUT] UPDATE: Update the ticket
@@ -117,7 +204,9 @@ def update_ticket(
     db: Session = Depends(get_db), 
     current_user: User = Depends(get_current_user)
 ):
-    ticket_obj = db.query(Ticket).get(ticket_id)
+    # Locked until the commit: a concurrent status change waits and then starts from
+    # this one's result, so the counters move from the status the row really had
+    ticket_obj = db.get(Ticket, ticket_id, with_for_update=True)
     if not ticket_obj:
         raise HTTPException(status_code=404, detail="Ticket not found")
 
@@ -139,12 +228,17 @@ def update_ticket(
         # Admin can update all fields
         update_data = payload.dict(exclude_unset=True)
 
+    old_key = ticket_key(ticket_obj.application_id, ticket_obj.status)
     for k, v in update_data.items():
         setattr(ticket_obj, k, v)
+    new_key = ticket_key(ticket_obj.application_id, ticket_obj.status)
     
     db.add(ticket_obj)
+    if new_key != old_key:
+        count_tickets(db, {old_key: -1, new_key: 1})
     db.commit()
     db.refresh(ticket_obj)
+    invalidate_dashboard(ticket_obj.created_by)
 
     return ticket_obj
 
@@ -156,11 +250,16 @@ def delete_ticket(ticket_id: int, db: Session = Depends(get_db)):
     """
     Deletes a ticket. Restricted to Admin role.
     """
-    ticket_obj = db.query(Ticket).get(ticket_id)
+    # Locked like in update_ticket: a concurrent delete of the same ticket waits, then
+    # finds no row and answers 404 instead of decrementing the counter a second time
+    ticket_obj = db.get(Ticket, ticket_id, with_for_update=True)
     if not ticket_obj:
         raise HTTPException(status_code=404, detail="Ticket not found")
         
+    created_by = ticket_obj.created_by
     db.delete(ticket_obj)
+    count_tickets(db, {ticket_key(ticket_obj.application_id, ticket_obj.status): -1})
     db.commit()
+    invalidate_dashboard(created_by)
     # Return 204 No Content on successful deletion
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,21 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, select
 from typing import List, Optional
 from app.db.models.user import User
 from app.db.models.user_application_access import UserApplicationAccess
-from app.schemas.user import UserOut, UserUpdate 
-from app.api.deps import get_db, get_current_user, require_admin
+from app.schemas.user import UserOut, UserUpdate, UserPage
+from app.api.deps import get_db, get_async_db, get_current_user, require_admin, invalidate_cached_user, user_cache
+from app.api.pagination import page_limit, paginate_async
+from app.services.dashboard import invalidate_dashboard
+from app.services.permissions import bump_permission_version, permission_index
 
 
 router = APIRouter(prefix="/api/users", tags=["Users"])
 
-@router.get("/", response_model=List[UserOut], dependencies=[Depends(require_admin)])
-def list_users(
+@router.get("/", response_model=UserPage, dependencies=[Depends(require_admin)])
+async def list_users(
     search: Optional[str] = Query(None, description="Search by user full name or email"), 
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor returned as next_cursor by the previous page"),
+    limit: int = Depends(page_limit),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    query = db.query(User)
+    query = select(User)
     
     if search:
         search_pattern = f"%{search}%"
@@ -26,17 +32,23 @@ def list_users(
             )
         )
     
-    users = query.order_by(User.full_name).all()
-    # print("\n\n",users[0].full_name,"\n\n")
-    return users
+    # Alphabetical, with id as tie-breaker for users sharing a name
+    rows, next_cursor = await paginate_async(db, query, [User.full_name, User.id], cursor, limit, descending=False)
+    return {"items": [user for (user,) in rows], "next_cursor": next_cursor}
+
+
+@router.get("/cache/stats", dependencies=[Depends(require_admin)])
+def user_cache_stats():
+    """Hit/miss counters of this worker's authenticated-user cache."""
+    return user_cache.stats()
 
 
 @router.get("/{user_id}", response_model=UserOut)
-def list_users(
+async def get_user(
     user_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user_obj = db.query(User).get(user_id)
+    user_obj = await db.get(User, user_id)
     if not user_obj:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -56,6 +68,7 @@ def update_user(user_id: int, payload: UserUpdate, db: Session = Depends(get_db)
     db.add(user_obj)
     db.commit()
     db.refresh(user_obj)
+    invalidate_cached_user(user_id)
 
     return user_obj
 
@@ -70,7 +83,11 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
         db.query(UserApplicationAccess).filter(UserApplicationAccess.user_id == user_id).delete(synchronize_session=False)
         
         db.delete(user_obj)
+        version = bump_permission_version(db)
         db.commit()
+        invalidate_cached_user(user_id)
+        invalidate_dashboard(user_id)
+        permission_index.update(version, remove_users=[user_id])
     except Exception as e:
         db.rollback()
         print(f"Error during user deletion: {e}")
@@ -0,0 +1,144 @@
+"""
+Builds the fingerprinted, precompressed static assets served in production:
+
+    python -m app.build_assets
+
+Copies every file under app/static (except dist/ itself) to app/static/dist/ with
+a content hash in its name, e.g. js/home.js -> js/home.3fa9c0d1e2.js, and writes
+.gz and .br variants of the text files next to it. dist/manifest.json maps source
+paths to built ones for asset_url() in the templates (app/core/assets.py).
+
+Relative ES module imports are rewritten to the hashed names, and modules are
+built after the modules they import, so a module's hash changes whenever one of
+its dependencies does. Without a build (local development) the templates link the
+unhashed files instead.
+"""
+import hashlib
+import json
+import logging
+import posixpath
+import re
+import shutil
+import sys
+import time
+from pathlib import Path
+
+from app.core.assets import DIST_DIR, ENCODINGS, MANIFEST_NAME, STATIC_DIR, brotli, compress
+
+logging.basicConfig(level=logging.INFO, stream=sys.stdout)
+
+COMPRESSIBLE_SUFFIXES = {".js", ".css", ".svg", ".json", ".html", ".txt", ".map"}
+
+# import ... from './x.js', export ... from '../x.js', import './x.js', import('./x.js')
+IMPORT_RE = re.compile(
+    r"""(?P<prefix>\bfrom\s*|\bimport\s*\(?\s*)(?P<quote>['"])(?P<spec>\.{1,2}/[^'"]+?\.js)(?P=quote)"""
+)
+
+
+def source_files():
+    """Paths relative to app/static, in POSIX form: the manifest keys."""
+    return sorted(
+        path.relative_to(STATIC_DIR).as_posix()
+        for path in STATIC_DIR.rglob("*")
+        if path.is_file() and DIST_DIR not in path.parents
+    )
+
+
+def imports_of(name: str, text: str):
+    directory = posixpath.dirname(name)
+    return [
+        posixpath.normpath(posixpath.join(directory, match.group("spec")))
+        for match in IMPORT_RE.finditer(text)
+    ]
+
+
+def build_order(names, texts):
+    """Modules after the modules they import (depth-first); raises on import cycles."""
+    order, done, visiting = [], set(), set()
+
+    def visit(name, chain):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Import cycle: {' -> '.join(chain + [name])}")
+        visiting.add(name)
+        for dependency in imports_of(name, texts[name]) if name in texts else []:
+            if dependency in names:
+                visit(dependency, chain + [name])
+        visiting.discard(name)
+        done.add(name)
+        order.append(name)
+
+    for name in names:
+        visit(name, [])
+    return order
+
+
+def hashed_name(name: str, content: bytes) -> str:
+    digest = hashlib.sha256(content).hexdigest()[:10]
+    stem, suffix = posixpath.splitext(name)
+    return f"{stem}.{digest}{suffix}"
+
+
+def rewrite_imports(name: str, text: str, manifest: dict) -> str:
+    directory = posixpath.dirname(name)
+
+    def replace(match):
+        target = posixpath.normpath(posixpath.join(directory, match.group("spec")))
+        if target not in manifest:
+            return match.group(0)
+        spec = posixpath.relpath(manifest[target], directory or ".")
+        if not spec.startswith("."):
+            spec = "./" + spec
+        return f"{match.group('prefix')}{match.group('quote')}{spec}{match.group('quote')}"
+
+    return IMPORT_RE.sub(replace, text)
+
+
+def write_variants(path: Path, content: bytes):
+    """Writes the file and, for text types, its .gz and .br variants; returns their sizes."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    sizes = {"raw": len(content)}
+    if path.suffix not in COMPRESSIBLE_SUFFIXES:
+        return sizes
+
+    suffixes = dict(ENCODINGS)
+    for encoding, variant in compress(content).items():
+        path.with_name(path.name + suffixes[encoding]).write_bytes(variant)
+        sizes[encoding] = len(variant)
+    return sizes
+
+
+def build():
+    started = time.perf_counter()
+    if DIST_DIR.exists():
+        shutil.rmtree(DIST_DIR)
+
+    names = source_files()
+    texts = {name: (STATIC_DIR / name).read_text(encoding="utf-8") for name in names if name.endswith(".js")}
+
+    manifest = {}
+    totals = {"raw": 0, "gzip": 0, "br": 0}
+    for name in build_order(names, texts):
+        if name in texts:
+            content = rewrite_imports(name, texts[name], manifest).encode("utf-8")
+        else:
+            content = (STATIC_DIR / name).read_bytes()
+        manifest[name] = hashed_name(name, content)
+        for key, size in write_variants(DIST_DIR / manifest[name], content).items():
+            totals[key] += size
+
+    (DIST_DIR / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+
+    if brotli is None:
+        logging.warning("brotli is not installed: only gzip variants were written")
+    logging.info(
+        "Built %d assets in %.2fs: %d bytes, %d gzip, %d brotli",
+        len(manifest), time.perf_counter() - started, totals["raw"], totals["gzip"], totals["br"],
+    )
+    return manifest
+
+
+if __name__ == "__main__":
+    build()
@@ -0,0 +1,110 @@
+import gzip
+import json
+import mimetypes
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Scope
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip variants are produced
+    brotli = None
+
+STATIC_DIR = Path(__file__).resolve().parents[1] / "static"
+# Output of `python -m app.build_assets`
+DIST_DIR = STATIC_DIR / "dist"
+MANIFEST_NAME = "manifest.json"
+
+# Built file names change with their content, so browsers may keep them forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Content-coding and file suffix of the precompressed variants, preferred first
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+
+@lru_cache(maxsize=1)
+def load_manifest() -> Dict[str, str]:
+    """Source path -> built path, both relative to app/static; empty without a build."""
+    try:
+        return json.loads((DIST_DIR / MANIFEST_NAME).read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def asset_url(path: str) -> str:
+    """
+    URL of a static asset for the templates, e.g. asset_url("js/home.js"): the
+    fingerprinted build when there is one, the source file otherwise.
+    """
+    built = load_manifest().get(path)
+    return f"/static/dist/{built}" if built else f"/static/{path}"
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    accepted = set()
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = params.strip().removeprefix("q=")
+        try:
+            if params and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def negotiate_encoding(accept_encoding: str, available: Iterable[str]) -> Optional[str]:
+    """The preferred content-coding in `available` that the client accepts, if any."""
+    accepted = accepted_encodings(accept_encoding)
+    available = set(available)
+    return next(
+        (encoding for encoding, _ in ENCODINGS if encoding in accepted and encoding in available),
+        None,
+    )
+
+
+def compress(content: bytes) -> Dict[str, bytes]:
+    """The precompressed variants of `content`, by content-coding."""
+    # mtime=0: the same input always gives the same bytes
+    variants = {"gzip": gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(content, quality=11)
+    return variants
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves the built assets under dist/ with a year-long immutable
+    Cache-Control, and from their .br or .gz variant when the client accepts it.
+    Everything else is served as by StaticFiles.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        built = path.startswith("dist/") and not path.endswith(MANIFEST_NAME)
+        if not built:
+            return await super().get_response(path, scope)
+
+        available = [encoding for encoding, suffix in ENCODINGS if self.lookup_path(path + suffix)[1]]
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), available)
+        if encoding:
+            suffix = dict(ENCODINGS)[encoding]
+            response = await super().get_response(path + suffix, scope)
+            response.headers["Content-Encoding"] = encoding
+            media_type = mimetypes.guess_type(path)[0]
+            if media_type:
+                if media_type.startswith("text/"):
+                    media_type += "; charset=utf-8"
+                response.headers["Content-Type"] = media_type
+        else:
+            response = await super().get_response(path, scope)
+
+        if response.status_code in (200, 304):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+            response.headers["Vary"] = "Accept-Encoding"
+        return response
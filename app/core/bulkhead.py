@@ -0,0 +1,150 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Hashable, Optional
+
+
+class BulkheadFullError(Exception):
+    """The call was rejected instead of queued; retry after `retry_after` seconds."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Bulkhead rejected call: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Bulkhead:
+    """
+    Caps how many calls to one dependency run at once in this worker.
+
+    Calls over the cap wait in a bounded queue for at most `queue_timeout` seconds.
+    Freed slots go to the waiting keys (users) in round-robin order, and each key may
+    hold at most `per_key_limit` running plus queued calls, so one user's burst
+    cannot take every slot. Saturation is reported with BulkheadFullError right
+    away rather than by piling up more waiting requests.
+
+    Meant for a single event loop; no locking is done.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float, per_key_limit: int):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.per_key_limit = per_key_limit
+
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.rejected: Dict[str, int] = {"queue_full": 0, "per_user_limit": 0, "queue_timeout": 0}
+
+        self._per_key: Dict[Hashable, int] = {}
+        self._waiters: "OrderedDict[Hashable, Deque[asyncio.Future]]" = OrderedDict()
+
+    @asynccontextmanager
+    async def slot(self, key: Hashable) -> AsyncIterator[None]:
+        await self.acquire(key)
+        try:
+            yield
+        finally:
+            self.release(key)
+
+    async def acquire(self, key: Hashable) -> None:
+        """Waits for a slot for `key`; every successful acquire() needs one release()."""
+        if self._per_key.get(key, 0) >= self.per_key_limit:
+            self._reject("per_user_limit")
+
+        if self.in_flight < self.max_concurrent and not self.queued:
+            self._admit(key)
+            return
+
+        if self.queued >= self.max_queue:
+            self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, deque()).append(waiter)
+        self._per_key[key] = self._per_key.get(key, 0) + 1
+        self.queued += 1
+        started = time.perf_counter()
+
+        try:
+            done, _ = await asyncio.wait({waiter}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            # The caller went away (client disconnect): give back whatever it had
+            if waiter.done() and not waiter.cancelled():
+                self.release(key)
+            else:
+                self._drop_waiter(key, waiter)
+            raise
+
+        if not done:
+            self._drop_waiter(key, waiter)
+            self._reject("queue_timeout")
+
+        wait = time.perf_counter() - started
+        self.waited += 1
+        self.wait_seconds += wait
+        self.max_wait_seconds = max(self.max_wait_seconds, wait)
+
+    def release(self, key: Hashable) -> None:
+        self.in_flight -= 1
+        self._decrement(key)
+        self._grant_next()
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queued,
+            "admitted": self.admitted,
+            "avg_wait_seconds": self.wait_seconds / self.waited if self.waited else None,
+            "max_wait_seconds": self.max_wait_seconds,
+            "wait_seconds_total": self.wait_seconds,
+            "rejected": dict(self.rejected),
+        }
+
+    def _admit(self, key: Hashable) -> None:
+        self.in_flight += 1
+        self.admitted += 1
+        self._per_key[key] = self._per_key.get(key, 0) + 1
+
+    def _grant_next(self) -> None:
+        while self.in_flight < self.max_concurrent and self._waiters:
+            # Oldest key first, then it goes to the back of the line
+            key, waiters = next(iter(self._waiters.items()))
+            waiter = waiters.popleft()
+            if waiters:
+                self._waiters.move_to_end(key)
+            else:
+                del self._waiters[key]
+
+            self.queued -= 1
+            # The per-key count already includes this waiter
+            self.in_flight += 1
+            self.admitted += 1
+            waiter.set_result(None)
+
+    def _drop_waiter(self, key: Hashable, waiter: "asyncio.Future") -> None:
+        waiters = self._waiters.get(key)
+        if waiters is not None and waiter in waiters:
+            waiters.remove(waiter)
+            if not waiters:
+                del self._waiters[key]
+            self.queued -= 1
+            self._decrement(key)
+        waiter.cancel()
+
+    def _decrement(self, key: Hashable) -> None:
+        remaining = self._per_key.get(key, 0) - 1
+        if remaining > 0:
+            self._per_key[key] = remaining
+        else:
+            self._per_key.pop(key, None)
+
+    def _reject(self, reason: str) -> None:
+        self.rejected[reason] += 1
+        raise BulkheadFullError(reason, retry_after=self.queue_timeout)
@@ -0,0 +1,150 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe, size-bounded LRU cache whose entries expire `ttl` seconds after being set.
+    Keeps hit/miss counters so callers can report how effective the cache is.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else None,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+            }
+
+
+class SingleFlightCache:
+    """
+    Async front for a TTLCache: concurrent misses for the same key share a single
+    call to the loader instead of each making their own.
+
+    The shared load runs as its own task, so a caller that disconnects does not
+    cancel the result the other waiters are waiting for. Failures are not cached.
+
+    Invalidate through invalidate()/clear() rather than on the TTLCache: a load that
+    was already running when its key was invalidated read the data from before the
+    change, so its result is returned to its waiters but not cached.
+    """
+
+    def __init__(self, cache: TTLCache):
+        self.cache = cache
+        self.coalesced = 0
+        self.loads = 0
+        self.load_seconds = 0.0
+        self._in_flight: Dict[Hashable, "asyncio.Future"] = {}
+        # Bumped per key by invalidate() and for every key by clear(). Invalidations
+        # come from threadpool threads too, hence the lock.
+        self._generations: Dict[Hashable, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def _generation(self, key: Hashable) -> tuple:
+        return self._epoch, self._generations.get(key, 0)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self.cache.invalidate(key)
+            # Later callers start a fresh load instead of joining the stale one
+            self._in_flight.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._generations.clear()
+            self.cache.clear()
+            self._in_flight.clear()
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, loader))
+            self._in_flight[key] = task
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.perf_counter()
+        with self._lock:
+            generation = self._generation(key)
+        try:
+            value = await loader()
+            with self._lock:
+                if self._generation(key) == generation:
+                    self.cache.set(key, value)
+            self.loads += 1
+            self.load_seconds += time.perf_counter() - started
+            return value
+        finally:
+            # An invalidation may have replaced this load with a newer one
+            if self._in_flight.get(key) is asyncio.current_task():
+                self._in_flight.pop(key, None)
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        stats = self.cache.stats()
+        avg_load_seconds = self.load_seconds / self.loads if self.loads else None
+        served_without_load = stats["hits"] + self.coalesced
+        stats.update({
+            "coalesced": self.coalesced,
+            "loads": self.loads,
+            "in_flight": len(self._in_flight),
+            "avg_load_seconds": avg_load_seconds,
+            # Estimated from the average upstream latency of the loads we did make
+            "latency_saved_seconds": served_without_load * avg_load_seconds if avg_load_seconds else 0.0,
+        })
+        return stats
@@ -1,3 +1,4 @@
+from typing import Literal
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -7,6 +8,93 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     ADMIN_CREATION_SECRET: str
     GEMINI_API_KEY: str
+    GEMINI_MODEL: str = "gemini-2.5-flash-preview-09-2025"
+    GEMINI_BASE_URL: str = "https://generativelanguage.googleapis.com/v1beta/models"
+
+    # Shared Gemini HTTP client (app/services/gemini_client.py)
+    GEMINI_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    GEMINI_READ_TIMEOUT_SECONDS: float = 60.0
+    GEMINI_MAX_RETRIES: int = 2
+    GEMINI_MAX_CONNECTIONS: int = 20
+    GEMINI_BREAKER_FAILURE_THRESHOLD: int = 5
+    GEMINI_BREAKER_RESET_SECONDS: float = 30.0
+
+    # Normalized-query cache of /api/chat answers
+    CHAT_CACHE_TTL_SECONDS: int = 3600
+    CHAT_CACHE_MAX_SIZE: int = 512
+
+    # Bulkhead for outbound Gemini calls, per worker (app/core/bulkhead.py)
+    CHAT_MAX_CONCURRENT_CALLS: int = 8
+    CHAT_MAX_QUEUED_CALLS: int = 32
+    CHAT_QUEUE_TIMEOUT_SECONDS: float = 10.0
+    CHAT_MAX_CALLS_PER_USER: int = 2
+
+    # Serve the hot read routes through AsyncSession (asyncpg); False keeps them on
+    # the sync engine, with each query dispatched to the threadpool
+    DB_ASYNC: bool = True
+
+    # Connection pools (app/db/database.py). Each worker process has its own pool per
+    # engine, sync and async: size for workers * 2 * (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    # connections at most, below the server's max_connections.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # seconds a checkout waits before failing
+    DB_POOL_RECYCLE: int = 1800  # replace connections older than this; -1 keeps them
+    # Ping a connection before use: on every checkout, only after it sat idle in the
+    # pool for DB_POOL_PRE_PING_IDLE_SECONDS, or never
+    DB_POOL_PRE_PING: Literal["always", "idle", "never"] = "idle"
+    DB_POOL_PRE_PING_IDLE_SECONDS: float = 60.0
+    # Behind PgBouncer (transaction pooling): no app-side pool, no prepared statement
+    # cache and no search_path startup parameter
+    DB_PGBOUNCER: bool = False
+    # Direct (not pooled) URL for migrations, required with DB_PGBOUNCER: the migration
+    # lock is a session-level advisory lock held across several transactions, which
+    # transaction pooling would spread over different server connections
+    MIGRATION_DATABASE_URL: str = ""
+    # Log checkouts that take longer than this (waiting for a free connection)
+    DB_POOL_WAIT_LOG_MS: float = 100.0
+
+    # Log every SQL statement (SQLAlchemy echo); local debugging only
+    DB_ECHO: bool = False
+
+    # Query instrumentation (app/db/instrumentation.py)
+    SQL_SLOW_QUERY_MS: float = 200.0
+    SQL_SLOW_QUERY_SAMPLE_RATE: float = 1.0  # share of slow queries that get logged
+    SQL_N_PLUS_ONE_THRESHOLD: int = 10  # same statement this often in one request
+    SQL_TIMING_HEADERS: bool = True  # Server-Timing: db;dur=...;desc="N queries"
+
+    # If set, GET /metrics requires `Authorization: Bearer <METRICS_TOKEN>`
+    METRICS_TOKEN: str = ""
+
+    # Upgrade the database when the app is imported (app/main.py). Turn off where
+    # migrations run as a separate pre-deploy step: `python -m app.init_db`
+    RUN_MIGRATIONS_ON_STARTUP: bool = True
+
+    # Most changes accepted by one POST /api/access/batch request
+    ACCESS_BATCH_MAX_ITEMS: int = 5000
+
+    # Rows fetched from the server-side cursor per chunk of GET /api/tickets/export
+    TICKET_EXPORT_BATCH_SIZE: int = 1000
+
+    # POST /api/tickets/import: rows validated and inserted per batch, and failures
+    # listed in the response (the rest are only counted)
+    TICKET_IMPORT_BATCH_SIZE: int = 10000
+    TICKET_IMPORT_MAX_ERRORS: int = 1000
+
+    # In-memory permission index (app/services/permissions.py): how often a worker
+    # checks whether another one changed permissions, and the longest it keeps a copy
+    PERMISSION_INDEX_CHECK_SECONDS: float = 1.0
+    PERMISSION_INDEX_MAX_AGE_SECONDS: float = 300.0
+
+    # Authenticated-user cache used by get_current_user
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 1024
+
+    # GET /api/dashboard/summary: per-user cache (dropped on this worker's ticket and
+    # application writes; other workers see changes after the TTL) and recent tickets
+    DASHBOARD_CACHE_TTL_SECONDS: int = 30
+    DASHBOARD_CACHE_MAX_SIZE: int = 1024
+    DASHBOARD_RECENT_TICKETS: int = 5
     
     class Config:
         env_file = ".env"
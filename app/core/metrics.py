@@ -0,0 +1,201 @@
+import time
+from typing import Callable, List, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# --- Metrics updated on the hot path (label lookups and an observe, nothing more) ---
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests handled, by route template.", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time to handle an HTTP request, until the response body was sent.",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being handled.", ["method"])
+
+DB_POOL_CHECKOUT = Histogram(
+    "db_pool_checkout_seconds",
+    "Time to get a connection from the pool: waiting for a free one, opening a new one and pre-ping.",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+
+GEMINI_LATENCY = Histogram(
+    "gemini_request_duration_seconds",
+    "Time of a Gemini API call including retries, by outcome.",
+    ["endpoint", "outcome"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0),
+)
+
+
+# --- Metrics read from existing objects at scrape time ---
+
+class StatsCollector:
+    """
+    Turns the stats() of caches, bulkheads, connection pools and the permission index into metrics when
+    /metrics is scraped, so keeping them costs nothing per request. Objects are
+    registered by the modules that create them.
+    """
+
+    def __init__(self):
+        self.caches: List[Tuple[str, object]] = []
+        self.bulkheads: List[Tuple[str, object]] = []
+        self.pools: List[Tuple[str, Callable[[], object]]] = []
+        self.permission_indexes: List[object] = []
+
+    def collect(self):
+        yield from self._collect_caches()
+        yield from self._collect_bulkheads()
+        yield from self._collect_pools()
+        yield from self._collect_permission_indexes()
+
+    def _collect_caches(self):
+        hits = CounterMetricFamily("cache_hits", "Cache lookups that found a value.", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Cache lookups that found nothing.", labels=["cache"])
+        size = GaugeMetricFamily("cache_entries", "Entries currently in the cache.", labels=["cache"])
+        coalesced = CounterMetricFamily(
+            "cache_coalesced", "Misses that waited for another caller's load instead of loading.", labels=["cache"]
+        )
+        for name, cache in self.caches:
+            stats = cache.stats()
+            hits.add_metric([name], stats["hits"])
+            misses.add_metric([name], stats["misses"])
+            size.add_metric([name], stats["size"])
+            if "coalesced" in stats:
+                coalesced.add_metric([name], stats["coalesced"])
+        yield from (hits, misses, size, coalesced)
+
+    def _collect_bulkheads(self):
+        in_flight = GaugeMetricFamily("bulkhead_in_flight", "Calls holding a bulkhead slot.", labels=["bulkhead"])
+        queued = GaugeMetricFamily("bulkhead_queue_depth", "Calls waiting for a bulkhead slot.", labels=["bulkhead"])
+        admitted = CounterMetricFamily("bulkhead_admitted", "Calls given a bulkhead slot.", labels=["bulkhead"])
+        waits = CounterMetricFamily("bulkhead_queue_waits", "Calls that had to queue first.", labels=["bulkhead"])
+        wait_seconds = CounterMetricFamily(
+            "bulkhead_queue_wait_seconds", "Total time calls spent queued.", labels=["bulkhead"]
+        )
+        rejected = CounterMetricFamily(
+            "bulkhead_rejected", "Calls turned away, by reason.", labels=["bulkhead", "reason"]
+        )
+        for name, bulkhead in self.bulkheads:
+            stats = bulkhead.stats()
+            in_flight.add_metric([name], stats["in_flight"])
+            queued.add_metric([name], stats["queue_depth"])
+            admitted.add_metric([name], stats["admitted"])
+            waits.add_metric([name], bulkhead.waited)
+            wait_seconds.add_metric([name], stats["wait_seconds_total"])
+            for reason, count in stats["rejected"].items():
+                rejected.add_metric([name, reason], count)
+        yield from (in_flight, queued, admitted, waits, wait_seconds, rejected)
+
+    def _collect_pools(self):
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size.", labels=["engine"])
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "Connections in use.", labels=["engine"])
+        checked_in = GaugeMetricFamily("db_pool_checked_in", "Idle connections in the pool.", labels=["engine"])
+        overflow = GaugeMetricFamily(
+            "db_pool_overflow", "Connections above pool_size (negative while the pool is not full yet).",
+            labels=["engine"],
+        )
+        for name, get_pool in self.pools:
+            pool = get_pool()
+            # Only queue pools keep these counters (not NullPool or SQLite's StaticPool)
+            if not hasattr(pool, "checkedout"):
+                continue
+            size.add_metric([name], pool.size())
+            checked_out.add_metric([name], pool.checkedout())
+            checked_in.add_metric([name], pool.checkedin())
+            overflow.add_metric([name], pool.overflow())
+        yield from (size, checked_out, checked_in, overflow)
+
+
+    def _collect_permission_indexes(self):
+        version = GaugeMetricFamily("permission_index_version", "Permission version this worker's copy reflects.")
+        loads = CounterMetricFamily("permission_index_loads", "Full reloads of the permission index.")
+        users = GaugeMetricFamily("permission_index_users", "Users with accesses or owned applications in the index.")
+        accesses = GaugeMetricFamily("permission_index_accesses", "Access grants in the index.")
+        age = GaugeMetricFamily("permission_index_age_seconds", "Time since the last full reload.")
+        for index in self.permission_indexes:
+            stats = index.stats()
+            # Nothing to report before the first load
+            if stats["version"] is None:
+                continue
+            version.add_metric([], stats["version"])
+            loads.add_metric([], stats["loads"])
+            users.add_metric([], stats["users"])
+            accesses.add_metric([], stats["accesses"])
+            age.add_metric([], stats["age_seconds"])
+        yield from (version, loads, users, accesses, age)
+
+
+stats_collector = StatsCollector()
+REGISTRY.register(stats_collector)
+
+
+def register_cache(name: str, cache) -> None:
+    stats_collector.caches.append((name, cache))
+
+
+def register_bulkhead(name: str, bulkhead) -> None:
+    stats_collector.bulkheads.append((name, bulkhead))
+
+
+def register_permission_index(index) -> None:
+    stats_collector.permission_indexes.append(index)
+
+
+def register_engine(name: str, engine) -> None:
+    # Looked up on every scrape: dispose() can replace an engine's pool
+    stats_collector.pools.append((name, lambda: engine.pool))
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """The Prometheus text exposition of every metric, and its content type."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """
+    Counts requests and records their latency per route template (e.g.
+    /api/tickets/{ticket_id}), so the label set stays small however many ids are
+    requested. Requests that match no route are grouped under "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight = HTTP_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            # The router sets scope["route"] once it has matched; static files are a mount
+            route = scope.get("route")
+            if route is not None:
+                route_label = route.path
+            elif scope["path"].startswith("/static/"):
+                route_label = "/static"
+            else:
+                route_label = "unmatched"
+
+            labels = (method, route_label, str(status_code))
+            HTTP_REQUESTS.labels(*labels).inc()
+            HTTP_LATENCY.labels(*labels).observe(time.perf_counter() - started)
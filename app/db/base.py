@@ -6,3 +6,5 @@ from app.db.models.user import User
 from app.db.models.application import Application
 from app.db.models.user_application_access import UserApplicationAccess
 from app.db.models.ticket import Ticket
+from app.db.models.permission_index import PermissionIndexVersion
+from app.db.models.ticket_stats import TicketStats
@@ -0,0 +1,55 @@
+import io
+from datetime import datetime
+from enum import Enum
+from typing import List
+
+
+def _copy_value(value):
+    if isinstance(value, Enum):
+        # SQLAlchemy stores Enum members by name: the Postgres enum labels are the names
+        return value.name
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return value
+
+
+def _csv_field(value) -> str:
+    # COPY's csv format reads an unquoted empty field as NULL and a quoted one as an
+    # empty string, so every value is quoted and only None is left empty
+    if value is None:
+        return ""
+    return '"' + str(_copy_value(value)).replace('"', '""') + '"'
+
+
+def copy_rows(dbapi_connection, table: str, columns: List[str], rows: List[dict]) -> None:
+    """Loads rows with COPY ... FROM STDIN, on psycopg2 or psycopg 3. None becomes NULL, "" stays ""."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(",".join(_csv_field(row[column]) for column in columns) + "\n")
+    buffer.seek(0)
+
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    cursor = dbapi_connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):
+            cursor.copy_expert(statement, buffer)
+        else:
+            with cursor.copy(statement) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+
+def bulk_insert(connection, table, rows: List[dict]) -> None:
+    """
+    Inserts `rows` (dicts with the same keys, model values) into a Core `table` in the
+    transaction of the SQLAlchemy `connection`: COPY on Postgres, executemany elsewhere.
+    Column defaults are not applied by COPY, so rows must carry every value they need.
+    """
+    if not rows:
+        return
+    if connection.dialect.name == "postgresql":
+        name = f"{table.schema}.{table.name}" if table.schema else table.name
+        copy_rows(connection.connection.driver_connection, name, list(rows[0]), rows)
+    else:
+        connection.execute(table.insert(), rows)
@@ -1,13 +1,23 @@
-from sqlalchemy import create_engine
+import time
+from contextlib import asynccontextmanager
+from uuid import uuid4
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.pool import NullPool
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
+from app.db.instrumentation import instrument_engine, TimedQueuePool, TimedAsyncQueuePool
+from app.core.metrics import register_engine
 
 # Assuming your connection URL comes from Pydantic settings
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-# Check if the URL already has search_path set (optional, but clean)
-if 'options' not in SQLALCHEMY_DATABASE_URL and 'search_path' not in SQLALCHEMY_DATABASE_URL:
+# Check if the URL already has search_path set (optional, but clean).
+# PgBouncer rejects the `options` startup parameter; tables are schema-qualified anyway.
+if SQLALCHEMY_DATABASE_URL.startswith('postgres') and not settings.DB_PGBOUNCER and 'options' not in SQLALCHEMY_DATABASE_URL and 'search_path' not in SQLALCHEMY_DATABASE_URL:
     # Append the option to explicitly set the search path to public
     if '?' in SQLALCHEMY_DATABASE_URL:
         # If query params already exist, append with '&'
@@ -16,14 +26,91 @@ if 'options' not in SQLALCHEMY_DATABASE_URL and 'search_path' not in SQLALCHEMY_
         # If no query params, append with '?'
         # Note: We use URL encoding for special characters ('=' becomes '%3D')
         SQLALCHEMY_DATABASE_URL += '?options=-csearch_path%3Dpublic'
-        
+
+
+def get_pool_options(backend_name, queue_pool_class):
+    """create_engine() pool arguments from the DB_POOL_* settings."""
+    if backend_name != "postgresql":
+        # SQLite for local development keeps SQLAlchemy's default pool
+        return {"pool_pre_ping": settings.DB_POOL_PRE_PING != "never"}
+
+    if settings.DB_PGBOUNCER:
+        # PgBouncer pools server connections; a second pool here would only pin them
+        return {"poolclass": NullPool}
+
+    return {
+        # Same queue pool as the default, plus checkout timing and slow-wait logging
+        "poolclass": queue_pool_class,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        # A round trip on every checkout; "idle" pings only where it is likely needed
+        "pool_pre_ping": settings.DB_POOL_PRE_PING == "always",
+    }
+
+
+def ping_after_idle(engine, idle_seconds):
+    """
+    Pre-pings only the connections that sat in the pool for `idle_seconds` or more,
+    the ones a server or load balancer may have dropped in the meantime. Connections
+    reused right away skip the round trip that pool_pre_ping=True costs every time.
+    """
+
+    @event.listens_for(engine, "checkin")
+    def remember_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        try:
+            engine.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            # The pool drops this connection and retries the checkout with a new one
+            raise DisconnectionError() from e
+
+
+def attach_sqlite_public_schema(engine):
+    """
+    SQLite has no schemas, but the models live in "public". For local SQLite databases
+    (benchmarks, development) a companion file is attached under that name on every
+    connection: app.db keeps its tables in app.public.db.
+    """
+    database = engine.url.database
+    if not database or database == ":memory:":
+        public_database = ":memory:"
+    else:
+        public_database = f"{database.removesuffix('.db')}.public.db"
+
+    @event.listens_for(engine, "connect")
+    def attach_public(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("ATTACH DATABASE ? AS public", (public_database,))
+        cursor.close()
+
+
+def configure_engine(engine, name):
+    if engine.dialect.name == "sqlite":
+        attach_sqlite_public_schema(engine)
+    if settings.DB_POOL_PRE_PING == "idle" and engine.dialect.name == "postgresql" and not settings.DB_PGBOUNCER:
+        ping_after_idle(engine, settings.DB_POOL_PRE_PING_IDLE_SECONDS)
+    instrument_engine(engine)
+    register_engine(name, engine)
+
+
 # Example of engine creation (using the modified URL):
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, 
-    # The pool_pre_ping is a common fix for cloud connection stability
-    pool_pre_ping=True,
-    echo=True
+    pool_logging_name="sync",
+    # Statement logging is for local debugging only (DB_ECHO=true); query timing,
+    # slow-query and N+1 logging come from app/db/instrumentation.py instead
+    echo=settings.DB_ECHO,
+    **get_pool_options(make_url(SQLALCHEMY_DATABASE_URL).get_backend_name(), TimedQueuePool)
 )
+configure_engine(engine, "sync")
 
 # # 1. engine
 # engine = create_engine(
@@ -44,3 +131,107 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_migration_database_url() -> str:
+    """The URL migrations connect to: MIGRATION_DATABASE_URL, else DATABASE_URL unless pooled."""
+    if settings.MIGRATION_DATABASE_URL:
+        return settings.MIGRATION_DATABASE_URL
+    if settings.DB_PGBOUNCER:
+        raise RuntimeError(
+            "DB_PGBOUNCER is set: migrations need a direct connection to Postgres, "
+            "set MIGRATION_DATABASE_URL to one (not through PgBouncer)"
+        )
+    return settings.DATABASE_URL
+
+
+# 5. Async engine (asyncpg) for the async read routes
+def get_async_database_url():
+    """
+    Derives the async driver URL and connect_args from DATABASE_URL.
+    asyncpg rejects libpq-only query options, so search_path and sslmode are
+    passed through connect_args instead.
+    """
+    url = make_url(settings.DATABASE_URL)
+    connect_args = {}
+
+    if url.get_backend_name() == "postgresql":
+        query = dict(url.query)
+        query.pop("options", None)
+        sslmode = query.pop("sslmode", None)
+        if sslmode:
+            connect_args["ssl"] = sslmode
+        if settings.DB_PGBOUNCER:
+            # Transaction pooling hands each transaction a different server connection,
+            # so named prepared statements must not be cached or reused
+            query["prepared_statement_cache_size"] = "0"
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+        else:
+            connect_args["server_settings"] = {"search_path": "public"}
+        url = url.set(drivername="postgresql+asyncpg", query=query)
+    elif url.get_backend_name() == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+
+    return url, connect_args
+
+
+if settings.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    ASYNC_DATABASE_URL, ASYNC_CONNECT_ARGS = get_async_database_url()
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        connect_args=ASYNC_CONNECT_ARGS,
+        pool_logging_name="async",
+        echo=settings.DB_ECHO,
+        **get_pool_options(ASYNC_DATABASE_URL.get_backend_name(), TimedAsyncQueuePool)
+    )
+    configure_engine(async_engine.sync_engine, "async")
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+else:
+    async_engine = None
+    AsyncSessionLocal = None
+
+
+class ThreadedSession:
+    """
+    Sync fallback for get_async_db when DB_ASYNC is off: exposes the awaitable subset
+    of AsyncSession used by the async routes and runs each call in the threadpool.
+    Results are buffered in the worker thread so iterating them never blocks the loop.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    @property
+    def bind(self):
+        return self.sync_session.bind
+
+    async def execute(self, statement, params=None):
+        frozen = await run_in_threadpool(lambda: self.sync_session.execute(statement, params).freeze())
+        return frozen()
+
+    async def scalar(self, statement, params=None):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params)
+
+    async def get(self, entity, ident):
+        return await run_in_threadpool(self.sync_session.get, entity, ident)
+
+
+# 6. Async dependency in FastAPI
+async def get_async_db():
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+
+    db = SessionLocal()
+    try:
+        yield ThreadedSession(db)
+    finally:
+        await run_in_threadpool(db.close)
+
+
+# Same session outside of request dependencies: `async with async_session_scope() as db:`
+async_session_scope = asynccontextmanager(get_async_db)
@@ -0,0 +1,152 @@
+import logging
+import random
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+from app.core.metrics import DB_POOL_CHECKOUT
+
+logger = logging.getLogger("app.db.sql")
+
+
+class RequestQueryStats:
+    """Queries run on behalf of one HTTP request."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self.total_seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated_statements(self, threshold: int):
+        """Statements run at least `threshold` times: the usual sign of an N+1 query."""
+        return [(statement, n) for statement, n in self.statements.most_common() if n >= threshold]
+
+
+# Set by QueryStatsMiddleware for the duration of a request. Threadpool calls
+# (sync routes, ThreadedSession) run in a copy of the context, so they record
+# into the same object.
+current_query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info["query_start_time"].pop()
+
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, seconds)
+
+    if seconds * 1000 >= settings.SQL_SLOW_QUERY_MS and random.random() < settings.SQL_SLOW_QUERY_SAMPLE_RATE:
+        # Statement only: bound parameters may hold personal data and are rarely needed
+        logger.warning(
+            "slow_query duration_ms=%.1f path=%s statement=%s",
+            seconds * 1000,
+            stats.path if stats is not None else "-",
+            " ".join(statement.split()),
+        )
+
+
+def _handle_error(exception_context):
+    # The after-event never fires for a failed statement; keep the timer stack balanced
+    start_times = exception_context.connection.info.get("query_start_time") if exception_context.connection else None
+    if start_times:
+        start_times.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Times every statement on `engine` (for an AsyncEngine, pass its .sync_engine)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+pool_logger = logging.getLogger("app.db.pool")
+
+
+class _TimedCheckout:
+    """
+    Records how long each checkout takes, per engine (the pool's logging name),
+    and logs the slow ones together with the pool's state at that moment.
+    """
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            seconds = time.perf_counter() - started
+            DB_POOL_CHECKOUT.labels(self.logging_name or "default").observe(seconds)
+            if seconds * 1000 >= settings.DB_POOL_WAIT_LOG_MS:
+                pool_logger.warning(
+                    "pool_wait engine=%s wait_ms=%.1f %s",
+                    self.logging_name or "default",
+                    seconds * 1000,
+                    self.status(),
+                )
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+class QueryStatsMiddleware:
+    """
+    Collects the query count and DB time of each request, reports them in a
+    `Server-Timing` header (shown in the browser's network panel) and logs likely
+    N+1 patterns: the same statement repeated many times within one request.
+
+    Queries run after the response has started (streamed bodies) are still
+    counted for the N+1 check, but cannot be in the header any more.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(scope["path"])
+        token = current_query_stats.set(stats)
+
+        async def send_with_summary(message):
+            if message["type"] == "http.response.start" and settings.SQL_TIMING_HEADERS and stats.count:
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={stats.total_seconds * 1000:.1f};desc="{stats.count} queries"'.encode(),
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_summary)
+        finally:
+            current_query_stats.reset(token)
+            for statement, n in stats.repeated_statements(settings.SQL_N_PLUS_ONE_THRESHOLD):
+                logger.warning(
+                    "n_plus_one path=%s repeats=%d statement=%s",
+                    stats.path,
+                    n,
+                    " ".join(statement.split()),
+                )
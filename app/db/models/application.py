@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, DateTime
+from sqlalchemy import Column, Integer, String, Enum, DateTime, Index, ForeignKey
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 import enum
@@ -20,17 +20,27 @@ class ApplicationStatus(str, enum.Enum):
 
 class Application(Base):
     __tablename__ = "applications"
-    __table_args__ = {'schema': 'public'}
+    __table_args__ = (
+        # Keyset pagination order (see app/api/pagination.py)
+        Index("ix_applications_created_at_id", "created_at", "id"),
+        # The applications a user owns (see app/services/permissions.py), and deleting a user
+        Index("ix_applications_owner_id", "owner_id"),
+        {'schema': 'public'}
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, nullable=False)
     category = Column(Enum(ApplicationCategory))
-    owner = Column(String)
+    # Unset when the owner's account is deleted
+    owner_id = Column(Integer, ForeignKey("public.users.id", ondelete="SET NULL"))
     status = Column(Enum(ApplicationStatus), default=ApplicationStatus.active)
     
     created_at = Column(DateTime, nullable=False, default=func.now())
     updated_at = Column(DateTime, nullable=False, default=func.now(), onupdate=func.now())
 
+    # Loaded with the application, in the same query, for the owner's email in ApplicationOut
+    owner_user = relationship("User", foreign_keys=[owner_id], lazy="joined")
+
     # cascade="all, delete-orphan"
     # This ensures that when an Application is deleted, all related 
     # UserApplicationAccess records are also deleted from the DB automatically.
@@ -45,3 +55,8 @@ class Application(Base):
         back_populates="application",
         cascade="all, delete-orphan"
     )
+
+    @property
+    def owner(self):
+        """The owner's email, derived from owner_id; None without an owner."""
+        return self.owner_user.email if self.owner_user is not None else None
@@ -0,0 +1,16 @@
+from sqlalchemy import BigInteger, Column, Integer
+from app.db.database import Base
+
+
+class PermissionIndexVersion(Base):
+    """
+    Single-row counter, bumped in every transaction that changes who may access
+    which application. Each worker's in-memory permission index remembers the
+    version it reflects and reloads when the counter has moved on
+    (see app/services/permissions.py).
+    """
+    __tablename__ = "permission_index_version"
+    __table_args__ = {'schema': 'public'}
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
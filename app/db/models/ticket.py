@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 import enum
@@ -13,7 +13,21 @@ class TicketStatus(str, enum.Enum):
 
 class Ticket(Base):
     __tablename__ = "tickets"
-    __table_args__ = {'schema': 'public'}
+    __table_args__ = (
+        # Keyset pagination order (see app/api/pagination.py)
+        Index("ix_tickets_created_at_id", "created_at", "id"),
+        # The same order within the list filters (see app/api/routes/tickets.py);
+        # created_by and application_id also serve the foreign keys' cascades
+        Index("ix_tickets_created_by_created_at_id", "created_by", "created_at", "id"),
+        Index("ix_tickets_application_id_created_at_id", "application_id", "created_at", "id"),
+        # The open/in-progress filters, without the resolved bulk of the table (enums are stored by name)
+        Index(
+            "ix_tickets_unresolved_status_created_at_id", "status", "created_at", "id",
+            postgresql_where=text("status <> 'resolved'"),
+            sqlite_where=text("status <> 'resolved'"),
+        ),
+        {'schema': 'public'}
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -26,6 +40,9 @@ class Ticket(Base):
     created_at = Column(DateTime, nullable=False, default=func.now())
     updated_at = Column(DateTime, nullable=False, default=func.now(), onupdate=func.now())
 
+    # On Postgres the table also has a generated `search_vector` tsvector column.
+    # It is deliberately not mapped here; see app/services/ticket_search.py.
+
     # ORM relationships
     creator = relationship("User", back_populates="created_tickets", foreign_keys=[created_by]) 
     application = relationship("Application", back_populates="tickets", foreign_keys=[application_id])
\ No newline at end of file
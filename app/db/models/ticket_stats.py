@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Enum, ForeignKey, Integer
+from app.db.database import Base
+from app.db.models.ticket import TicketStatus
+
+
+class TicketStats(Base):
+    """
+    Number of tickets per application and status, changed in the same transaction
+    as the tickets themselves (see app/services/ticket_stats.py), so per-application
+    counts are a primary key lookup instead of a scan of `tickets`.
+    Recomputed from `tickets` by `python -m app.rebuild_ticket_stats`.
+    """
+    __tablename__ = "ticket_stats"
+    __table_args__ = {'schema': 'public'}
+
+    application_id = Column(Integer, ForeignKey("public.applications.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(Enum(TicketStatus), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, DateTime
+from sqlalchemy import Column, Integer, String, Enum, DateTime, Index
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 import enum
@@ -12,7 +12,11 @@ class UserRole(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
-    __table_args__ = {'schema': 'public'}
+    __table_args__ = (
+        # Keyset pagination order (see app/api/pagination.py)
+        Index("ix_users_full_name_id", "full_name", "id"),
+        {'schema': 'public'}
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     full_name = Column(String, nullable=False)
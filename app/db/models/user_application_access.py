@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Enum, UniqueConstraint, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, Enum, UniqueConstraint, DateTime, Index
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 from pydantic import BaseModel
@@ -15,6 +15,10 @@ class UserApplicationAccess(Base):
     __tablename__ = "user_application_access"
     __table_args__ = (
         UniqueConstraint("user_id", "application_id", name="uix_user_app"),
+        # Keyset pagination order (see app/api/pagination.py)
+        Index("ix_user_application_access_created_at_id", "created_at", "id"),
+        # Deleting an application; uix_user_app serves the lookups by user_id
+        Index("ix_user_application_access_application_id", "application_id"),
         {'schema': 'public'}
     )
 
@@ -1,7 +1,16 @@
-import subprocess
 import logging
 import sys
 import os
+import time
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from app.db.database import get_migration_database_url
 
 # Determine the Project Root
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -9,35 +18,89 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 # Configure basic logging to see the output in Render logs
 logging.basicConfig(level=logging.INFO, stream=sys.stdout)
 
+# Key of the Postgres advisory lock held while migrating. Any fixed bigint works,
+# as long as nothing else in the database uses the same one.
+MIGRATION_LOCK_ID = 720_315_442
+
+
+def alembic_config() -> Config:
+    """The project's alembic.ini, resolved from the project root rather than the cwd."""
+    config = Config(os.path.join(project_root, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(project_root, "alembic"))
+    # Running inside the app: keep alembic/env.py from replacing our logging setup
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def is_at_head(connection, script: ScriptDirectory) -> bool:
+    current = set(MigrationContext.configure(connection).get_current_heads())
+    return current == set(script.get_heads())
+
 
 def run_migrations():
-    """Runs Alembic to upgrade the database to the latest revision."""
+    """
+    Upgrades the database to the latest revision, in-process through the Alembic API.
+
+    Cheap when there is nothing to do: the current revision is compared with the
+    script heads and the upgrade is skipped. Otherwise, on Postgres, a session-level
+    advisory lock makes concurrent workers wait while the first one migrates; they
+    re-check afterwards and find the database already at head. The lock is held
+    across several transactions, so it needs a direct connection, not one through
+    PgBouncer (see get_migration_database_url).
+    """
     logging.info("--- Starting Alembic Migrations ---")
-    
+    started = time.perf_counter()
+
+    config = alembic_config()
+    script = ScriptDirectory.from_config(config)
+    # Short-lived engine: no pool to keep around (or inherit into forked workers)
+    engine = create_engine(get_migration_database_url(), poolclass=NullPool)
+
     try:
-        # Run the alembic command. check=True ensures failure on error.
-        result = subprocess.run(
-            ["alembic", "upgrade", "head"],
-            check=True, 
-            capture_output=True,
-            text=True,
-            cwd=project_root
-        )
-
-        # Log Alembic's successful output
-        logging.info("Alembic STDOUT:\n%s", result.stdout)
+        with engine.connect() as connection:
+            if is_at_head(connection, script):
+                logging.info("Database already at head, skipping migrations")
+                return
+
+            locking = connection.dialect.name == "postgresql"
+            if locking:
+                logging.info("Waiting for the migration lock...")
+                connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+                connection.commit()
+
+            try:
+                # Another worker may have finished the upgrade while we waited
+                if is_at_head(connection, script):
+                    logging.info("Database migrated by another process, skipping migrations")
+                    return
+
+                # End the read transaction of the check above: Alembic then owns the
+                # transaction, which migrations with an autocommit block (e.g. CREATE
+                # INDEX CONCURRENTLY) need to commit and reopen
+                connection.commit()
+                # alembic/env.py runs the upgrade on this connection instead of opening its own
+                config.attributes["connection"] = connection
+                command.upgrade(config, "head")
+                connection.commit()
+            finally:
+                if locking:
+                    # A failed upgrade leaves the transaction aborted; unlock on a clean one
+                    connection.rollback()
+                    connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+                    connection.commit()
+
         logging.info("--- Database initialization successful ---")
-    
-    except subprocess.CalledProcessError as e:
-        # Log detailed failure output
-        logging.error("--- Alembic Migration FAILED ---")
-        logging.error("Alembic STDERR: %s", e.stderr)
+
+    except Exception:
+        logging.exception("--- Alembic Migration FAILED ---")
         # CRITICAL: Re-raise the exception to crash the parent process (Uvicorn startup)
-        raise e
-    
-    except FileNotFoundError:
-        logging.error("Alembic command not found. Ensure it is installed via requirements.txt.")
         raise
 
+    finally:
+        engine.dispose()
+        logging.info("Migration check took %.3fs", time.perf_counter() - started)
+
+
 if __name__ == "__main__":
-    run_migrations()
\ No newline at end of file
+    # Pre-deploy command: `python -m app.init_db`
+    run_migrations()
@@ -1,33 +1,52 @@
 import os
 import sys
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Form, Depends, Query
-from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from app.api.routes.auth import router as auth_router
 from app.api.routes.applications import router as applications_router
 from app.api.routes.access import router as access_router
 from app.api.routes.users import router as users_router
 from app.api.routes.tickets import router as tickets_router
 from app.api.routes.chatbot import router as chatbot_router
+from app.api.routes.dashboard import router as dashboard_router
 from starlette.middleware.cors import CORSMiddleware
+from app.services.gemini_client import GeminiClient
+from app.core.config import settings
+from app.db.instrumentation import QueryStatsMiddleware
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.assets import PrecompressedStaticFiles, asset_url
+from app.api.pages import PageShells
 from .init_db import run_migrations 
 
 # --- 1. INITIALIZE APP INSTANCE ---
-app = FastAPI(title="Enterprise Application Hub")
-
-
-# --- 2. CRITICAL DB INITIALIZATION CALL (create_all) ---
-# This block runs synchronously when the 'app.main' module is imported by Uvicorn.
-try:
-    print("Attempting database initialization...")
-    # Call the simple create_all function
-    run_migrations() 
-    print("Database initialization completed successfully.")
-except Exception as e:
-    # If initialization fails (e.g., bad connection string), crash the process.
-    print(f"FATAL ERROR: Database initialization failed. Shutting down service. Error: {e}", file=sys.stderr)
-    sys.exit(1)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled HTTP client per worker for the Gemini proxy, closed on shutdown
+    app.state.gemini_client = GeminiClient.from_settings()
+    # Page templates are rendered here once, not on each request
+    pages.render_all()
+    yield
+    await app.state.gemini_client.aclose()
+
+
+app = FastAPI(title="Enterprise Application Hub", lifespan=lifespan)
+
+
+# --- 2. CRITICAL DB INITIALIZATION CALL (alembic upgrade head) ---
+# This block runs synchronously when the 'app.main' module is imported by Uvicorn,
+# unless migrations run as a pre-deploy step instead (RUN_MIGRATIONS_ON_STARTUP=false).
+if settings.RUN_MIGRATIONS_ON_STARTUP:
+    try:
+        print("Attempting database initialization...")
+        # In-process and skipped when already at head; workers serialize on a lock
+        run_migrations() 
+        print("Database initialization completed successfully.")
+    except Exception as e:
+        # If initialization fails (e.g., bad connection string), crash the process.
+        print(f"FATAL ERROR: Database initialization failed. Shutting down service. Error: {e}", file=sys.stderr)
+        sys.exit(1)
 
 
 # --- 3. HEALTH CHECK ---
@@ -37,6 +56,15 @@ def health_check():
     return {"status": "ok"}
 
 
+# --- 3b. METRICS (Prometheus text format) ---
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    if settings.METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {settings.METRICS_TOKEN}":
+        return Response(status_code=401)
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 # --- 4. MIDDLEWARE (Configure CORS) & ROUTERS ---
 app.add_middleware(
     CORSMiddleware,
@@ -45,6 +73,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Per-request query count and DB time (Server-Timing header), N+1 detection
+app.add_middleware(QueryStatsMiddleware)
+# Request counts, latency histograms and in-flight requests per route, for /metrics
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth_router)
 app.include_router(applications_router)
@@ -52,66 +84,73 @@ app.include_router(access_router)
 app.include_router(users_router)
 app.include_router(tickets_router)
 app.include_router(chatbot_router)
+app.include_router(dashboard_router)
 
 
 # --- 5. SERVE STATIC FILES (ADJUST PATHS) ---
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+app.mount("/static", PrecompressedStaticFiles(directory="app/static"), name="static")
 
 templates = Jinja2Templates(directory="app/templates")
+# {{ asset_url("js/home.js") }}: the fingerprinted build of an asset, see app/build_assets.py
+templates.env.globals["asset_url"] = asset_url
+pages = PageShells(templates)
 
 
 # --- 6. ROUTERS ---
+# Prebuilt shells (app/api/pages.py): no rendering or threadpool hop per request
 
 @app.get("/")
-def home(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+async def home(request: Request):
+    return pages.response(request, "index.html")
 
 @app.get("/login")
-def login_page(request: Request):
-    return templates.TemplateResponse("login.html", {"request": request})
+async def login_page(request: Request):
+    return pages.response(request, "login.html")
 
 @app.get("/dashboard")
-def dashboard(request: Request):
-    return templates.TemplateResponse("dashboard.html", {"request": request})
+async def dashboard(request: Request):
+    return pages.response(request, "dashboard.html")
 
 @app.get("/register")
-def register(request: Request):
-    return templates.TemplateResponse("register.html", {"request": request})
+async def register(request: Request):
+    return pages.response(request, "register.html")
 
 
 @app.get("/applications")
-def applications(request: Request):
-    return templates.TemplateResponse("applications/index.html", {"request": request})
+async def applications(request: Request):
+    return pages.response(request, "applications/index.html")
 
+# The page scripts read `id` from the query string; it is only validated here,
+# and every id is served the same shell
 @app.get("/applications/app")
-def application(request: Request, id: int = Query(..., alias="id")):
-    return templates.TemplateResponse("applications/app.html", {"request": request, "app_id": id})
+async def application(request: Request, id: int = Query(..., alias="id")):
+    return pages.response(request, "applications/app.html")
 
 @app.get("/applications/create")
-def createApplication(request: Request):
-    return templates.TemplateResponse("applications/create.html", {"request": request})
+async def createApplication(request: Request):
+    return pages.response(request, "applications/create.html")
 
 @app.get("/applications/edit")
-def editApplication(request: Request, id: int = Query(..., alias="id")):
-    return templates.TemplateResponse("applications/edit.html", {"request": request, "app_id": id})
+async def editApplication(request: Request, id: int = Query(..., alias="id")):
+    return pages.response(request, "applications/edit.html")
 
 @app.get("/access")
-def access(request: Request):
-    return templates.TemplateResponse("access.html", {"request": request})
+async def access(request: Request):
+    return pages.response(request, "access.html")
 
 
 @app.get("/tickets")
-def tickets(request: Request):
-    return templates.TemplateResponse("tickets/index.html", {"request": request})
+async def tickets(request: Request):
+    return pages.response(request, "tickets/index.html")
 
 @app.get("/tickets/ticket")
-def ticket(request: Request, id: int = Query(..., alias="id")):
-    return templates.TemplateResponse("tickets/ticket.html", {"request": request, "ticket_id": id})
+async def ticket(request: Request, id: int = Query(..., alias="id")):
+    return pages.response(request, "tickets/ticket.html")
 
 @app.get("/tickets/create")
-def createTicket(request: Request):
-    return templates.TemplateResponse("tickets/create.html", {"request": request})
+async def createTicket(request: Request):
+    return pages.response(request, "tickets/create.html")
 
 @app.get("/tickets/edit")
-def editTicket(request: Request, id: int = Query(..., alias="id")):
-    return templates.TemplateResponse("tickets/edit.html", {"request": request, "ticket_id": id})
+async def editTicket(request: Request, id: int = Query(..., alias="id")):
+    return pages.response(request, "tickets/edit.html")
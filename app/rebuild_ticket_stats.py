@@ -0,0 +1,42 @@
+"""
+Recomputes the per-application ticket counters (ticket_stats) from `tickets`:
+
+    python -m app.rebuild_ticket_stats            # fix the counters that are wrong
+    python -m app.rebuild_ticket_stats --check    # only report them; exit code 1 if any
+
+The counters are kept up to date by the routes that write tickets. This is the
+repair for writes that bypassed them, e.g. rows loaded or edited directly in SQL.
+On Postgres, ticket writes wait while it runs (a SHARE lock on `tickets`).
+"""
+import argparse
+import logging
+import sys
+import time
+
+import app.db.base  # noqa: F401 (registers every model, for the relationships)
+from app.db.database import SessionLocal
+from app.services.ticket_stats import rebuild_ticket_stats
+
+logging.basicConfig(level=logging.INFO, stream=sys.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute the per-application ticket counters.")
+    parser.add_argument("--check", action="store_true", help="report wrong counters without fixing them")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with SessionLocal() as db, db.begin():
+        result = rebuild_ticket_stats(db, dry_run=args.check)
+
+    logging.info(
+        "%d of %d ticket counters %s in %.2fs",
+        result["wrong"], result["counters"], "are wrong" if args.check else "fixed",
+        time.perf_counter() - started,
+    )
+    if args.check and result["wrong"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
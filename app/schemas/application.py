@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, List, Optional
 from enum import Enum
 
 class AppCategory(str, Enum):
@@ -33,9 +33,17 @@ class ApplicationOut(BaseModel):
     id: int
     name: str
     category: AppCategory
-    owner: str
+    owner_id: Optional[int] = None
+    # The owner's email, derived from owner_id
+    owner: Optional[str] = None
     status: AppStatus
     permission_level: Optional[str] = None 
+    # Tickets by status, only with ?ticket_counts=true
+    ticket_counts: Optional[Dict[str, int]] = None
+
+class ApplicationPage(BaseModel):
+    items: List[ApplicationOut]
+    next_cursor: Optional[str] = None
 
 class UserAppAccessCreate(BaseModel):
     user_id: int
@@ -51,3 +59,30 @@ class UserAppAccessOut(BaseModel):
     class Config:
         orm_mode = True
         from_attributes = True
+
+class UserAppAccessPage(BaseModel):
+    items: List[UserAppAccessOut]
+    next_cursor: Optional[str] = None
+
+
+class UserAppAccessBatchUpdate(BaseModel):
+    id: int
+    permission_level: PermissionLevel
+
+class UserAppAccessBatch(BaseModel):
+    """Access changes applied in one transaction: revokes first, then updates, then grants."""
+    grants: List[UserAppAccessCreate] = []
+    updates: List[UserAppAccessBatchUpdate] = []
+    revokes: List[int] = []
+
+class UserAppAccessBatchItem(BaseModel):
+    # Status code the single-item endpoint would have answered with
+    status: int
+    detail: Optional[str] = None
+    access: Optional[UserAppAccessOut] = None
+
+class UserAppAccessBatchResult(BaseModel):
+    """One item per change, in the order they were sent."""
+    grants: List[UserAppAccessBatchItem]
+    updates: List[UserAppAccessBatchItem]
+    revokes: List[UserAppAccessBatchItem]
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Dict, List
+
+from app.schemas.ticket import TicketOut
+
+
+class ApplicationCounts(BaseModel):
+    # Applications the user owns; every status and category is listed, with 0 when unused
+    total: int
+    by_status: Dict[str, int]
+    by_category: Dict[str, int]
+
+class TicketCounts(BaseModel):
+    # Tickets the user created, by status
+    total: int
+    by_status: Dict[str, int]
+
+class DashboardSummary(BaseModel):
+    applications: ApplicationCounts
+    tickets: TicketCounts
+    # Newest first, at most DASHBOARD_RECENT_TICKETS
+    recent_tickets: List[TicketOut]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from enum import Enum as PyEnum
 
@@ -35,3 +35,20 @@ class TicketOut(TicketBase):
     class Config:
         # Enable ORM mode for seamless conversion from SQLAlchemy model
         orm_mode = True
+
+
+class TicketPage(BaseModel):
+    items: List[TicketOut]
+    next_cursor: Optional[str] = None
+
+
+class TicketImportError(BaseModel):
+    row: int  # 1-based, not counting the CSV header
+    errors: List[dict]
+
+class TicketImportResult(BaseModel):
+    imported: int
+    failed: int
+    # The first TICKET_IMPORT_MAX_ERRORS failures; errors_truncated when there were more
+    errors: List[TicketImportError]
+    errors_truncated: bool = False
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import List, Optional
 from app.db.models.user import UserRole 
 
 class UserBase(BaseModel):
@@ -17,6 +17,17 @@ class UserOut(UserBase):
     email: EmailStr
     role: UserRole
 
+class CurrentUser(BaseModel):
+    """Identity and role of the authenticated caller, cached between requests."""
+    id: int
+    full_name: str
+    email: str
+    role: UserRole
+
+class UserPage(BaseModel):
+    items: List[UserOut]
+    next_cursor: Optional[str] = None
+
 class UserUpdate(BaseModel):
     full_name: Optional[str] = Field(None, min_length=3, max_length=100)
     role: Optional[UserRole] = None
@@ -0,0 +1,124 @@
+from collections import defaultdict
+from typing import Dict, List
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.db.models.application import Application
+from app.db.models.user import User
+from app.db.models.user_application_access import PermissionLevel, UserApplicationAccess
+from app.schemas.application import UserAppAccessBatch
+
+Access = UserApplicationAccess
+
+RETURNED_COLUMNS = (Access.id, Access.user_id, Access.application_id, Access.permission_level)
+
+
+def _access_out(row) -> dict:
+    return {
+        "id": row.id,
+        "user_id": row.user_id,
+        "application_id": row.application_id,
+        "permission_level": row.permission_level.value,
+    }
+
+
+def _revoke(db: Session, ids: List[int]) -> List[dict]:
+    deleted = {}
+    if ids:
+        rows = db.execute(
+            delete(Access).where(Access.id.in_(set(ids))).returning(*RETURNED_COLUMNS),
+            execution_options={"synchronize_session": False},
+        )
+        deleted = {row.id: _access_out(row) for row in rows}
+
+    results = []
+    for access_id in ids:
+        if access_id in deleted:
+            # A repeated id was already revoked by its first occurrence
+            results.append({"status": 204, "access": deleted.pop(access_id)})
+        else:
+            results.append({"status": 404, "detail": "Access not found"})
+    return results
+
+
+def _update(db: Session, updates) -> List[dict]:
+    # One UPDATE ... WHERE id IN (...) per permission level (there are three), the
+    # last change wins when an id is sent twice
+    levels = {item.id: PermissionLevel(item.permission_level.value) for item in updates}
+    ids_by_level = defaultdict(list)
+    for access_id, level in levels.items():
+        ids_by_level[level].append(access_id)
+
+    updated = {}
+    for level, ids in ids_by_level.items():
+        rows = db.execute(
+            update(Access).where(Access.id.in_(ids)).values(permission_level=level).returning(*RETURNED_COLUMNS),
+            execution_options={"synchronize_session": False},
+        )
+        updated.update((row.id, _access_out(row)) for row in rows)
+
+    return [
+        {"status": 200, "access": updated[item.id]} if item.id in updated
+        else {"status": 404, "detail": "Access record not found"}
+        for item in updates
+    ]
+
+
+def _grant(db: Session, grants) -> List[dict]:
+    user_ids = {item.user_id for item in grants}
+    application_ids = {item.application_id for item in grants}
+    existing_users = set(db.execute(select(User.id).where(User.id.in_(user_ids))).scalars()) if grants else set()
+    existing_applications = set(
+        db.execute(select(Application.id).where(Application.id.in_(application_ids))).scalars()
+    ) if grants else set()
+
+    results: List[dict] = [None] * len(grants)
+    pending: Dict[tuple, int] = {}  # (user_id, application_id) -> index of the grant inserting it
+    for index, item in enumerate(grants):
+        pair = (item.user_id, item.application_id)
+        if item.user_id not in existing_users:
+            results[index] = {"status": 404, "detail": f"User with ID {item.user_id} not found"}
+        elif item.application_id not in existing_applications:
+            results[index] = {"status": 404, "detail": f"Application with ID {item.application_id} not found"}
+        elif pair in pending:
+            results[index] = {"status": 400, "detail": "Access already exists"}
+        else:
+            pending[pair] = index
+
+    if pending:
+        insert = sqlite.insert if db.bind.dialect.name == "sqlite" else postgresql.insert
+        statement = insert(Access.__table__).on_conflict_do_nothing(
+            index_elements=["user_id", "application_id"]
+        ).returning(*RETURNED_COLUMNS)
+        rows = db.connection().execute(statement, [
+            {
+                "user_id": grants[index].user_id,
+                "application_id": grants[index].application_id,
+                "permission_level": PermissionLevel(grants[index].permission_level.value),
+            }
+            for index in pending.values()
+        ])
+        for row in rows:
+            results[pending.pop((row.user_id, row.application_id))] = {"status": 201, "access": _access_out(row)}
+
+    # Pairs not returned by the insert hit the (user_id, application_id) unique constraint
+    for index in pending.values():
+        results[index] = {"status": 400, "detail": "Access already exists"}
+    return results
+
+
+def apply_access_batch(db: Session, batch: UserAppAccessBatch) -> dict:
+    """
+    Applies revokes, updates and grants with a few set-based statements in the
+    session's transaction (the caller commits), instead of one request and three
+    SELECTs per change. Each change gets the status code and detail the
+    single-item endpoints would have returned; failed changes are skipped and do
+    not prevent the others.
+    """
+    return {
+        "revokes": _revoke(db, batch.revokes),
+        "updates": _update(db, batch.updates),
+        "grants": _grant(db, batch.grants),
+    }
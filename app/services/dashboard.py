@@ -0,0 +1,83 @@
+from sqlalchemy import func, select
+
+from app.core.cache import SingleFlightCache, TTLCache
+from app.core.config import settings
+from app.core.metrics import register_cache
+from app.db.database import async_session_scope
+from app.db.models.application import Application, ApplicationCategory, ApplicationStatus
+from app.db.models.ticket import Ticket, TicketStatus
+from app.schemas.dashboard import DashboardSummary
+from app.schemas.ticket import TicketOut
+from app.services.permissions import permission_index
+
+# user_id -> DashboardSummary. In-process: this worker drops entries on its own
+# writes (invalidate_dashboard*), other workers see the changes after the TTL.
+dashboard_cache = SingleFlightCache(
+    TTLCache(maxsize=settings.DASHBOARD_CACHE_MAX_SIZE, ttl=settings.DASHBOARD_CACHE_TTL_SECONDS)
+)
+register_cache("dashboard", dashboard_cache)
+
+
+def invalidate_dashboard(user_id: int) -> None:
+    """Drops a user's summary; call after changing tickets they created."""
+    dashboard_cache.invalidate(user_id)
+
+
+def invalidate_dashboards() -> None:
+    """
+    Drops every summary; call after changing applications, which may be owned by
+    any number of users (deleting one also deletes its tickets).
+    """
+    dashboard_cache.clear()
+
+
+async def load_dashboard_summary(user_id: int) -> DashboardSummary:
+    """Two aggregate queries and one page of tickets, in a session of its own."""
+    async with async_session_scope() as db:
+        await permission_index.refresh(db)
+        owned_ids = permission_index.owned_ids(user_id)
+
+        app_status = {status.value: 0 for status in ApplicationStatus}
+        app_category = {category.value: 0 for category in ApplicationCategory}
+        app_total = 0
+        if owned_ids:
+            rows = await db.execute(
+                select(Application.status, Application.category, func.count())
+                .where(Application.id.in_(owned_ids))
+                .group_by(Application.status, Application.category)
+            )
+            for status, category, count in rows:
+                app_total += count
+                # Columns are nullable; unset values are not counted under any key
+                if status is not None:
+                    app_status[status.value] += count
+                if category is not None:
+                    app_category[category.value] += count
+
+        ticket_status = {status.value: 0 for status in TicketStatus}
+        rows = await db.execute(
+            select(Ticket.status, func.count())
+            .where(Ticket.created_by == user_id)
+            .group_by(Ticket.status)
+        )
+        for status, count in rows:
+            if status is not None:
+                ticket_status[status.value] += count
+
+        recent = await db.execute(
+            select(Ticket)
+            .where(Ticket.created_by == user_id)
+            .order_by(Ticket.created_at.desc(), Ticket.id.desc())
+            .limit(settings.DASHBOARD_RECENT_TICKETS)
+        )
+
+        return DashboardSummary(
+            applications={"total": app_total, "by_status": app_status, "by_category": app_category},
+            tickets={"total": sum(ticket_status.values()), "by_status": ticket_status},
+            recent_tickets=[TicketOut.model_validate(ticket, from_attributes=True) for ticket in recent.scalars()],
+        )
+
+
+async def get_dashboard_summary(user_id: int) -> DashboardSummary:
+    """The cached summary; concurrent misses for the same user share one load."""
+    return await dashboard_cache.get_or_load(user_id, lambda: load_dashboard_summary(user_id))
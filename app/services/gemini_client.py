@@ -0,0 +1,244 @@
+import asyncio
+import json
+import random
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import GEMINI_LATENCY
+
+# Upstream statuses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class UpstreamError(Exception):
+    """The Gemini API failed, timed out or answered with an error status."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, timeout: bool = False):
+        super().__init__(message)
+        self.status_code = status_code
+        self.timeout = timeout
+
+
+class CircuitOpenError(UpstreamError):
+    """Calls are short-circuited because the upstream recently kept failing."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Circuit breaker is open")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failed calls and rejects calls until
+    `reset_timeout` seconds have passed. Then a single trial call is let through
+    (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self) -> None:
+        state = self.state
+        if state == "open" or (state == "half-open" and self._trial_in_flight):
+            retry_after = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            raise CircuitOpenError(retry_after=retry_after)
+        if state == "half-open":
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class GeminiClient:
+    """
+    Shared async client for the Gemini REST API.
+
+    One instance lives for the whole process (created on startup, closed on shutdown)
+    so TLS connections are pooled and kept alive between chat requests.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        model: str,
+        connect_timeout: float,
+        read_timeout: float,
+        max_retries: int,
+        max_connections: int,
+        breaker: CircuitBreaker,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.model = model
+        self.max_retries = max_retries
+        self.breaker = breaker
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            # Header instead of ?key=, so the secret never shows up in URLs or access logs
+            headers={"x-goog-api-key": api_key, "Content-Type": "application/json"},
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport,
+        )
+
+    @classmethod
+    def from_settings(cls) -> "GeminiClient":
+        return cls(
+            api_key=settings.GEMINI_API_KEY,
+            base_url=settings.GEMINI_BASE_URL,
+            model=settings.GEMINI_MODEL,
+            connect_timeout=settings.GEMINI_CONNECT_TIMEOUT_SECONDS,
+            read_timeout=settings.GEMINI_READ_TIMEOUT_SECONDS,
+            max_retries=settings.GEMINI_MAX_RETRIES,
+            max_connections=settings.GEMINI_MAX_CONNECTIONS,
+            breaker=CircuitBreaker(
+                failure_threshold=settings.GEMINI_BREAKER_FAILURE_THRESHOLD,
+                reset_timeout=settings.GEMINI_BREAKER_RESET_SECONDS,
+            ),
+        )
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def generate_content(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Calls models/{model}:generateContent and returns the decoded JSON body."""
+        response = await self._send(f"/{self.model}:generateContent", payload)
+        try:
+            return response.json()
+        except ValueError:
+            raise UpstreamError("Gemini returned a non-JSON body", status_code=response.status_code)
+
+    async def open_stream(self, payload: Dict[str, Any]) -> httpx.Response:
+        """
+        Starts models/{model}:streamGenerateContent in SSE mode and returns the response
+        as soon as its status is known, body unread. Errors, retries and the circuit
+        breaker apply up to that point; consume the body with iter_stream_chunks().
+        """
+        return await self._send(f"/{self.model}:streamGenerateContent", payload, params={"alt": "sse"}, stream=True)
+
+    async def iter_stream_chunks(self, response: httpx.Response) -> AsyncIterator[Dict[str, Any]]:
+        """Yields each decoded `data:` event of an open_stream() response, then closes it."""
+        try:
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                try:
+                    yield json.loads(line[len("data:"):].strip())
+                except ValueError:
+                    raise UpstreamError("Gemini stream sent a non-JSON event", status_code=response.status_code)
+        except httpx.TimeoutException as e:
+            self.breaker.record_failure()
+            raise UpstreamError(f"Gemini stream timed out: {e!r}", timeout=True)
+        except httpx.TransportError as e:
+            self.breaker.record_failure()
+            raise UpstreamError(f"Gemini stream failed: {e!r}")
+        finally:
+            await response.aclose()
+
+    async def _send(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        params: Optional[Dict[str, str]] = None,
+        stream: bool = False,
+    ) -> httpx.Response:
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self._send_with_retries(path, payload, params, stream)
+            outcome = "success"
+            return response
+        except CircuitOpenError:
+            outcome = "circuit_open"
+            raise
+        except UpstreamError as e:
+            outcome = "timeout" if e.timeout else "error"
+            raise
+        finally:
+            # For streams this is the time until the response headers arrived
+            GEMINI_LATENCY.labels("stream" if stream else "generate", outcome).observe(time.perf_counter() - started)
+
+    async def _send_with_retries(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        params: Optional[Dict[str, str]],
+        stream: bool,
+    ) -> httpx.Response:
+        self.breaker.before_call()
+
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                request = self._client.build_request("POST", path, json=payload, params=params)
+                response = await self._client.send(request, stream=stream)
+            except httpx.TimeoutException as e:
+                error = UpstreamError(f"Gemini request timed out: {e!r}", timeout=True)
+            except httpx.TransportError as e:
+                error = UpstreamError(f"Gemini request failed: {e!r}")
+            else:
+                if response.is_success:
+                    self.breaker.record_success()
+                    return response
+
+                # Error bodies are small; read them even in stream mode for the message
+                await response.aread()
+                await response.aclose()
+                error = UpstreamError(
+                    f"Gemini API error {response.status_code}: {response.text[:500]}",
+                    status_code=response.status_code,
+                )
+                if response.status_code not in RETRYABLE_STATUSES:
+                    # A 4xx other than 429 is our request's fault, not a sign the upstream is down
+                    self.breaker.record_success()
+                    raise error
+
+                retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(self._backoff_delay(attempt, retry_after))
+
+        self.breaker.record_failure()
+        raise error
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        # Full jitter: a random delay up to the exponential cap, so retries from
+        # concurrent requests do not arrive at the upstream in lockstep
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
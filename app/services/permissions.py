@@ -0,0 +1,210 @@
+import asyncio
+import threading
+import time
+from typing import Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import register_permission_index
+from app.db.models.application import Application
+from app.db.models.permission_index import PermissionIndexVersion
+from app.db.models.user_application_access import UserApplicationAccess
+
+ADMIN = "admin"
+
+VERSION_QUERY = select(PermissionIndexVersion.version).where(PermissionIndexVersion.id == 1)
+ACCESS_QUERY = select(
+    UserApplicationAccess.user_id, UserApplicationAccess.application_id, UserApplicationAccess.permission_level
+)
+OWNER_QUERY = select(Application.owner_id, Application.id).where(Application.owner_id.is_not(None))
+
+
+def bump_permission_version(db: Session) -> int:
+    """
+    Increments the permission index version in the session's transaction and
+    returns the new value; pass it to PermissionIndex.update() after the commit.
+    Call it in every transaction that changes accesses, ownership, applications
+    or users. The row lock also orders concurrent permission changes.
+    """
+    version = db.execute(
+        update(PermissionIndexVersion)
+        .where(PermissionIndexVersion.id == 1)
+        .values(version=PermissionIndexVersion.version + 1)
+        .returning(PermissionIndexVersion.version)
+    ).scalar()
+    if version is None:
+        # Tables made by create_all (SQLite) have no row yet; migrations insert it
+        db.execute(insert(PermissionIndexVersion).values(id=1, version=1))
+        version = 1
+    return version
+
+
+class PermissionIndex:
+    """
+    This worker's copy of every user's effective permission per application:
+    user id -> {application id: "read" | "write" | "admin"}, plus the applications
+    each user owns (owners have "admin"). Site admins have "admin" everywhere and
+    are not stored.
+
+    Loaded in full from the database, then kept current two ways: the worker that
+    changes permissions applies the change right after committing (update()), and
+    every worker compares its version with the database counter at most every
+    `check_interval` seconds, reloading when another worker has moved it on or
+    when the copy is older than `max_age` seconds.
+
+    The maps, and the per-user maps in them, are replaced, never mutated, so
+    readers (on the event loop) need no lock while update() runs in a threadpool thread.
+    """
+
+    def __init__(self, check_interval: float, max_age: float):
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self.version: Optional[int] = None
+        self.loads = 0
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+        self._access: Dict[int, Dict[int, str]] = {}
+        self._owned: Dict[int, FrozenSet[int]] = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._async_refresh_lock: Optional[asyncio.Lock] = None
+
+    # --- Lookups ---
+
+    def level(self, user, application_id: int) -> Optional[str]:
+        """The user's effective level on the application, None without access."""
+        if user.role == "Admin" or application_id in self._owned.get(user.id, ()):
+            return ADMIN
+        return self._access.get(user.id, {}).get(application_id)
+
+    def visible_ids(self, user) -> Optional[Set[int]]:
+        """Ids of the applications the user may see; None for site admins, who see all."""
+        if user.role == "Admin":
+            return None
+        return set(self._access.get(user.id, {})) | self._owned.get(user.id, frozenset())
+
+    def owned_ids(self, user_id: int) -> FrozenSet[int]:
+        return self._owned.get(user_id, frozenset())
+
+    # --- Loading ---
+
+    def _due(self) -> bool:
+        return self.version is None or time.monotonic() - self._checked_at >= self.check_interval
+
+    def _stale(self, version: int) -> bool:
+        return version != self.version or time.monotonic() - self._loaded_at >= self.max_age
+
+    def _replace(self, version: int, access_rows, owner_rows) -> None:
+        access: Dict[int, Dict[int, str]] = {}
+        for user_id, application_id, level in access_rows:
+            access.setdefault(user_id, {})[application_id] = level.value
+        owned: Dict[int, Set[int]] = {}
+        for user_id, application_id in owner_rows:
+            owned.setdefault(user_id, set()).add(application_id)
+
+        with self._lock:
+            self._access = access
+            self._owned = {user_id: frozenset(ids) for user_id, ids in owned.items()}
+            self.version = version
+            self._loaded_at = time.monotonic()
+            self.loads += 1
+
+    def refresh_sync(self, db: Session) -> None:
+        """Checks the version (if due) and reloads when stale, for sync routes."""
+        if not self._due():
+            return
+        with self._refresh_lock:
+            if not self._due():
+                return
+            # Version first: a change committed between the queries then only
+            # causes one more reload, never a copy newer than its version claims
+            version = db.execute(VERSION_QUERY).scalar() or 0
+            if self._stale(version):
+                self._replace(version, db.execute(ACCESS_QUERY).all(), db.execute(OWNER_QUERY).all())
+            self._checked_at = time.monotonic()
+
+    async def refresh(self, db) -> None:
+        """refresh_sync() for async routes: `db` is an AsyncSession or ThreadedSession."""
+        if not self._due():
+            return
+        if self._async_refresh_lock is None:
+            self._async_refresh_lock = asyncio.Lock()
+        async with self._async_refresh_lock:
+            if not self._due():
+                return
+            version = (await db.execute(VERSION_QUERY)).scalar() or 0
+            if self._stale(version):
+                access_rows = (await db.execute(ACCESS_QUERY)).all()
+                owner_rows = (await db.execute(OWNER_QUERY)).all()
+                self._replace(version, access_rows, owner_rows)
+            self._checked_at = time.monotonic()
+
+    # --- Incremental changes ---
+
+    def update(
+        self,
+        version: int,
+        set_access: Iterable[Tuple[int, int, str]] = (),
+        remove_access: Iterable[Tuple[int, int]] = (),
+        add_applications: Iterable[Tuple[int, int]] = (),
+        remove_applications: Iterable[int] = (),
+        remove_users: Iterable[int] = (),
+    ) -> None:
+        """
+        Applies the changes committed under `version` (from bump_permission_version).
+        Removals are applied before additions. If this copy did not reflect the
+        version just before, it missed another worker's changes: it is reloaded on
+        next use instead.
+
+        set_access: (user_id, application_id, level); remove_access: (user_id,
+        application_id); add_applications: (application_id, owner_id).
+        """
+        with self._lock:
+            if self.version is None or self.version != version - 1:
+                self._checked_at = 0.0
+                return
+
+            # Changed on copies, then swapped in: readers see the old maps or the new ones
+            access = dict(self._access)
+            owned_ids = dict(self._owned)
+            for user_id in remove_users:
+                access.pop(user_id, None)
+                owned_ids.pop(user_id, None)
+            for application_id in set(remove_applications):
+                for user_id, levels in list(access.items()):
+                    if application_id in levels:
+                        access[user_id] = {a: l for a, l in levels.items() if a != application_id}
+                for user_id, owned in list(owned_ids.items()):
+                    if application_id in owned:
+                        owned_ids[user_id] = owned - {application_id}
+            for user_id, application_id in remove_access:
+                levels = access.get(user_id, {})
+                if application_id in levels:
+                    access[user_id] = {a: l for a, l in levels.items() if a != application_id}
+            for application_id, owner_id in add_applications:
+                owned_ids[owner_id] = owned_ids.get(owner_id, frozenset()) | {application_id}
+            for user_id, application_id, level in set_access:
+                access[user_id] = {**access.get(user_id, {}), application_id: level}
+
+            self._access = access
+            self._owned = owned_ids
+            self.version = version
+
+    def stats(self) -> dict:
+        """Exported on /metrics (see app/core/metrics.py)."""
+        return {
+            "version": self.version,
+            "loads": self.loads,
+            "users": len(self._access.keys() | self._owned.keys()),
+            "accesses": sum(len(levels) for levels in self._access.values()),
+            "age_seconds": time.monotonic() - self._loaded_at if self.version is not None else None,
+        }
+
+
+permission_index = PermissionIndex(
+    check_interval=settings.PERMISSION_INDEX_CHECK_SECONDS,
+    max_age=settings.PERMISSION_INDEX_MAX_AGE_SECONDS,
+)
+register_permission_index(permission_index)
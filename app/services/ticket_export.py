@@ -0,0 +1,73 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Iterator
+
+from app.db.database import SessionLocal
+from app.db.models.ticket import Ticket
+
+# Exported fields, the same as TicketOut
+EXPORT_COLUMNS = [
+    Ticket.id,
+    Ticket.title,
+    Ticket.description,
+    Ticket.application_id,
+    Ticket.created_by,
+    Ticket.status,
+    Ticket.created_at,
+    Ticket.updated_at,
+]
+FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def _value(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _format_csv(rows, header: bool) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(FIELDS)
+    for row in rows:
+        writer.writerow([_value(getattr(row, field)) for field in FIELDS])
+    return buffer.getvalue()
+
+
+def _format_ndjson(rows, header: bool) -> str:
+    return "".join(
+        json.dumps({field: _value(getattr(row, field)) for field in FIELDS}) + "\n" for row in rows
+    )
+
+
+def iter_ticket_export(statement, format: str, batch_size: int) -> Iterator[str]:
+    """
+    Runs `statement` (selecting at least EXPORT_COLUMNS) on a server-side cursor and
+    yields the rows as CSV or NDJSON text, one chunk per `batch_size` rows.
+
+    A sync generator on purpose: StreamingResponse iterates it in the threadpool, and
+    only one batch of rows is in memory at a time whatever the size of the export.
+    The session is its own, as the response outlives the request's dependencies.
+    """
+    format_rows = _format_csv if format == "csv" else _format_ndjson
+    db = SessionLocal()
+    try:
+        # yield_per implies stream_results: a named cursor on psycopg2, fetchmany elsewhere
+        result = db.execute(statement.execution_options(yield_per=batch_size))
+        header = True
+        for rows in result.partitions():
+            yield format_rows(rows, header)
+            header = False
+        if header and format == "csv":
+            # Nothing matched: still a valid CSV, with its header
+            yield format_rows([], header)
+    finally:
+        db.close()
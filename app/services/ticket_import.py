@@ -0,0 +1,147 @@
+import codecs
+import csv
+import itertools
+import json
+from collections import Counter
+from typing import BinaryIO, Iterator, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.db.bulk import bulk_insert
+from app.db.models.application import Application
+from app.db.models.ticket import Ticket, TicketStatus
+from app.schemas.ticket import TicketCreate
+from app.services.ticket_stats import count_tickets, import_counts
+
+REQUIRED_CSV_COLUMNS = {"title", "description", "application_id"}
+
+
+class TicketImportFileError(ValueError):
+    """The upload as a whole cannot be read: wrong encoding, CSV header or format."""
+
+
+def _csv_records(lines) -> Iterator[Tuple[int, object]]:
+    reader = csv.DictReader(lines)
+    missing = REQUIRED_CSV_COLUMNS - set(reader.fieldnames or [])
+    if missing:
+        raise TicketImportFileError(f"CSV header is missing the columns: {', '.join(sorted(missing))}")
+    for number, record in enumerate(reader, start=1):
+        # Cells beyond the header end up under the None key
+        record.pop(None, None)
+        yield number, record
+
+
+def _ndjson_records(lines) -> Iterator[Tuple[int, object]]:
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, e
+
+
+def _validate(record):
+    """A TicketCreate, or the list of errors that make the record invalid."""
+    if isinstance(record, json.JSONDecodeError):
+        return [{"loc": [], "msg": f"Invalid JSON: {record.msg}"}]
+    if not isinstance(record, dict):
+        return [{"loc": [], "msg": "Expected an object"}]
+    try:
+        return TicketCreate(**record)
+    except ValidationError as e:
+        return [{"loc": list(error["loc"]), "msg": error["msg"]} for error in e.errors()]
+
+
+class _Report:
+    def __init__(self, max_errors: int):
+        self.max_errors = max_errors
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+
+    def fail(self, row: int, errors: list):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "errors": errors})
+
+    def result(self) -> dict:
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda error: error["row"]),
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def import_tickets(db: Session, file: BinaryIO, format: str, created_by: int,
+                   batch_size: int, max_errors: int) -> dict:
+    """
+    Reads CSV or NDJSON tickets from `file` as a stream and inserts the valid ones,
+    created by `created_by`, in the session's transaction (the caller commits).
+
+    Work is done per batch of `batch_size` records: each is validated with
+    TicketCreate, the batch's application ids are checked with one query (ids
+    already seen are not looked up again) and the valid rows go in with one
+    COPY on Postgres or one executemany elsewhere. Only a batch is in memory at a
+    time. Invalid rows are skipped and reported by number.
+
+    Raises TicketImportFileError when the file as a whole cannot be read.
+    """
+    # utf-8-sig drops the byte order mark spreadsheet exports often start with
+    lines = codecs.iterdecode(file, "utf-8-sig")
+    records = _csv_records(lines) if format == "csv" else _ndjson_records(lines)
+    table = Ticket.__table__
+    connection = db.connection()
+    known_applications, missing_applications = set(), set()
+    report = _Report(max_errors)
+    counts = Counter()  # (application_id, status) -> tickets imported
+    # The column default's clock (the server's TimeZone on Postgres), read once: every
+    # row shares one timestamp, as with a single INSERT in this transaction
+    now = db.execute(select(func.now())).scalar()
+
+    try:
+        while batch := list(itertools.islice(records, batch_size)):
+            valid = []
+            for number, record in batch:
+                ticket = _validate(record)
+                if isinstance(ticket, list):
+                    report.fail(number, ticket)
+                else:
+                    valid.append((number, ticket))
+
+            unseen = {ticket.application_id for _, ticket in valid} - known_applications - missing_applications
+            if unseen:
+                found = set(db.execute(select(Application.id).where(Application.id.in_(unseen))).scalars())
+                known_applications |= found
+                missing_applications |= unseen - found
+
+            rows = []
+            for number, ticket in valid:
+                if ticket.application_id in missing_applications:
+                    report.fail(number, [{
+                        "loc": ["application_id"],
+                        "msg": f"Application with ID {ticket.application_id} not found",
+                    }])
+                    continue
+                rows.append({
+                    "title": ticket.title,
+                    "description": ticket.description,
+                    "application_id": ticket.application_id,
+                    "created_by": created_by,
+                    "status": TicketStatus.open,
+                    "created_at": now,
+                    "updated_at": now,
+                })
+
+            bulk_insert(connection, table, rows)
+            counts.update(import_counts(rows))
+            report.imported += len(rows)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise TicketImportFileError(f"Cannot read the file: {e}") from e
+
+    # The per-application counters, once for the whole file
+    count_tickets(db, counts)
+    return report.result()
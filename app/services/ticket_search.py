@@ -0,0 +1,139 @@
+import re
+from typing import Tuple
+
+from sqlalchemy import Float, Integer, case, false, func, literal, literal_column, or_, select, text, true, type_coerce
+from sqlalchemy.sql.elements import Label
+
+from app.db.models.ticket import Ticket
+
+# Text search configuration used by the generated tickets.search_vector column
+# (see migration 7b1e4d9c2a63). Keep both in sync.
+TS_CONFIG = "english"
+
+# Largest value a Postgres INTEGER column can hold
+MAX_INT4 = 2 ** 31 - 1
+
+# ASCII digits only: str.isdigit() also accepts characters such as "²" that int() rejects
+ID_TERM = re.compile(r"[0-9]+")
+# Rank of an id match per level (ticket 3, application 2, creator 1), above any text score
+ID_MATCH_RANK = 1000.0
+
+SQLITE_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS public.tickets_fts USING fts5(
+        title, description, content='tickets', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS public.tickets_fts_ai AFTER INSERT ON tickets BEGIN
+        INSERT INTO tickets_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS public.tickets_fts_ad AFTER DELETE ON tickets BEGIN
+        INSERT INTO tickets_fts(tickets_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS public.tickets_fts_au AFTER UPDATE ON tickets BEGIN
+        INSERT INTO tickets_fts(tickets_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO tickets_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO public.tickets_fts(tickets_fts) VALUES ('rebuild')",
+]
+
+
+def install_sqlite_fts(connection) -> None:
+    """
+    Creates the FTS5 index used by search_tickets() on SQLite, kept in sync by triggers.
+    Postgres gets its search column and indexes from the Alembic migrations instead.
+    Safe to call repeatedly: existing objects are kept and the index is rebuilt.
+    """
+    for statement in SQLITE_FTS_DDL:
+        connection.execute(text(statement))
+
+
+def search_tickets(query, term: str, dialect_name: str) -> Tuple[object, Label]:
+    """
+    Restricts a Ticket query to the tickets matching `term` and adds a relevance column.
+
+    Returns the filtered query and the labeled rank expression (higher is better),
+    which callers use as the leading sort key.
+    """
+    term = term.strip()
+    id_term = bool(ID_TERM.fullmatch(term)) and int(term) <= MAX_INT4
+
+    if dialect_name == "postgresql":
+        query, matches, score = _search_postgres(query, term)
+    elif dialect_name == "sqlite":
+        query, matches, score = _search_sqlite(query, term, keep_unmatched=id_term)
+    else:
+        pattern = f"%{_escape_like(term)}%"
+        matches = or_(Ticket.title.ilike(pattern, escape="\\"), Ticket.description.ilike(pattern, escape="\\"))
+        score = literal(0.0, Float)
+
+    # A number may also be a ticket, application or user id (all integer indexes,
+    # combined with the text indexes in one bitmap OR on Postgres). Id matches rank
+    # first; the number is still searched for in the text, e.g. as an error code.
+    if id_term:
+        number = int(term)
+        id_rank = case(
+            (Ticket.id == number, 3),
+            (Ticket.application_id == number, 2),
+            (Ticket.created_by == number, 1),
+            else_=0,
+        )
+        matches = or_(Ticket.id == number, Ticket.application_id == number, Ticket.created_by == number, matches)
+        score = id_rank * ID_MATCH_RANK + score
+
+    rank = type_coerce(score, Float).label("rank")
+    return query.filter(matches).add_columns(rank), rank
+
+
+def _search_postgres(query, term: str):
+    # Generated column, not mapped on the model because SQLite cannot create it
+    search_vector = literal_column("tickets.search_vector")
+    tsquery = func.websearch_to_tsquery(TS_CONFIG, term)
+
+    # Must match the expression of ix_tickets_title_description_trgm to use the index
+    searchable_text = Ticket.title.op("||")(literal_column("' '")).op("||")(Ticket.description)
+    pattern = f"%{_escape_like(term)}%"
+
+    score = func.ts_rank(search_vector, tsquery, type_=Float) + func.word_similarity(term, Ticket.title, type_=Float)
+    matches = or_(
+        search_vector.op("@@")(tsquery),
+        searchable_text.ilike(pattern, escape="\\"),
+    )
+    return query, matches, score
+
+
+def _search_sqlite(query, term: str, keep_unmatched: bool):
+    # Every word becomes a quoted prefix query, so FTS5 syntax in user input is inert
+    words = re.findall(r"\w+", term)
+    if not words:
+        return query, false(), literal(0.0, Float)
+
+    fts = (
+        text(
+            "SELECT rowid AS ticket_id, -rank AS score "
+            "FROM public.tickets_fts WHERE tickets_fts MATCH :match"
+        )
+        .bindparams(match=" ".join(f'"{word}"*' for word in words))
+        .columns(ticket_id=Integer, score=Float)
+        .subquery("fts")
+    )
+
+    if not keep_unmatched:
+        return query.join(fts, fts.c.ticket_id == Ticket.id), true(), fts.c.score
+
+    # Id matches (see search_tickets) need not match the text: an outer join for the
+    # score, and the match as an IN, which SQLite ORs with the id lookups by index
+    query = query.outerjoin(fts, fts.c.ticket_id == Ticket.id)
+    return query, Ticket.id.in_(select(fts.c.ticket_id)), func.coalesce(fts.c.score, 0.0)
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
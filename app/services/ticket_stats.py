@@ -0,0 +1,109 @@
+from collections import Counter
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.db.models.ticket import Ticket, TicketStatus
+from app.db.models.ticket_stats import TicketStats
+
+# (application_id, status) -> number of tickets
+Key = Tuple[int, TicketStatus]
+
+stats_table = TicketStats.__table__
+
+ACTUAL_COUNTS_QUERY = (
+    select(Ticket.application_id, Ticket.status, func.count())
+    .where(Ticket.application_id.is_not(None), Ticket.status.is_not(None))
+    .group_by(Ticket.application_id, Ticket.status)
+)
+STORED_COUNTS_QUERY = select(TicketStats.application_id, TicketStats.status, TicketStats.count)
+
+
+def _dialect_name(db) -> str:
+    # Sessions have a bind, connections (the benchmark seeds) a dialect
+    dialect = getattr(db, "dialect", None) or db.bind.dialect
+    return dialect.name
+
+
+def _upsert(db, counts: Mapping[Key, int], increment: bool) -> None:
+    """Adds `counts` to the counters (increment=True) or sets them, creating missing rows."""
+    if not counts:
+        return
+    insert = sqlite.insert if _dialect_name(db) == "sqlite" else postgresql.insert
+    statement = insert(stats_table)
+    new_count = statement.excluded.count
+    statement = statement.on_conflict_do_update(
+        index_elements=["application_id", "status"],
+        set_={"count": stats_table.c.count + new_count if increment else new_count},
+    )
+    # A fixed order, so concurrent transactions lock the counter rows in the same
+    # order and cannot deadlock each other
+    db.execute(statement, [
+        {"application_id": application_id, "status": status, "count": count}
+        for (application_id, status), count in sorted(counts.items(), key=lambda item: (item[0][0], item[0][1].name))
+    ])
+
+
+def ticket_key(application_id: Optional[int], status: Optional[TicketStatus]) -> Optional[Key]:
+    """The counter a ticket is counted under; None for tickets without application or status."""
+    if application_id is None or status is None:
+        return None
+    return application_id, TicketStatus(status)
+
+
+def count_tickets(db, changes: Mapping[Optional[Key], int]) -> None:
+    """
+    Adds `changes` ((application_id, status) -> delta) to the counters in the
+    caller's transaction, with one upsert. Call it in every transaction that
+    inserts or deletes tickets or changes their status, e.g.
+    count_tickets(db, {ticket_key(app_id, old): -1, ticket_key(app_id, new): +1}).
+    """
+    _upsert(db, {key: delta for key, delta in changes.items() if key is not None and delta}, increment=True)
+
+
+def rebuild_ticket_stats(db, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Recomputes every counter from `tickets` and fixes the ones that differ, in
+    the caller's transaction. On Postgres, ticket writes wait until the caller
+    commits, so no change can land between the count and the fix. Returns the
+    number of counters and of wrong ones (left as they are with dry_run=True).
+    """
+    if _dialect_name(db) == "postgresql" and not dry_run:
+        # SHARE mode blocks inserts, updates and deletes but not reads
+        db.execute(text(f"LOCK TABLE {Ticket.__table__.fullname} IN SHARE MODE"))
+
+    actual = {(application_id, status): count for application_id, status, count in db.execute(ACTUAL_COUNTS_QUERY)}
+    stored = {(application_id, status): count for application_id, status, count in db.execute(STORED_COUNTS_QUERY)}
+
+    # Deleting the last ticket of a status leaves a 0 counter, which is right
+    wrong = {
+        key: actual.get(key, 0)
+        for key in actual.keys() | stored.keys()
+        if actual.get(key, 0) != stored.get(key, 0)
+    }
+    if not dry_run:
+        _upsert(db, wrong, increment=False)
+
+    return {"counters": len(actual.keys() | stored.keys()), "wrong": len(wrong)}
+
+
+async def load_ticket_counts(db, application_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+    """
+    Ticket counts by status for each of `application_ids`, one primary key range
+    read of ticket_stats: {application_id: {"Open": 3, "In Progress": 0, ...}}.
+    """
+    application_ids = list(application_ids)
+    counts = {application_id: {status.value: 0 for status in TicketStatus} for application_id in application_ids}
+    if not application_ids:
+        return counts
+
+    rows = await db.execute(STORED_COUNTS_QUERY.where(TicketStats.application_id.in_(application_ids)))
+    for application_id, status, count in rows:
+        counts[application_id][status.value] = count
+    return counts
+
+
+def import_counts(rows: Iterable[dict]) -> Counter:
+    """The counter changes for inserting ticket `rows` (dicts of column values)."""
+    return Counter(ticket_key(row["application_id"], row["status"]) for row in rows)
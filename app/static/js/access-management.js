@@ -10,19 +10,45 @@ export let selectedAppId = null;
 export let selectedAppName = '';
 
 
+/**
+ * Follows next_cursor through every page of a list endpoint.
+ * The access page needs complete lists, so it requests the largest page size.
+ * @returns {Promise<{res: Response, items: Array<Object> | null}>} items is null when a page request failed.
+ */
+async function fetchAllPages(url, token) {
+    let items = [];
+    let cursor = null;
+    let res;
+
+    do {
+        const params = new URLSearchParams({ limit: "200" });
+        if (cursor) params.set("cursor", cursor);
+
+        res = await fetch(`${url}?${params.toString()}`, {
+            headers: { "Authorization": "Bearer " + token }
+        });
+        if (!res.ok) return { res, items: null };
+
+        const page = await res.json();
+        items = items.concat(page.items);
+        cursor = page.next_cursor;
+    } while (cursor);
+
+    return { res, items };
+}
+
+
 export async function getAllAccesses() {
     const token = localStorage.getItem("token");
     try {
-        const res = await fetch("/api/access/", {
-            headers: { "Authorization": "Bearer " + token }
-        });
+        const { res, items } = await fetchAllPages("/api/access/", token);
         if (res.status == 403) {
             alert("🗿 You have no permission on this page!");
             window.location.href = "/dashboard";
         } else if (!res.ok) {
             throw new Error("Failed to fetch all accesses");
         }
-        allAccesses = await res.json();
+        allAccesses = items;
     } catch (error) {
         console.error("Error fetching all accesses:", error);
     }
@@ -33,9 +59,7 @@ export async function fetchApplicationsList() {
     const token = localStorage.getItem("token");
     if (!token) return logout();
 
-    const res = await fetch("/api/applications", {
-        headers: { "Authorization": "Bearer " + token }
-    });
+    const { res, items } = await fetchAllPages("/api/applications/", token);
     if (res.status == 403) {
         alert("🗿 You have no permission on this page!");
         window.location.href = "/dashboard";
@@ -45,7 +69,7 @@ export async function fetchApplicationsList() {
         window.location.href = "/login";
         // throw new Error("Failed to fetch all Applications");
     }
-    applications = await res.json();
+    applications = items;
     loadApplicationsList(applications);
 }
 
@@ -54,10 +78,7 @@ export async function fetchUsersList() {
     const token = localStorage.getItem("token");
     if (!token) return logout();
 
-    const res = await fetch("/api/users", {
-        method: "GET",
-        headers: { "Authorization": "Bearer " + token }
-    });
+    const { res, items } = await fetchAllPages("/api/users/", token);
 
     if (res.status == 403) {
         alert("🗿 You have no permission on this page!");
@@ -65,7 +86,7 @@ export async function fetchUsersList() {
     } else if (!res.ok) {
         throw new Error("Failed to fetch all Users");
     }
-    users = await res.json();
+    users = items;
 }
 
 
@@ -111,7 +132,7 @@ export function loadApplicationsList(apps) {
                         ${app.status}
                     </div>
                 </div>
-                <div class="text-sm text-gray-600">Owner: ${app.owner}</div>
+                <div class="text-sm text-gray-600">Owner: ${app.owner || '-'}</div>
             </div>
         `;
     });
@@ -326,47 +347,52 @@ export async function savePermissions() {
     let successCount = 0;
     let errorCount = 0;
 
+    // All pending changes go in one request and are applied in one transaction
+    const batch = { grants: [], updates: [], revokes: [] };
+    const sent = { grants: [], updates: [], revokes: [] };
     for (const change of changes) {
-        try {
-            let url, method, body;
-
-            if (change.action === 'POST') {
-                url = '/api/access/';
-                method = 'POST';
-                // نستخدم change.userId بدلاً من change.accessId في POST
-                body = { user_id: change.userId, application_id: selectedAppId, permission_level: change.newRole };
-            } else if (change.action === 'PUT') {
-                url = `/api/access/${change.accessId}`;
-                method = 'PUT';
-                body = { permission_level: change.newRole }; 
-            } else if (change.action === 'DELETE') {
-                url = `/api/access/${change.accessId}`;
-                method = 'DELETE';
-                body = null;
-            } else {
-                continue;
-            }
+        if (change.action === 'POST') {
+            batch.grants.push({ user_id: change.userId, application_id: selectedAppId, permission_level: change.newRole });
+            sent.grants.push(change);
+        } else if (change.action === 'PUT') {
+            batch.updates.push({ id: change.accessId, permission_level: change.newRole });
+            sent.updates.push(change);
+        } else if (change.action === 'DELETE') {
+            batch.revokes.push(change.accessId);
+            sent.revokes.push(change);
+        }
+    }
 
-            const res = await fetch(url, {
-                method: method,
-                headers: { 
-                    "Authorization": "Bearer " + token,
-                    "Content-Type": "application/json"
-                },
-                body: body ? JSON.stringify(body) : undefined
-            });
+    try {
+        const res = await fetch('/api/access/batch', {
+            method: 'POST',
+            headers: { 
+                "Authorization": "Bearer " + token,
+                "Content-Type": "application/json"
+            },
+            body: JSON.stringify(batch)
+        });
 
-            if (res.ok) {
-                successCount++;
-            } else {
-                errorCount++;
-                console.error(`❌ Failed to execute ${change.action} for user ${change.userId}: ${res.statusText}`);
-            }
+        if (!res.ok) {
+            throw new Error(`${res.status} ${res.statusText}`);
+        }
 
-        } catch (error) {
-            errorCount++;
-            console.error(`❌ Error during API call for ${change.action}:`, error);
+        // One result per change, in the order they were sent
+        const results = await res.json();
+        for (const section of ['grants', 'updates', 'revokes']) {
+            results[section].forEach((result, i) => {
+                if (result.status < 300) {
+                    successCount++;
+                } else {
+                    errorCount++;
+                    const change = sent[section][i];
+                    console.error(`❌ Failed to execute ${change.action} for user ${change.userId}: ${result.detail}`);
+                }
+            });
         }
+    } catch (error) {
+        errorCount = changes.length;
+        console.error('❌ Error during API call for the access changes:', error);
     }
 
     alert(`✅ Save complete: ${successCount} successful, ${errorCount} failed.`);
@@ -1,28 +1,74 @@
 // api-applications.js
 import { logout, redirectIfLoggedIn } from './auth.js';
+import { fetchJsonWithETag } from './etag-cache.js';
 
 let appsCache = []; 
 let accessPermissions = []; 
-
-export async function fetchApplications(isDashboardMode = false, params = null) {
+let lastAppsQuery = null;
+let nextAppsCursor = null;
+
+/**
+ * Fetches one page of applications visible to the current user.
+ * @param {boolean} isDashboardMode - Set to true to list only the applications the user owns.
+ * @param {URLSearchParams | string | null} params - Optional URL parameters for filtering or searching.
+ * @param {string | null} cursor - The next_cursor of the previous page, or null for the first page.
+ * @returns {Promise<Array<Object>>} The applications of the requested page.
+ */
+export async function fetchApplications(isDashboardMode = false, params = null, cursor = null) {
     const token = localStorage.getItem("token");
     if (!token) return logout();
 
-    let apiUrl = isDashboardMode ? "/api/applications?dashboard=true" : "/api/applications";
-    if (params) apiUrl += (isDashboardMode ? '&' : '?') + params.toString();
+    const query = new URLSearchParams(params || "");
+    if (isDashboardMode) query.set("dashboard", "true");
+    if (cursor) query.set("cursor", cursor);
+
+    const queryString = query.toString();
+    const apiUrl = queryString ? `/api/applications?${queryString}` : "/api/applications";
 
     try {
-        const res = await fetch(apiUrl, {
-            headers: { "Authorization": "Bearer " + token }
-        });
-        appsCache = await res.json();
+        // Unchanged pages come back as 304 and are read from the ETag cache
+        const { res, data: page } = await fetchJsonWithETag(apiUrl, { "Authorization": "Bearer " + token });
+        if (!page) {
+            throw new Error(`Failed to fetch applications: ${res.statusText}`);
+        }
+
+        lastAppsQuery = { isDashboardMode, params };
+        nextAppsCursor = page.next_cursor;
+        appsCache = cursor ? appsCache.concat(page.items) : page.items;
         
+        return page.items;
     } catch (error) {
         alert("Unauthorized or failed to fetch applications.");
         throw new Error("Failed to fetch applications");
         redirectIfLoggedIn("/applications");
     }
-    
+}
+
+/**
+ * @returns {boolean} Whether the last fetchApplications() query has more pages.
+ */
+export function hasMoreApplications() {
+    return Boolean(nextAppsCursor);
+}
+
+/**
+ * Fetches the next page of the last fetchApplications() query.
+ * @returns {Promise<Array<Object>>} The applications of the next page (empty when there are none).
+ */
+export async function fetchMoreApplications() {
+    if (!lastAppsQuery || !nextAppsCursor) return [];
+    return fetchApplications(lastAppsQuery.isDashboardMode, lastAppsQuery.params, nextAppsCursor);
+}
+
+/**
+ * Walks every page of a query. Only for small lists such as dropdowns.
+ * @returns {Promise<Array<Object>>} All applications matching the query.
+ */
+export async function fetchAllApplications(isDashboardMode = false, params = null) {
+    await fetchApplications(isDashboardMode, params);
+    while (hasMoreApplications()) {
+        await fetchMoreApplications();
+    }
     return appsCache;
 }
 
@@ -48,21 +94,28 @@ export async function fetchApplications(isDashboardMode = false, params = null)
 // }
 
 
-export async function fetchAppById(appId) {
+/**
+ * Fetches a single application by its ID.
+ * @param {string} appId - The ID of the application to fetch.
+ * @param {boolean} withTicketCounts - Set to true to include its ticket counts by status.
+ * @returns {Promise<Object>} The application object.
+ */
+export async function fetchAppById(appId, withTicketCounts = false) {
     const token = localStorage.getItem("token");
     if (!token) return logout();
 
+    const apiUrl = withTicketCounts ? `/api/applications/${appId}?ticket_counts=true` : `/api/applications/${appId}`;
+
     try {
-        const res = await fetch(`/api/applications/${appId}`, {
-            method: "GET",
-            headers: { "Authorization": "Bearer " + token }
+        const { data: app } = await fetchJsonWithETag(apiUrl, {
+            "Authorization": "Bearer " + token
         });
         
-        if (!res.ok) {
+        if (!app) {
             throw new Error("Application not found");
         }
         
-        return await res.json();
+        return app;
     } catch (error) {
         alert("Unauthorized or failed to fetch application.");
         throw new Error("Failed to fetch application");
@@ -0,0 +1,26 @@
+// /js/api-dashboard.js
+import { logout } from './auth.js';
+
+/**
+ * Fetches the current user's dashboard summary: owned applications counted by
+ * status and category, created tickets counted by status, and the most recent tickets.
+ * @returns {Promise<Object>} The summary ({applications, tickets, recent_tickets}).
+ */
+export async function fetchDashboardSummary() {
+    const token = localStorage.getItem("token");
+    if (!token) return logout();
+
+    const res = await fetch("/api/dashboard/summary", {
+        headers: { "Authorization": "Bearer " + token }
+    });
+
+    if (res.status === 401) {
+        alert("Unauthorized access. Please log in again.");
+        logout();
+        throw new Error("Unauthorized");
+    }
+    if (!res.ok) {
+        throw new Error(`Failed to fetch dashboard summary: ${res.statusText}`);
+    }
+    return res.json();
+}
@@ -1,25 +1,32 @@
 // /js/api-tickets.js
 import { logout } from './auth.js';
+import { fetchJsonWithETag } from './etag-cache.js';
 
 let ticketsCache = null; 
+let lastTicketsQuery = null;
+let nextTicketsCursor = null;
 
 /**
- * Fetches a list of support tickets from the API.
- * @param {boolean} isDashboardMode - Not used for tickets currently, but kept for consistency.
- * @param {URLSearchParams | null} params - Optional URL parameters for filtering or searching.
- * @returns {Promise<Array<Object>>} The list of tickets.
+ * Fetches one page of support tickets from the API.
+ * @param {boolean} isDashboardMode - Set to true to list only the current user's tickets.
+ * @param {URLSearchParams | string | null} params - Optional URL parameters for filtering or searching.
+ * @param {string | null} cursor - The next_cursor of the previous page, or null for the first page.
+ * @returns {Promise<Array<Object>>} The tickets of the requested page.
  */
-export async function fetchTickets(isDashboardMode = false, params = null) {
+export async function fetchTickets(isDashboardMode = false, params = null, cursor = null) {
     const token = localStorage.getItem("token");
     if (!token) return logout();
 
-    let apiUrl = isDashboardMode ? "/api/tickets?dashboard=true" : "/api/tickets";
-    if (params) apiUrl += (isDashboardMode ? '&' : '?') + params.toString();
+    const query = new URLSearchParams(params || "");
+    if (isDashboardMode) query.set("dashboard", "true");
+    if (cursor) query.set("cursor", cursor);
+
+    const queryString = query.toString();
+    const apiUrl = queryString ? `/api/tickets?${queryString}` : "/api/tickets";
 
     try {
-        const res = await fetch(apiUrl, {
-            headers: { "Authorization": "Bearer " + token }
-        });
+        // Unchanged pages come back as 304 and are read from the ETag cache
+        const { res, data: page } = await fetchJsonWithETag(apiUrl, { "Authorization": "Bearer " + token });
         
         if (res.status === 401) {
             alert("Unauthorized access. Please log in again.");
@@ -27,13 +34,15 @@ export async function fetchTickets(isDashboardMode = false, params = null) {
             throw new Error("Unauthorized");
         }
         
-        if (!res.ok) {
+        if (!page) {
             throw new Error(`Failed to fetch tickets: ${res.statusText}`);
         }
 
-        ticketsCache = await res.json();
+        lastTicketsQuery = { isDashboardMode, params };
+        nextTicketsCursor = page.next_cursor;
+        ticketsCache = cursor ? ticketsCache.concat(page.items) : page.items;
         
-        return ticketsCache;
+        return page.items;
     } catch (error) {
         console.error("Fetch Tickets Error:", error);
         alert("Failed to load tickets. Check console for details.");
@@ -42,6 +51,22 @@ export async function fetchTickets(isDashboardMode = false, params = null) {
     }
 }
 
+/**
+ * @returns {boolean} Whether the last fetchTickets() query has more pages.
+ */
+export function hasMoreTickets() {
+    return Boolean(nextTicketsCursor);
+}
+
+/**
+ * Fetches the next page of the last fetchTickets() query.
+ * @returns {Promise<Array<Object>>} The tickets of the next page (empty when there are none).
+ */
+export async function fetchMoreTickets() {
+    if (!lastTicketsQuery || !nextTicketsCursor) return [];
+    return fetchTickets(lastTicketsQuery.isDashboardMode, lastTicketsQuery.params, nextTicketsCursor);
+}
+
 /**
  * Fetches a single ticket by its ID.
  * @param {string} ticketId - The ID of the ticket to fetch.
@@ -49,15 +74,15 @@ export async function fetchTickets(isDashboardMode = false, params = null) {
  */
 export async function fetchTicketById(ticketId) {
     const token = localStorage.getItem("token");
-    const res = await fetch(`/api/tickets/${ticketId}`, {
-        headers: { "Authorization": "Bearer " + token }
+    const { data: ticket } = await fetchJsonWithETag(`/api/tickets/${ticketId}`, {
+        "Authorization": "Bearer " + token
     });
     
-    if (!res.ok) {
+    if (!ticket) {
         throw new Error("Ticket not found or access denied");
     }
 
-    return await res.json();
+    return ticket;
 }
 
 /**
@@ -31,16 +31,22 @@ async function initializeAppDetails() {
     const currentUser = await loadCurrentUser();
     
     try {
-        app = await fetchAppById(appId);
+        // The counts come from the server's per-application counters
+        app = await fetchAppById(appId, true);
         
         document.getElementById("name").innerText = app.name;
         document.getElementById("category").innerText = app.category;
-        document.getElementById("owner").innerText = app.owner;
+        document.getElementById("owner").innerText = app.owner || "-";
         document.getElementById("status").innerText = app.status;
         if (app.status === "Active") {
             document.getElementById("status").classList.add("text-green-700");
         }
         
+        const ticketCounts = document.getElementById("ticketCounts");
+        ticketCounts.innerHTML = Object.entries(app.ticket_counts || {})
+            .map(([status, count]) => `<span class="status-badge ticket-status-${status.replace(/\s+/g, '_')}">${status}: ${count}</span>`)
+            .join("");
+
         const editLink = document.getElementById("edit_app_link");
         if (editLink) editLink.href = `/applications/edit?id=${app.id}`;
         
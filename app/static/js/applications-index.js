@@ -1,6 +1,6 @@
 // applications-index.js
 import { loadCurrentUser, logout, setActionLimits } from './auth.js';
-import { fetchApplications, deleteApplication } from './api-applications.js';
+import { fetchApplications, fetchMoreApplications, hasMoreApplications, deleteApplication } from './api-applications.js';
 
 let currentUser = null;
 let allAppsCache = []
@@ -12,6 +12,7 @@ export function updateAppsCache(apps) {
 export function loadAppsTable(apps, accessPermissions) {
     const table = document.getElementById("appsTable");
     table.innerHTML = "";
+    updateLoadMoreAppsButton();
 
     if (!apps || apps.length === 0) {
         table.innerHTML = `
@@ -32,7 +33,7 @@ export function loadAppsTable(apps, accessPermissions) {
             <tr class="bo rder-b hover:bg-gray-50" app-data="${app.id}">
                 <td class="py-2 px-4"><a class="hover:underline" href="/applications/app?id=${app.id}">${app.name}</a></td>
                 <td class="py-2 px-4">${app.category}</td>
-                <td class="py-2 px-4">${app.owner}</td>
+                <td class="py-2 px-4">${app.owner || '-'}</td>
                 <td class="py-2 px-4">
                     <span class="status-badge ${statusClass}">${app.status}</span>
                 </td>
@@ -53,6 +54,27 @@ export function loadAppsTable(apps, accessPermissions) {
     };
 }
 
+/**
+ * Shows the "Load more" button while the last applications query has more pages.
+ */
+function updateLoadMoreAppsButton() {
+    const loadMoreBtn = document.getElementById("loadMoreAppsBtn");
+    if (loadMoreBtn) loadMoreBtn.classList.toggle("hidden", !hasMoreApplications());
+}
+
+/**
+ * Appends the next page of applications to the cache and re-applies the current filters.
+ */
+export async function loadMoreApps() {
+    try {
+        const moreApps = await fetchMoreApplications();
+        allAppsCache = allAppsCache.concat(moreApps);
+        filterApps();
+    } catch (error) {
+        console.error("Error loading more applications:", error);
+    }
+}
+
 async function getApplicationsAndDisplay(user) {
     try {
         const apps = await fetchApplications(false);
@@ -95,7 +117,7 @@ export async function filterApps() {
             // Check if search term is in title OR description
             const titleMatch = app.name.toLowerCase().includes(searchTerm);
             const appId = app.id == searchTerm ? app.id : false;
-            const appOwner = app.owner.toLowerCase().includes(searchTerm);
+            const appOwner = (app.owner || '').toLowerCase().includes(searchTerm);
             return titleMatch || appId || appOwner;
         });
     }
@@ -118,6 +140,7 @@ async function initializeApplicationsPage() {
 }
 
 window.filterApps = filterApps; 
+window.loadMoreApps = loadMoreApps;
 window.logout = logout; 
 
 // Only add the listener if the active page is Appkication
@@ -1,4 +1,5 @@
 // auth.js
+import { clearETagCache } from './etag-cache.js';
 
 export async function loadCurrentUser() {
     const token = localStorage.getItem("token");
@@ -25,6 +26,7 @@ export async function loadCurrentUser() {
 
 export function logout() {
     localStorage.removeItem("token");
+    clearETagCache();
     window.location.href = "/login";
 }
 
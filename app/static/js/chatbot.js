@@ -1,5 +1,7 @@
 // static/js/chatbot.js
 
+import { createStreamingMarkdownRenderer } from './markdown-utils.js';
+
 const chatForm = document.getElementById('aiChatForm');
 const chatInput = document.getElementById('chatInput');
 const chatOutput = document.getElementById('chatOutput');
@@ -7,6 +9,7 @@ const chatSubmitBtn = document.getElementById('chatSubmitBtn');
 
 // API Configuration: Now pointing to your FastAPI internal endpoint
 const apiUrl = '/api/chat'; 
+const streamUrl = '/api/chat/stream';
 
 // Helper to set UI state (loading/enabled)
 function setUIState(isLoading) {
@@ -27,6 +30,16 @@ function setUIState(isLoading) {
 }
 
 
+/**
+ * Adds the session token when logged in, so the server shares AI capacity fairly per user.
+ * @param {Object} headers
+ */
+function chatHeaders(headers) {
+    const token = localStorage.getItem("token");
+    return token ? { ...headers, 'Authorization': `Bearer ${token}` } : headers;
+}
+
+
 /**
  * Fetches content from your secure backend proxy (/api/chat).
  * The backend handles the Gemini API call, security, and response parsing.
@@ -44,7 +57,7 @@ async function fetchGeminiResponse(userQuery) {
     try {
         const response = await fetch(apiUrl, {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers: chatHeaders({ 'Content-Type': 'application/json' }),
             body: JSON.stringify(payload)
         });
 
@@ -66,6 +79,93 @@ async function fetchGeminiResponse(userQuery) {
 }
 
 
+/**
+ * Streams the answer from the backend proxy (/api/chat/stream) as server-sent events.
+ * Each piece of text is passed to onChunk as soon as it arrives.
+ * * @param {string} userQuery - The question/prompt from the user.
+ * @param {function(string): void} onChunk - Called with every text chunk.
+ * @returns {Promise<Array<{uri: string, title: string}>|null>} The sources sent at the
+ * end of the stream, or null if the browser cannot read streamed responses.
+ */
+async function streamGeminiResponse(userQuery, onChunk) {
+    const response = await fetch(streamUrl, {
+        method: 'POST',
+        headers: chatHeaders({ 'Content-Type': 'application/json', 'Accept': 'text/event-stream' }),
+        body: JSON.stringify({ query: userQuery })
+    });
+
+    if (!response.ok) {
+        // Errors before the stream starts come back as regular JSON responses
+        const result = await response.json().catch(() => ({}));
+        throw new Error(`Proxy failed: ${result.detail || response.statusText}`);
+    }
+
+    if (!response.body || typeof TextDecoder === 'undefined') {
+        return null;
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let sources = [];
+
+    // Handles one "event: ...\ndata: ..." block; returns true once the stream is done
+    const handleEvent = (block) => {
+        let event = 'message';
+        let data = '';
+        block.split('\n').forEach((line) => {
+            if (line.startsWith('event:')) event = line.slice(6).trim();
+            else if (line.startsWith('data:')) data += line.slice(5).trim();
+        });
+        const payload = data ? JSON.parse(data) : {};
+
+        if (event === 'chunk') onChunk(payload.text);
+        else if (event === 'sources') sources = payload;
+        else if (event === 'error') throw new Error(`Proxy failed: ${payload.detail}`);
+        return event === 'done';
+    };
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true }).replace(/\r\n/g, '\n');
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const block = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            if (block.trim() && handleEvent(block)) {
+                reader.cancel();
+                return sources;
+            }
+        }
+    }
+    throw new Error('Connection failed: the response ended unexpectedly.');
+}
+
+
+/**
+ * Renders the list of grounding sources below the answer.
+ * @param {Array<{uri: string, title: string}>} sources
+ */
+function renderSources(sources) {
+    if (!sources || sources.length === 0) return;
+
+    let outputHtml = `<div class="mt-4 pt-4 border-t border-gray-100">
+                        <p class="text-sm font-semibold text-gray-700 mb-2">Sources:</p>
+                        <ul class="list-disc list-inside text-xs text-gray-600 space-y-1">`;
+
+    sources.forEach((source) => {
+        outputHtml += `<li><a href="${source.uri}" target="_blank" class="text-blue-500 hover:underline">
+                            ${source.title || source.uri}
+                        </a></li>`;
+    });
+
+    outputHtml += `</ul></div>`;
+    chatOutput.insertAdjacentHTML('beforeend', outputHtml);
+}
+
+
 /**
  * Handles the chat form submission.
  * @param {Event} e 
@@ -79,28 +179,30 @@ async function handleChatSubmission(e) {
     setUIState(true);
 
     try {
-        // The structured data is returned directly from the FastAPI endpoint
-        const { text, sources } = await fetchGeminiResponse(userQuery);
-        
-        // Render the main response text
-        let outputHtml = `<p class="whitespace-pre-wrap">${text}</p>`;
-
-        // Render sources if available
-        if (sources && sources.length > 0) {
-            outputHtml += `<div class="mt-4 pt-4 border-t border-gray-100">
-                                <p class="text-sm font-semibold text-gray-700 mb-2">Sources:</p>
-                                <ul class="list-disc list-inside text-xs text-gray-600 space-y-1">`;
-            
-            sources.forEach((source) => {
-                outputHtml += `<li><a href="${source.uri}" target="_blank" class="text-blue-500 hover:underline">
-                                    ${source.title || source.uri}
-                                </a></li>`;
-            });
-
-            outputHtml += `</ul></div>`;
+        // The answer is rendered as Markdown while it streams in
+        const answerElement = document.createElement('div');
+        answerElement.className = 'markdown-preview';
+        const renderer = createStreamingMarkdownRenderer(answerElement);
+        let started = false;
+
+        let sources = await streamGeminiResponse(userQuery, (chunk) => {
+            if (!started) {
+                started = true;
+                chatOutput.replaceChildren(answerElement);
+            }
+            renderer.append(chunk);
+        });
+
+        if (sources === null) {
+            // Streaming is not supported by this browser: fall back to the full response
+            const result = await fetchGeminiResponse(userQuery);
+            renderer.append(result.text);
+            sources = result.sources;
         }
 
-        chatOutput.innerHTML = outputHtml;
+        chatOutput.replaceChildren(answerElement);
+        renderer.flush();
+        renderSources(sources);
         chatInput.value = ''; // Clear input after successful submission
 
     } catch (error) {
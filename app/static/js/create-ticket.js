@@ -2,7 +2,7 @@
 import { logout, loadCurrentUser } from './auth.js'; 
 import { serializeForm } from './application-form-utils.js';
 import { initializeMarkdownPreview } from './markdown-utils.js';
-import { fetchApplications } from './api-applications.js';
+import { fetchAllApplications } from './api-applications.js';
 
 // Global cache for application ID/Name mapping
 let applicationsData = []; 
@@ -48,7 +48,7 @@ async function initCreateTicket() {
     // 2. Fetch and populate application list
     try {
         // Fetch all applications (not in dashboard mode, no params)
-        const apps = await fetchApplications(false, null); 
+        const apps = await fetchAllApplications(false, null); 
         applicationsData = apps; // Cache the data globally
         
         populateApplicationsDatalist(apps);
@@ -2,7 +2,7 @@
 import { loadCurrentUser, logout, setActionLimits } from './auth.js';
 import { fetchApplications } from './api-applications.js';
 import { loadAppsTable, filterApps, updateAppsCache } from './applications-index.js';
-import { fetchTickets } from './api-tickets.js';
+import { fetchDashboardSummary } from './api-dashboard.js';
 import { loadTicketsTable, filterTickets, updateTicketsCache } from './tickets-index.js';
 
 
@@ -21,17 +21,44 @@ async function getUserApplicationsAndDisplay(user) {
 }
 
 
-async function getUserTicketsAndDisplay(user) {
+/**
+ * Renders "label: count" badges, e.g. the tickets per status, skipping zeros.
+ * @param {string} elementId - The container to fill.
+ * @param {Object} counts - Counts by label.
+ * @param {string} classPrefix - Status badge class prefix, or "" for plain badges.
+ */
+function renderCounts(elementId, counts, classPrefix = "") {
+    const container = document.getElementById(elementId);
+    container.innerHTML = Object.entries(counts)
+        .filter(([, count]) => count > 0)
+        .map(([label, count]) => {
+            const badgeClass = classPrefix ? `${classPrefix}${label.replace(/\s+/g, '_')}` : "bg-gray-100 text-gray-700";
+            return `<span class="status-badge ${badgeClass}">${label}: ${count}</span>`;
+        })
+        .join("");
+}
+
+
+async function getUserSummaryAndDisplay(user) {
     try {
-        const tickets = await fetchTickets(true); 
-        updateTicketsCache(tickets)
-        loadTicketsTable(tickets);
+        // Counts and recent tickets come aggregated from the server in one request
+        const summary = await fetchDashboardSummary();
+
+        document.getElementById("appsTotal").innerText = summary.applications.total;
+        renderCounts("appsStatusCounts", summary.applications.by_status, "app-status-");
+        renderCounts("appsCategoryCounts", summary.applications.by_category);
+
+        document.getElementById("ticketsTotal").innerText = summary.tickets.total;
+        renderCounts("ticketsStatusCounts", summary.tickets.by_status, "ticket-status-");
+
+        updateTicketsCache(summary.recent_tickets);
+        loadTicketsTable(summary.recent_tickets);
         
         if (user.role === "User") {
             setActionLimits();
         }
     } catch (error) {
-        console.error("Error loading tickets:", error);
+        console.error("Error loading dashboard summary:", error);
     }
 }
 
@@ -49,7 +76,7 @@ async function initializeDashboard() {
             document.getElementById("role").classList.add("bg-blue-200");
         
         getUserApplicationsAndDisplay(user);
-        getUserTicketsAndDisplay(user);
+        getUserSummaryAndDisplay(user);
     } else {
         logout()
     }
@@ -0,0 +1,68 @@
+// /js/etag-cache.js
+// Conditional GETs for the read endpoints that send ETags. The last body and ETag
+// of each URL are kept in sessionStorage, so they survive page navigations; the
+// next request sends If-None-Match and a 304 reuses the stored body.
+
+const STORAGE_PREFIX = "etag-cache:";
+
+function readEntry(url) {
+    try {
+        return JSON.parse(sessionStorage.getItem(STORAGE_PREFIX + url));
+    } catch (error) {
+        return null;
+    }
+}
+
+function writeEntry(url, etag, data) {
+    try {
+        sessionStorage.setItem(STORAGE_PREFIX + url, JSON.stringify({ etag, data }));
+    } catch (error) {
+        // Storage full or unavailable: the response is still used, just not kept
+        sessionStorage.removeItem(STORAGE_PREFIX + url);
+    }
+}
+
+/**
+ * GETs a JSON resource, revalidating the stored copy with If-None-Match.
+ * @param {string} url - The URL to fetch.
+ * @param {Object} headers - Request headers, e.g. Authorization.
+ * @returns {Promise<{res: Response, data: (Object|null)}>} The response and its parsed
+ *   body: the stored one on a 304, null when the status is not OK.
+ */
+export async function fetchJsonWithETag(url, headers = {}) {
+    const cached = readEntry(url);
+    const requestHeaders = { ...headers };
+    if (cached && cached.etag) {
+        requestHeaders["If-None-Match"] = cached.etag;
+    }
+
+    // no-store: this module is the cache, the browser's would only hide the 304s
+    const res = await fetch(url, { headers: requestHeaders, cache: "no-store" });
+
+    if (res.status === 304 && cached) {
+        return { res, data: cached.data };
+    }
+    if (!res.ok) {
+        return { res, data: null };
+    }
+
+    const data = await res.json();
+    const etag = res.headers.get("ETag");
+    if (etag) {
+        writeEntry(url, etag, data);
+    }
+    return { res, data };
+}
+
+/**
+ * Drops every stored response, e.g. on logout.
+ */
+export function clearETagCache() {
+    try {
+        Object.keys(sessionStorage)
+            .filter(key => key.startsWith(STORAGE_PREFIX))
+            .forEach(key => sessionStorage.removeItem(key));
+    } catch (error) {
+        // sessionStorage unavailable: nothing was stored
+    }
+}
@@ -1,24 +1,40 @@
 // /js/markdown-utils.js
 
+/**
+ * Creates the Showdown converter with the options used across the app,
+ * or returns null if Showdown.js is not loaded on the page.
+ */
+export function createMarkdownConverter() {
+    if (typeof showdown === 'undefined') {
+        return null;
+    }
+    return new showdown.Converter({
+        tables: true,
+        strikethrough: true,
+        tasklists: true,
+        ghCompatibleHeaderId: true,
+    });
+}
+
+function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML;
+}
+
 /**
  * Initializes the Markdown preview feature by setting up the Showdown converter
  * and attaching an event listener to the description textarea.
  */
 export function initializeMarkdownPreview(previewElementId, text = null, livePreview = false, inputElementID = null) {
     // Check if Showdown.js is loaded globally (it should be from the HTML script tag)
-    if (typeof showdown === 'undefined') {
+    const converter = createMarkdownConverter();
+    if (!converter) {
         console.error("Showdown.js not found. Please ensure it's loaded in the HTML.");
         return;
     }
     // console.log('markdownPreview');
     
-    const converter = new showdown.Converter({
-        tables: true,
-        strikethrough: true,
-        tasklists: true,
-        ghCompatibleHeaderId: true,
-    });
-    
     // const descriptionInput = document.getElementById('description');
     const previewElement = document.getElementById(previewElementId);
     let originalText = text || document.getElementById(inputElementID).value;
@@ -48,4 +64,42 @@ export function initializeMarkdownPreview(previewElementId, text = null, livePre
             updatePreview(e.target.value);
         });
     }
-}
\ No newline at end of file
+}
+
+
+/**
+ * Renders Markdown that arrives in pieces (e.g. a streamed AI answer) into an element.
+ * Chunks are accumulated and the element is re-rendered at most once per animation
+ * frame, so a fast stream does not re-parse the whole text for every chunk.
+ * Without Showdown.js the text is shown as escaped plain text.
+ *
+ * @param {HTMLElement} element - The element to render into (its content is replaced).
+ * @returns {{append: function(string): void, flush: function(): string}}
+ */
+export function createStreamingMarkdownRenderer(element) {
+    const converter = createMarkdownConverter();
+    let markdownText = '';
+    let frameRequested = false;
+
+    const render = () => {
+        frameRequested = false;
+        element.innerHTML = converter
+            ? converter.makeHtml(markdownText)
+            : `<p class="whitespace-pre-wrap">${escapeHtml(markdownText)}</p>`;
+    };
+
+    return {
+        append(chunk) {
+            markdownText += chunk;
+            if (!frameRequested) {
+                frameRequested = true;
+                requestAnimationFrame(render);
+            }
+        },
+        // Renders whatever is pending right away and returns the full text
+        flush() {
+            render();
+            return markdownText;
+        },
+    };
+}
@@ -1,6 +1,6 @@
 // /js/tickets-index.js
 import { loadCurrentUser, logout, setActionLimits } from './auth.js';
-import { fetchTickets, deleteTicket } from './api-tickets.js';
+import { fetchTickets, fetchMoreTickets, hasMoreTickets, deleteTicket } from './api-tickets.js';
 
 
 let currentUser = null;
@@ -19,6 +19,7 @@ export function loadTicketsTable(tickets) {
     const noTicketsMessage = document.getElementById("noTicketsMessage");
     tableBody.innerHTML = "";
     noTicketsMessage.classList.add("hidden");
+    updateLoadMoreTicketsButton();
 
     if (!tickets || tickets.length === 0) {
         // If there are no tickets after filtering/loading, display the message.
@@ -64,6 +65,27 @@ export function loadTicketsTable(tickets) {
     };
 }
 
+/**
+ * Shows the "Load more" button while the last tickets query has more pages.
+ */
+function updateLoadMoreTicketsButton() {
+    const loadMoreBtn = document.getElementById("loadMoreTicketsBtn");
+    if (loadMoreBtn) loadMoreBtn.classList.toggle("hidden", !hasMoreTickets());
+}
+
+/**
+ * Appends the next page of tickets to the cache and re-applies the current filters.
+ */
+export async function loadMoreTickets() {
+    try {
+        const moreTickets = await fetchMoreTickets();
+        allTicketsCache = allTicketsCache.concat(moreTickets);
+        filterTickets();
+    } catch (error) {
+        console.error("Error loading more tickets:", error);
+    }
+}
+
 /**
  * Fetches tickets based on the provided URL parameters and updates the UI.
  * @param {URLSearchParams | null} params - Optional URLSearchParams object for filtering.
@@ -142,6 +164,7 @@ async function initializeTicketsPage() {
 
 // Expose filtering function globally for HTML inline event listeners
 window.filterTickets = filterTickets; 
+window.loadMoreTickets = loadMoreTickets;
 window.logout = logout;
 
 // Only add the listener if the active page is Tickets
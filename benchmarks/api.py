@@ -0,0 +1,222 @@
+"""
+Latency and throughput of the API hot paths, for comparing commits.
+
+Prepares a database (SQLite file or local Postgres), seeds a synthetic dataset,
+starts a Gemini stub and `uvicorn app.main:app`, then drives the real endpoints
+at fixed concurrency levels:
+
+    login         POST /api/auth/login
+    applications  GET  /api/applications/?limit=50
+    search        GET  /api/tickets/?search=<term>
+    ticket        GET  /api/tickets/{id}
+    chat          POST /api/chat/  (unique questions, so every call reaches the stub)
+
+Prints (or writes with --output) one JSON document with p50/p95/p99 latency,
+throughput and response statuses per scenario and concurrency level.
+
+    python -m benchmarks.api --database-url sqlite:///bench.db --tickets 20000 --concurrency 1,10,50
+    python -m benchmarks.api --database-url postgresql://localhost/apps_hub_bench --reset
+
+Seeding an existing database requires --reset, which deletes all its users,
+applications, accesses and tickets; --skip-seed reuses the data already there,
+e.g. a production-sized dataset loaded by benchmarks/generate_data.py.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks.common import run_load, start_server, stop_server, wait_until_healthy
+
+SCENARIOS = ["login", "applications", "search", "ticket", "chat"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///bench.db")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--applications", type=int, default=200)
+    parser.add_argument("--accesses-per-user", type=int, default=5)
+    parser.add_argument("--tickets", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="delete existing rows before seeding")
+    parser.add_argument("--skip-seed", action="store_true", help="benchmark the data already in the database")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", default="1,10,50", help="comma-separated client counts")
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario and concurrency level")
+    parser.add_argument("--stub-delay-ms", type=int, default=300, help="simulated Gemini latency")
+    parser.add_argument("--port", type=int, default=8300)
+    parser.add_argument("--stub-port", type=int, default=8399)
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    return parser.parse_args()
+
+
+def configure_environment(args):
+    # Must run before anything from `app` is imported: settings are read at import time
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["GEMINI_BASE_URL"] = f"http://127.0.0.1:{args.stub_port}"
+    os.environ["RUN_MIGRATIONS_ON_STARTUP"] = "false"
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-not-for-production")
+    os.environ.setdefault("ADMIN_CREATION_SECRET", "benchmark")
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+
+def prepare_schema():
+    """Brings the DATABASE_URL database to the current schema and returns the app's engine."""
+    import app.db.base  # noqa: F401 (registers every model on Base.metadata)
+    from app.db.database import Base, engine
+
+    if engine.dialect.name == "sqlite":
+        # No migrations on SQLite (they use Postgres-only DDL): create the tables directly
+        from app.services.ticket_search import install_sqlite_fts
+        Base.metadata.create_all(engine)
+        with engine.begin() as connection:
+            install_sqlite_fts(connection)
+    else:
+        from app.init_db import run_migrations
+        run_migrations()
+    return engine
+
+
+def prepare_database(args):
+    from sqlalchemy import func, select
+
+    from app.db.models.user import User
+    from benchmarks.seed import describe_database, reset_database, seed_database
+
+    engine = prepare_schema()
+    if args.skip_seed:
+        return describe_database(engine)
+
+    with engine.connect() as connection:
+        has_rows = connection.execute(select(func.count()).select_from(User)).scalar() > 0
+    if has_rows:
+        if not args.reset:
+            sys.exit("The database already has data: pass --reset to replace it or --skip-seed to reuse it.")
+        reset_database(engine)
+
+    print("Seeding...", file=sys.stderr)
+    return seed_database(
+        engine,
+        users=args.users,
+        applications=args.applications,
+        accesses_per_user=args.accesses_per_user,
+        tickets=args.tickets,
+        seed=args.seed,
+    )
+
+
+def make_scenarios(dataset, tokens, seed):
+    from benchmarks.seed import PASSWORD, SEARCH_TERMS, admin_email, user_email
+
+    rng = random.Random(seed)
+    first_ticket, last_ticket = dataset["ticket_id_range"]
+    regular_users = max(dataset["users"] - dataset["admins"], 0)
+
+    def auth(i):
+        # Spread requests over several accounts, as real traffic would be
+        return {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}
+
+    def login(client, i):
+        email = user_email(dataset["admins"] + i % regular_users) if regular_users else admin_email(0)
+        return client.post("/api/auth/login", data={"email": email, "password": PASSWORD})
+
+    def applications(client, i):
+        return client.get("/api/applications/", params={"limit": 50}, headers=auth(i))
+
+    def search(client, i):
+        return client.get("/api/tickets/", params={"search": rng.choice(SEARCH_TERMS)}, headers=auth(i))
+
+    def ticket(client, i):
+        return client.get(f"/api/tickets/{rng.randint(first_ticket, last_ticket)}", headers=auth(i))
+
+    def chat(client, i):
+        return client.post("/api/chat/", json={"query": f"benchmark question {rng.random()}"}, headers=auth(i))
+
+    return {"login": login, "applications": applications, "search": search, "ticket": ticket, "chat": chat}
+
+
+async def login_admins(base_url, count):
+    from benchmarks.seed import PASSWORD, admin_email
+
+    tokens = []
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for i in range(count):
+            response = await client.post("/api/auth/login", data={"email": admin_email(i), "password": PASSWORD})
+            response.raise_for_status()
+            tokens.append(response.json()["access_token"])
+    return tokens
+
+
+async def run_benchmarks(args, dataset):
+    base_url = f"http://127.0.0.1:{args.port}"
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    stub = start_server("benchmarks.stub_gemini:app", args.stub_port, {"STUB_GEMINI_DELAY_MS": str(args.stub_delay_ms)})
+    server = start_server("app.main:app", args.port)
+    try:
+        await wait_until_healthy(f"http://127.0.0.1:{args.stub_port}")
+        await wait_until_healthy(base_url)
+
+        tokens = await login_admins(base_url, max(1, min(dataset["admins"], max(levels))))
+        requests = make_scenarios(dataset, tokens, args.seed)
+
+        results = {}
+        for name in scenarios:
+            results[name] = {}
+            # Warm connections, pools and caches before measuring
+            await run_load(base_url, requests[name], min(levels[0], 10), min(args.requests, 50))
+            for clients in levels:
+                print(f"{name} x{clients}...", file=sys.stderr)
+                results[name][str(clients)] = await run_load(base_url, requests[name], clients, args.requests)
+        return results
+    finally:
+        stop_server(server)
+        stop_server(stub)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+    dataset = prepare_database(args)
+
+    from sqlalchemy.engine import make_url
+
+    report = {
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "database": make_url(args.database_url).get_backend_name(),
+        "dataset": dataset,
+        "requests_per_level": args.requests,
+        "stub_delay_ms": args.stub_delay_ms,
+        "results": asyncio.run(run_benchmarks(args, dataset)),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
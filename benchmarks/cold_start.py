@@ -0,0 +1,81 @@
+"""
+Measures cold-start time: from spawning `uvicorn app.main:app` until /health answers.
+
+Runs the server several times with migrations on startup (RUN_MIGRATIONS_ON_STARTUP=true,
+the database already at head, i.e. every boot after a deploy) and with startup
+migrations turned off (the pre-deploy command did them). Also times the migration
+step on its own. Prints one JSON object with the timings in seconds.
+
+Requires the usual .env (DATABASE_URL pointing at a migrated database), e.g.:
+
+    python -m benchmarks.cold_start --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+def time_until_healthy(port, run_migrations, timeout=120.0):
+    env = dict(os.environ, RUN_MIGRATIONS_ON_STARTUP="true" if run_migrations else "false")
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = started + timeout
+        while time.perf_counter() < deadline:
+            if server.poll() is not None:
+                raise RuntimeError(f"Server exited with code {server.returncode}")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                pass
+            time.sleep(0.02)
+        raise RuntimeError("Server did not become healthy")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def time_migration_step():
+    """The pre-deploy command on its own, as its own process."""
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "app.init_db"], check=True, capture_output=True)
+    return time.perf_counter() - started
+
+
+def summarize(samples):
+    return {
+        "runs": len(samples),
+        "mean_s": round(statistics.mean(samples), 3),
+        "min_s": round(min(samples), 3),
+        "max_s": round(max(samples), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8200)
+    args = parser.parse_args()
+
+    results = {
+        "migrations_on_startup": summarize([time_until_healthy(args.port, True) for _ in range(args.runs)]),
+        "migrations_pre_deploy": summarize([time_until_healthy(args.port, False) for _ in range(args.runs)]),
+        "pre_deploy_command": summarize([time_migration_step() for _ in range(args.runs)]),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Helpers shared by the benchmark scripts: servers, load generation and statistics."""
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def start_server(app, port, env=None):
+    """Runs `uvicorn <app>` in a child process with the current environment plus `env`."""
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"],
+        env=dict(os.environ, **(env or {})),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def stop_server(server):
+    server.terminate()
+    server.wait(timeout=30)
+
+
+async def wait_until_healthy(base_url, path="/health", timeout=60.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(path)).status_code < 500:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError(f"Server at {base_url} did not become healthy")
+
+
+async def run_load(base_url, send, clients, total_requests, headers=None):
+    """
+    Sends `total_requests` requests from `clients` concurrent workers and returns
+    latency percentiles, throughput and a count of response statuses.
+    `send(client, i)` performs request number i and returns the response.
+    """
+    latencies = []
+    statuses = Counter()
+    remaining = iter(range(total_requests))
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60.0) as client:
+
+        async def worker():
+            for i in remaining:
+                started = time.perf_counter()
+                try:
+                    status = (await send(client, i)).status_code
+                except httpx.HTTPError:
+                    status = "error"
+                latencies.append(time.perf_counter() - started)
+                statuses[str(status)] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ok = sum(count for status, count in statuses.items() if status.startswith("2"))
+    return {
+        "requests": total_requests,
+        "errors": total_requests - ok,
+        "statuses": dict(statuses),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total_requests / elapsed, 1),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
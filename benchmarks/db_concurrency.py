@@ -0,0 +1,63 @@
+"""
+Compares the sync and async database paths under many simultaneous clients.
+
+Starts `uvicorn app.main:app` once with DB_ASYNC=false and once with DB_ASYNC=true,
+logs in with an existing account, and fires the same read requests at both with
+a fixed number of concurrent clients. Prints one JSON object with latency
+percentiles and throughput per mode.
+
+Requires the usual .env (DATABASE_URL pointing at a migrated Postgres database)
+and an account to log in with, e.g.:
+
+    python -m benchmarks.db_concurrency --email admin@example.com --password secret --clients 500
+"""
+import argparse
+import asyncio
+import json
+
+import httpx
+
+from benchmarks.common import run_load, start_server, stop_server, wait_until_healthy
+
+
+async def benchmark_mode(args, db_async):
+    port = args.port + (1 if db_async else 0)
+    base_url = f"http://127.0.0.1:{port}"
+    server = start_server("app.main:app", port, {"DB_ASYNC": "true" if db_async else "false"})
+    try:
+        await wait_until_healthy(base_url)
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            login = await client.post("/api/auth/login", data={"email": args.email, "password": args.password})
+            login.raise_for_status()
+            token = login.json()["access_token"]
+
+        headers = {"Authorization": f"Bearer {token}"}
+        send = lambda client, i: client.get(args.path)
+        # Warm the pools and the user cache before measuring
+        await run_load(base_url, send, min(args.clients, 20), 100, headers)
+        return await run_load(base_url, send, args.clients, args.requests, headers)
+    finally:
+        stop_server(server)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--path", default="/api/tickets/?limit=50")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    results = {
+        "path": args.path,
+        "clients": args.clients,
+        "sync": await benchmark_mode(args, db_async=False),
+        "async": await benchmark_mode(args, db_async=True),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
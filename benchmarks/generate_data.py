@@ -0,0 +1,267 @@
+"""
+Generates production-scale synthetic data and bulk-loads it, for reproducing
+query plans and latencies locally (tens of thousands of users, millions of tickets).
+
+    python -m benchmarks.generate_data --database-url postgresql://localhost/apps_hub_scale \\
+        --users 50000 --applications 2000 --tickets 5000000 --reset
+
+The data is shaped like real usage rather than uniform noise:
+
+  * application popularity is Zipf-skewed: a few applications get most of the
+    access grants and tickets, most applications get very few;
+  * created_at spreads over --years, with more recent rows than old ones (growth);
+  * ticket status depends on age: old tickets are almost all resolved, recent ones
+    are still open or in progress.
+
+Postgres is loaded with COPY (psycopg2 or psycopg 3), SQLite with executemany.
+Rows are generated and loaded in batches of --batch-size, so memory stays bounded
+whatever the row counts. Loading into tables that already have rows requires
+--reset, which deletes every user, application, access and ticket first.
+
+All users share the password from benchmarks/seed.py; the first --admins are
+admins (admin{i}@bench.example.com), the others user{i}@bench.example.com. The benchmark
+suite can run on the result: python -m benchmarks.api --skip-seed ...
+"""
+import argparse
+import itertools
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+DAY = 24 * 3600
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL from the environment / .env")
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--admins", type=int, default=20)
+    parser.add_argument("--applications", type=int, default=1000)
+    parser.add_argument("--accesses-per-user", type=float, default=8, help="average; the actual count varies")
+    parser.add_argument("--tickets", type=int, default=1000000)
+    parser.add_argument("--years", type=float, default=3, help="how far back created_at goes")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of application popularity")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=50000)
+    parser.add_argument("--reset", action="store_true", help="delete existing rows before loading")
+    return parser.parse_args()
+
+
+class Generator:
+    """Row generators for the four tables; each row is a dict keyed by column name."""
+
+    def __init__(self, args):
+        from benchmarks.seed import WORDS
+
+        self.args = args
+        self.words = WORDS
+        self.rng = random.Random(args.seed)
+        self.now = datetime.utcnow().replace(microsecond=0)
+        self.span_seconds = int(args.years * 365 * DAY)
+
+    def created_at(self):
+        # sqrt of a uniform variable: density grows linearly towards now, like a growing user base
+        age = self.span_seconds * (1 - math.sqrt(self.rng.random()))
+        return self.now - timedelta(seconds=int(age))
+
+    def updated_at(self, created_at, age_seconds=None):
+        if age_seconds is None:
+            age_seconds = (self.now - created_at).total_seconds()
+        # Most rows were last touched within a couple of weeks of their creation
+        return created_at + timedelta(seconds=int(min(age_seconds, self.rng.expovariate(1 / (3 * DAY)))))
+
+    def sentence(self, words):
+        return " ".join(self.rng.choices(self.words, k=words)).capitalize()
+
+    def users(self, hashed_password):
+        from app.db.models.user import UserRole
+        from benchmarks.seed import admin_email, user_email
+
+        for i in range(self.args.users):
+            is_admin = i < self.args.admins
+            created = self.created_at()
+            yield {
+                "full_name": f"{'Admin' if is_admin else 'User'} {self.sentence(1)} {i}",
+                "email": admin_email(i) if is_admin else user_email(i),
+                "hashed_password": hashed_password,
+                "role": UserRole.admin if is_admin else UserRole.user,
+                "created_at": created,
+                "updated_at": self.updated_at(created),
+            }
+
+    def applications(self, admin_ids):
+        from app.db.models.application import ApplicationCategory, ApplicationStatus
+
+        categories = list(ApplicationCategory)
+        # Categories are skewed too: many ERP / ticketing tools, few DMS
+        category_weights = [5, 4, 2, 1, 3]
+        for i in range(self.args.applications):
+            created = self.created_at()
+            yield {
+                "name": f"{self.sentence(2)} {i}",
+                "category": self.rng.choices(categories, category_weights)[0],
+                # Only admins create applications (and own them)
+                "owner_id": self.rng.choice(admin_ids) if admin_ids else None,
+                # The only status the API both accepts and returns (schemas.application.AppStatus)
+                "status": ApplicationStatus.active,
+                "created_at": created,
+                "updated_at": self.updated_at(created),
+            }
+
+    def popularity(self, application_ids):
+        """Cumulative Zipf weights over the applications, in a shuffled order of ids."""
+        ids = list(application_ids)
+        self.rng.shuffle(ids)
+        weights = [1 / (rank ** self.args.skew) for rank in range(1, len(ids) + 1)]
+        return ids, list(itertools.accumulate(weights))
+
+    def accesses(self, user_ids, application_ids):
+        from app.db.models.user_application_access import PermissionLevel
+
+        ids, cum_weights = self.popularity(application_ids)
+        levels = list(PermissionLevel)
+        mean = self.args.accesses_per_user
+        for user_id in user_ids:
+            # Geometric-ish spread around the mean: most users have a few apps, some have many
+            count = min(len(ids), max(1, int(self.rng.expovariate(1 / mean)) + 1)) if mean > 0 else 0
+            chosen = set()
+            while len(chosen) < count:
+                chosen.add(self.rng.choices(ids, cum_weights=cum_weights)[0])
+            for application_id in chosen:
+                created = self.created_at()
+                yield {
+                    "user_id": user_id,
+                    "application_id": application_id,
+                    "permission_level": self.rng.choices(levels, [80, 17, 3])[0],
+                    "created_at": created,
+                    "updated_at": self.updated_at(created),
+                }
+
+    def ticket_status(self, age_seconds):
+        from app.db.models.ticket import TicketStatus
+
+        # Share still unresolved decays with age: ~60% for today's tickets, ~2% after three months
+        unresolved = 0.02 + 0.58 * math.exp(-age_seconds / (14 * DAY))
+        roll = self.rng.random()
+        if roll >= unresolved:
+            return TicketStatus.resolved
+        return TicketStatus.open if roll < unresolved * 0.6 else TicketStatus.in_progress
+
+    def tickets(self, user_ids, application_ids):
+        ids, cum_weights = self.popularity(application_ids)
+        for _ in range(self.args.tickets):
+            created = self.created_at()
+            age = (self.now - created).total_seconds()
+            yield {
+                "title": self.sentence(self.rng.randint(3, 8)),
+                "description": self.sentence(self.rng.randint(10, 80)),
+                "application_id": self.rng.choices(ids, cum_weights=cum_weights)[0],
+                "created_by": self.rng.choice(user_ids),
+                "status": self.ticket_status(age),
+                "created_at": created,
+                "updated_at": self.updated_at(created, age),
+            }
+
+
+def batched(rows, size):
+    iterator = iter(rows)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+class Loader:
+    """Writes batches of rows to one table and reports the load rate."""
+
+    def __init__(self, engine, batch_size):
+        self.engine = engine
+        self.batch_size = batch_size
+
+    def load(self, model, rows):
+        from app.db.bulk import bulk_insert
+
+        table = model.__table__
+        started = time.perf_counter()
+        total = 0
+
+        for batch in batched(rows, self.batch_size):
+            with self.engine.begin() as connection:
+                bulk_insert(connection, table, batch)
+            total += len(batch)
+            elapsed = time.perf_counter() - started
+            print(f"  {table.name}: {total:,} rows, {total / elapsed:,.0f} rows/s", file=sys.stderr)
+
+        elapsed = time.perf_counter() - started
+        rate = total / elapsed if elapsed else 0
+        print(f"{table.name}: {total:,} rows in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+        return total, elapsed
+
+
+def main():
+    args = parse_args()
+    if args.database_url:
+        # Before anything from `app` is imported: settings are read at import time
+        os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-not-for-production")
+    os.environ.setdefault("ADMIN_CREATION_SECRET", "benchmark")
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+    from sqlalchemy import func, select
+
+    from app.core.security import hash_password
+    from app.db.models.application import Application
+    from app.db.models.ticket import Ticket
+    from app.db.models.user import User
+    from app.db.models.ticket_stats import TicketStats
+    from app.db.models.user_application_access import UserApplicationAccess
+    from app.services.ticket_stats import rebuild_ticket_stats
+    from benchmarks.api import prepare_schema
+    from benchmarks.seed import PASSWORD, reset_database
+
+    engine = prepare_schema()
+    with engine.connect() as connection:
+        has_rows = any(
+            connection.execute(select(func.count()).select_from(model)).scalar()
+            for model in (User, Application, UserApplicationAccess, Ticket)
+        )
+    if has_rows:
+        if not args.reset:
+            sys.exit("The database already has data: pass --reset to replace it.")
+        reset_database(engine)
+
+    generator = Generator(args)
+    loader = Loader(engine, args.batch_size)
+    started = time.perf_counter()
+    rows = 0
+
+    rows += loader.load(User, generator.users(hash_password(PASSWORD)))[0]
+
+    # Foreign keys for the child tables: ids are only known once the parents are in
+    with engine.connect() as connection:
+        user_ids = connection.execute(select(User.id).order_by(User.id)).scalars().all()
+    rows += loader.load(Application, generator.applications(user_ids[:args.admins]))[0]
+    with engine.connect() as connection:
+        application_ids = connection.execute(select(Application.id).order_by(Application.id)).scalars().all()
+    if not application_ids:
+        sys.exit("No applications to attach accesses and tickets to: use --applications > 0.")
+
+    rows += loader.load(UserApplicationAccess, generator.accesses(user_ids, application_ids))[0]
+    rows += loader.load(Ticket, generator.tickets(user_ids, application_ids))[0]
+    # The rows bypass the routes that keep the per-application counters
+    with engine.begin() as connection:
+        rebuild_ticket_stats(connection)
+
+    if engine.dialect.name == "postgresql":
+        # Fresh statistics, or the planner works from the empty-table estimates
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            for model in (User, Application, UserApplicationAccess, Ticket, TicketStats):
+                connection.exec_driver_sql(f"ANALYZE {model.__table__.schema}.{model.__table__.name}")
+
+    elapsed = time.perf_counter() - started
+    print(f"total: {rows:,} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Query-plan regression check for the queries behind the API routes.
+
+Prepares and seeds a database like benchmarks/api.py, builds the statements the
+ticket, application, access and dashboard routes run (with the same filter and
+pagination helpers, for a sample user and application), and EXPLAINs each one.
+Fails with exit code 1 when any of them reads a table with a sequential scan,
+i.e. when no index serves it anymore, or when a query misses the index it exists
+for (the ticket search and its full-text/trigram indexes):
+
+    python -m benchmarks.query_plans --database-url postgresql://localhost/apps_hub_bench --reset
+    python -m benchmarks.query_plans --database-url sqlite:///plans.db --reset
+
+On Postgres the plans are made with enable_seqscan off, so a Seq Scan in a plan
+means there is no usable index, whatever the size of the dataset; on SQLite a
+"SCAN <table>" step without an index is one. Only queries that read a bounded part
+of their tables are checked: the full reads that rebuild the permission index or
+the ticket counters scan on purpose.
+"""
+import argparse
+import os
+import sys
+from types import SimpleNamespace
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN <statement>, compiled per dialect with the statement's own bind parameters."""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _explain_postgresql(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+@compiles(Explain, "sqlite")
+def _explain_sqlite(element, compiler, **kw):
+    return "EXPLAIN QUERY PLAN " + compiler.process(element.statement, **kw)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///plans.db")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--applications", type=int, default=200)
+    parser.add_argument("--accesses-per-user", type=int, default=5)
+    parser.add_argument("--tickets", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="delete existing rows before seeding")
+    parser.add_argument("--skip-seed", action="store_true", help="check the plans on the data already in the database")
+    parser.add_argument("--verbose", action="store_true", help="print every step of every plan")
+    return parser.parse_args()
+
+
+def configure_environment(args):
+    # Must run before anything from `app` is imported: settings are read at import time
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["RUN_MIGRATIONS_ON_STARTUP"] = "false"
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-not-for-production")
+    os.environ.setdefault("ADMIN_CREATION_SECRET", "benchmark")
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+
+def sample(connection):
+    """A regular user with tickets, an admin, one of the user's applications and a mid-list ticket."""
+    from sqlalchemy import func, select
+
+    from app.db.models.ticket import Ticket
+    from app.db.models.user import User, UserRole
+
+    user_id, application_id = connection.execute(
+        select(Ticket.created_by, Ticket.application_id)
+        .join(User, User.id == Ticket.created_by)
+        .where(User.role == UserRole.user, Ticket.application_id.is_not(None))
+        .order_by(Ticket.id)
+        .limit(1)
+    ).one()
+    admin_id = connection.execute(select(func.min(User.id)).where(User.role == UserRole.admin)).scalar()
+    user_tickets = connection.execute(select(func.count()).where(Ticket.created_by == user_id)).scalar()
+    middle = connection.execute(
+        select(Ticket.created_at, Ticket.id)
+        .where(Ticket.created_by == user_id)
+        .order_by(Ticket.created_at.desc(), Ticket.id.desc())
+        .offset(user_tickets // 2)
+        .limit(1)
+    ).one()
+    return SimpleNamespace(
+        user=SimpleNamespace(id=user_id, role="User"),
+        admin=SimpleNamespace(id=admin_id, role="Admin"),
+        application_id=application_id,
+        cursor=list(middle),
+    )
+
+
+def route_queries(s, dialect_name):
+    """
+    (name, statement, indexes) for each checked query, built the way the routes build
+    them. `indexes` is empty or names indexes of which the plan must use at least one.
+    """
+    from sqlalchemy import func, or_, select
+
+    from app.api.pagination import DEFAULT_PAGE_SIZE, _keyset, encode_cursor
+    from app.api.routes.tickets import filter_tickets
+    from app.db.models.application import Application
+    from app.db.models.ticket import Ticket, TicketStatus
+    from app.db.models.ticket_stats import TicketStats
+    from app.db.models.user import User
+    from app.db.models.user_application_access import UserApplicationAccess
+    from app.services.ticket_export import EXPORT_COLUMNS
+    from app.services.ticket_search import search_tickets
+    from benchmarks.seed import SEARCH_TERMS
+
+    ticket_order = [Ticket.created_at, Ticket.id]
+    next_page = encode_cursor(s.cursor)
+
+    def page(statement, columns, cursor=None):
+        return _keyset(statement, columns, cursor, DEFAULT_PAGE_SIZE, True)
+
+    def tickets(user, dashboard=False, app_id=None, status=None, cursor=None):
+        return page(filter_tickets(select(Ticket), user, dashboard, app_id, status), ticket_order, cursor)
+
+    def search(user, term):
+        query, rank = search_tickets(filter_tickets(select(Ticket), user, False, None, None), term, dialect_name)
+        return page(query, [rank, Ticket.id])
+
+    def users(term=None):
+        query = select(User)
+        if term:
+            query = query.filter(or_(User.full_name.ilike(f"%{term}%"), User.email.ilike(f"%{term}%")))
+        return _keyset(query, [User.full_name, User.id], None, DEFAULT_PAGE_SIZE, False)
+
+    # The GIN indexes on Postgres (migration 7b1e4d9c2a63), the FTS5 table on SQLite
+    search_indexes = ("ix_tickets_search_vector", "ix_tickets_title_description_trgm", "tickets_fts")
+    application_ids = [s.application_id]
+    queries = [
+        ("GET /api/tickets/ (user)", tickets(s.user)),
+        ("GET /api/tickets/ (user, next page)", tickets(s.user, cursor=next_page)),
+        ("GET /api/tickets/?dashboard=true (admin)", tickets(s.admin, dashboard=True)),
+        ("GET /api/tickets/?appId= (user)", tickets(s.user, app_id=s.application_id)),
+        ("GET /api/tickets/?appId= (admin)", tickets(s.admin, app_id=s.application_id)),
+        ("GET /api/tickets/ (admin)", tickets(s.admin)),
+        ("GET /api/tickets/?status=Open (admin)", tickets(s.admin, status=TicketStatus.open)),
+        ("GET /api/tickets/?status=In Progress (admin)", tickets(s.admin, status=TicketStatus.in_progress)),
+        ("GET /api/tickets/export (user)", filter_tickets(select(*EXPORT_COLUMNS), s.user, False, None, None)
+            .order_by(Ticket.created_at.desc(), Ticket.id.desc())),
+        ("GET /api/applications/ (user)", page(
+            select(Application).filter(Application.id.in_(application_ids)),
+            [Application.created_at, Application.id],
+        )),
+        ("GET /api/applications/?ticket_counts=true", select(TicketStats.application_id, TicketStats.status, TicketStats.count)
+            .where(TicketStats.application_id.in_(application_ids))),
+        ("GET /api/access/ (user)", page(
+            select(UserApplicationAccess).filter(UserApplicationAccess.user_id == s.user.id),
+            [UserApplicationAccess.created_at, UserApplicationAccess.id],
+        )),
+        ("GET /api/dashboard/summary: applications", select(Application.status, Application.category, func.count())
+            .where(Application.id.in_(application_ids))
+            .group_by(Application.status, Application.category)),
+        ("GET /api/dashboard/summary: tickets", select(Ticket.status, func.count())
+            .where(Ticket.created_by == s.user.id)
+            .group_by(Ticket.status)),
+        ("GET /api/dashboard/summary: recent tickets", select(Ticket)
+            .where(Ticket.created_by == s.user.id)
+            .order_by(Ticket.created_at.desc(), Ticket.id.desc())
+            .limit(5)),
+        # The ORM cascades load the children by foreign key before deleting them
+        ("DELETE /api/applications/{id}: tickets", select(Ticket).where(Ticket.application_id == s.application_id)),
+        ("DELETE /api/applications/{id}: accesses", select(UserApplicationAccess)
+            .where(UserApplicationAccess.application_id == s.application_id)),
+        ("DELETE /api/users/{id}: tickets", select(Ticket).where(Ticket.created_by == s.user.id)),
+        ("GET /api/tickets/?status=Resolved (admin)", tickets(s.admin, status=TicketStatus.resolved)),
+        ("GET /api/users/", users()),
+        ("GET /api/users/?search=", users("bench")),
+    ]
+    queries = [(name, statement, ()) for name, statement in queries]
+    for term in SEARCH_TERMS[:3] + [str(s.application_id)]:
+        queries.append((f"GET /api/tickets/?search={term} (admin)", search(s.admin, term), search_indexes))
+    # Users' searches may as well start from their own tickets (created_by index)
+    queries.append((f"GET /api/tickets/?search={SEARCH_TERMS[0]} (user)", search(s.user, SEARCH_TERMS[0]), ()))
+    return queries
+
+
+def explain(connection, statement):
+    """The plan's scan steps as (description, is_sequential_scan) pairs."""
+    result = connection.execute(Explain(statement))
+    if connection.dialect.name == "sqlite":
+        from app.db.database import Base
+
+        tables = {table.name for table in Base.metadata.tables.values()}
+        steps = []
+        for _, _, _, detail in result:
+            # "SCAN public.tickets" reads the whole table; "SCAN public.tickets USING INDEX ..."
+            # walks an index. Scans of subqueries and of the FTS5 virtual table are not table reads.
+            words = detail.split()
+            scanned = words[1].rpartition(".")[2] if words[0] == "SCAN" and len(words) > 1 else None
+            steps.append((detail, scanned in tables and " USING " not in detail))
+        return steps
+
+    def walk(node):
+        if "Relation Name" in node or "Index Name" in node:
+            description = node["Node Type"] + " on " + node.get("Relation Name", "?")
+            if "Index Name" in node:
+                description += " using " + node["Index Name"]
+            yield description, node["Node Type"] == "Seq Scan"
+        for child in node.get("Plans", []):
+            yield from walk(child)
+
+    (plan,) = result.scalar()
+    return list(walk(plan["Plan"]))
+
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+
+    from sqlalchemy import text
+
+    from benchmarks.api import prepare_database
+
+    dataset = prepare_database(args)
+    from app.db.database import engine
+
+    with engine.begin() as connection:
+        # Fresh statistics, as the planner will have them in production
+        connection.execute(text("ANALYZE"))
+
+    failures = []
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(text("SET LOCAL enable_seqscan = off"))
+        queries = route_queries(sample(connection), connection.dialect.name)
+        for name, statement, indexes in queries:
+            steps = explain(connection, statement)
+            sequential = [description for description, is_seq in steps if is_seq]
+            missed = indexes and not any(index in description for index in indexes for description, _ in steps)
+            print(f"{'FAIL' if sequential or missed else 'ok  '}  {name}")
+            if missed:
+                print(f"        uses none of {', '.join(indexes)}")
+            for description, is_seq in steps:
+                if is_seq or missed or args.verbose:
+                    print(f"        {description}")
+            if sequential or missed:
+                failures.append(name)
+
+    print(f"\n{len(queries) - len(failures)} of {len(queries)} queries use their indexes "
+          f"({dataset['tickets']} tickets, {dataset['applications']} applications)")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Synthetic dataset for the benchmarks: users, applications, access grants and tickets.
+Generated from a fixed random seed, so runs on different commits see the same data.
+"""
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select, text
+
+from app.core.security import hash_password
+from app.db.models.application import Application, ApplicationCategory, ApplicationStatus
+from app.db.models.ticket import Ticket, TicketStatus
+from app.db.models.ticket_stats import TicketStats
+from app.db.models.user import User, UserRole
+from app.db.models.user_application_access import PermissionLevel, UserApplicationAccess
+from app.services.ticket_stats import rebuild_ticket_stats
+
+PASSWORD = "benchmark"
+ADMINS = 20
+
+WORDS = (
+    "login password reset account locked email printer network vpn access error timeout "
+    "invoice report export import sync server database slow crash update install license "
+    "permission dashboard upload download payroll leave approval workflow calendar backup"
+).split()
+
+# Terms for the ticket search scenario; all appear in the generated tickets
+SEARCH_TERMS = ["password", "vpn", "printer", "invoice export", "slow dashboard", "payroll", "backup"]
+
+
+def admin_email(i):
+    return f"admin{i}@bench.example.com"
+
+
+def user_email(i):
+    return f"user{i}@bench.example.com"
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _batches(rows, size):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def reset_database(engine):
+    """Deletes every row the seed creates. Only for a database dedicated to benchmarking."""
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(text(
+                "TRUNCATE public.tickets, public.user_application_access, public.applications, public.users "
+                "RESTART IDENTITY CASCADE"
+            ))
+            return
+        for model in (TicketStats, Ticket, UserApplicationAccess, Application, User):
+            connection.execute(model.__table__.delete())
+
+
+def seed_database(engine, users, applications, accesses_per_user, tickets, seed=42, batch_size=5000):
+    """Inserts the dataset with multi-row inserts; returns what the scenarios need to know about it."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    # One hash for everyone: the benchmark measures login, not the seeding
+    hashed_password = hash_password(PASSWORD)
+
+    def timestamp():
+        return now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+
+    user_rows = []
+    for i in range(users):
+        is_admin = i < ADMINS
+        created = timestamp()
+        user_rows.append({
+            "full_name": f"Bench {'Admin' if is_admin else 'User'} {i}",
+            "email": admin_email(i) if is_admin else user_email(i),
+            "hashed_password": hashed_password,
+            "role": UserRole.admin if is_admin else UserRole.user,
+            "created_at": created,
+            "updated_at": created,
+        })
+
+    application_rows = []
+    for i in range(applications):
+        created = timestamp()
+        application_rows.append({
+            "name": f"Bench App {i}",
+            "category": rng.choice(list(ApplicationCategory)),
+            # Index of the owning admin; replaced by the user id once the users are in
+            "owner_id": rng.randrange(min(ADMINS, users)) if users else None,
+            # The only status the API both accepts and returns (schemas.application.AppStatus)
+            "status": ApplicationStatus.active,
+            "created_at": created,
+            "updated_at": created,
+        })
+
+    with engine.begin() as connection:
+        for batch in _batches(user_rows, batch_size):
+            connection.execute(insert(User), batch)
+        user_ids = connection.execute(select(User.id).order_by(User.id)).scalars().all()
+
+        for row in application_rows:
+            if row["owner_id"] is not None:
+                row["owner_id"] = user_ids[row["owner_id"]]
+        for batch in _batches(application_rows, batch_size):
+            connection.execute(insert(Application), batch)
+        application_ids = connection.execute(select(Application.id).order_by(Application.id)).scalars().all()
+
+        access_rows = []
+        for user_id in user_ids:
+            for application_id in rng.sample(application_ids, min(accesses_per_user, len(application_ids))):
+                created = timestamp()
+                access_rows.append({
+                    "user_id": user_id,
+                    "application_id": application_id,
+                    "permission_level": rng.choice(list(PermissionLevel)),
+                    "created_at": created,
+                    "updated_at": created,
+                })
+        for batch in _batches(access_rows, batch_size):
+            connection.execute(insert(UserApplicationAccess), batch)
+
+        ticket_rows = []
+        for _ in range(tickets):
+            created = timestamp()
+            ticket_rows.append({
+                "title": _sentence(rng, rng.randint(3, 7)),
+                "description": _sentence(rng, rng.randint(15, 60)),
+                "application_id": rng.choice(application_ids),
+                "created_by": rng.choice(user_ids),
+                "status": rng.choice(list(TicketStatus)),
+                "created_at": created,
+                "updated_at": created,
+            })
+            if len(ticket_rows) == batch_size:
+                connection.execute(insert(Ticket), ticket_rows)
+                ticket_rows = []
+        if ticket_rows:
+            connection.execute(insert(Ticket), ticket_rows)
+        # The rows bypass the routes that keep the per-application counters
+        rebuild_ticket_stats(connection)
+
+        first_ticket, last_ticket = connection.execute(select(func.min(Ticket.id), func.max(Ticket.id))).one()
+
+    return {
+        "users": users,
+        "admins": min(ADMINS, users),
+        "applications": applications,
+        "accesses": len(access_rows),
+        "tickets": tickets,
+        "ticket_id_range": [first_ticket, last_ticket],
+    }
+
+
+def describe_database(engine):
+    """The same summary as seed_database() returns, read from an already seeded database."""
+    with engine.connect() as connection:
+        count = lambda model: connection.execute(select(func.count()).select_from(model)).scalar()
+        first_ticket, last_ticket = connection.execute(select(func.min(Ticket.id), func.max(Ticket.id))).one()
+        return {
+            "users": count(User),
+            "admins": connection.execute(select(func.count()).where(User.role == UserRole.admin)).scalar(),
+            "applications": count(Application),
+            "accesses": count(UserApplicationAccess),
+            "tickets": count(Ticket),
+            "ticket_id_range": [first_ticket, last_ticket],
+        }
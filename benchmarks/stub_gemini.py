@@ -0,0 +1,36 @@
+"""
+Stand-in for the Gemini REST API, so /api/chat can be benchmarked without calling Google.
+
+Answers generateContent after STUB_GEMINI_DELAY_MS milliseconds (default 300) with a
+fixed, grounded response. Started by benchmarks/api.py:
+
+    uvicorn benchmarks.stub_gemini:app --port 8399
+"""
+import asyncio
+import os
+
+from fastapi import FastAPI, Request
+
+DELAY_SECONDS = float(os.environ.get("STUB_GEMINI_DELAY_MS", "300")) / 1000
+
+app = FastAPI()
+
+
+@app.get("/health")
+def health():
+    return {"status": "ok"}
+
+
+@app.post("/{model}:generateContent")
+async def generate_content(model: str, request: Request):
+    body = await request.json()
+    query = body["contents"][0]["parts"][0]["text"]
+    await asyncio.sleep(DELAY_SECONDS)
+    return {
+        "candidates": [{
+            "content": {"parts": [{"text": f"Stub answer to: {query}"}]},
+            "groundingMetadata": {
+                "groundingAttributions": [{"web": {"uri": "https://example.com/help", "title": "Help center"}}]
+            },
+        }]
+    }